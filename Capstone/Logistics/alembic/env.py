@@ -13,7 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import user, shipment, tracking, hub  # Import all models
+from app.models import user, shipment, tracking, hub, stats  # Import all models
 
 # Alembic Config object
 config = context.config
@@ -28,6 +28,26 @@ if config.config_file_name is not None:
 # Model's MetaData for autogenerate support
 target_metadata = Base.metadata
 
+# Search structures managed outside the ORM models (see the shipment search
+# migration); keep autogenerate from proposing to drop them
+SEARCH_OBJECTS = {
+    "search_vector",
+    "shipments_fts",
+    "ix_shipments_search_vector",
+    "ix_shipments_source_address_trgm",
+    "ix_shipments_destination_address_trgm",
+    "ix_shipments_description_trgm",
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip search structures when autogenerating migrations"""
+    if reflected and compare_to is None and name in SEARCH_OBJECTS:
+        return False
+    if type_ == "table" and name and name.startswith("shipments_fts"):
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -44,10 +64,11 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
-
+    
     with context.begin_transaction():
         context.run_migrations()
 
@@ -63,13 +84,14 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
-
+    
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object
         )
-
+        
         with context.begin_transaction():
             context.run_migrations()
 
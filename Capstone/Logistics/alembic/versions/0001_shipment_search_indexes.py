@@ -0,0 +1,51 @@
+"""Shipment search indexes
+
+Adds the address/description search structures to an existing database.
+Base tables are created by the application (Base.metadata.create_all), which
+also creates these structures for new databases, so every step is
+idempotent.
+
+PostgreSQL: pg_trgm, a generated `search_vector` tsvector column with a GIN
+index, and trigram GIN indexes on the searched columns.
+SQLite: an FTS5 table (trigram tokenizer) synced by triggers.
+
+Revision ID: 0001_shipment_search
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+from app.models.shipment import SHIPMENT_SEARCH_DDL_POSTGRESQL, SHIPMENT_SEARCH_DDL_SQLITE
+
+# revision identifiers, used by Alembic.
+revision = "0001_shipment_search"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in SHIPMENT_SEARCH_DDL_POSTGRESQL:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SHIPMENT_SEARCH_DDL_SQLITE:
+            op.execute(statement)
+        # Index rows that existed before the table was created
+        op.execute("INSERT INTO shipments_fts(shipments_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_shipments_description_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_shipments_destination_address_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_shipments_source_address_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_shipments_search_vector")
+        op.execute("ALTER TABLE shipments DROP COLUMN IF EXISTS search_vector")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS shipments_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS shipments_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS shipments_fts_insert")
+        op.execute("DROP TABLE IF EXISTS shipments_fts")
@@ -0,0 +1,102 @@
+"""Partition tracking_updates by month
+
+PostgreSQL: rebuilds tracking_updates as a table partitioned by RANGE
+(created_at), with primary key (id, created_at), monthly partitions
+covering the existing rows through TRACKING_PARTITION_MONTHS_AHEAD months
+ahead, and a DEFAULT partition. Existing rows are copied inside the
+migration transaction. Skipped if the table is already partitioned (new
+databases get it from create_all).
+
+Both dialects: a (shipment_id, created_at DESC) index (on PostgreSQL one
+per partition) and shipments.tracking_archived_at for the tracking
+history archive.
+
+Revision ID: 0002_tracking_partitions
+Revises: 0001_shipment_search
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.partitioning import ensure_monthly_partitions
+
+# revision identifiers, used by Alembic.
+revision = "0002_tracking_partitions"
+down_revision = "0001_shipment_search"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, created_at, shipment_id, location, status, description, updated_at"
+HISTORY_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_tracking_updates_shipment_id_created_at "
+    "ON tracking_updates (shipment_id, created_at DESC)"
+)
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'tracking_updates'::regclass"
+    )).first() is not None
+
+
+def _has_column(bind, table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(bind).get_columns(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not _has_column(bind, "shipments", "tracking_archived_at"):
+        op.add_column("shipments", sa.Column("tracking_archived_at", sa.DateTime(), nullable=True))
+
+    if bind.dialect.name == "postgresql" and not _is_partitioned(bind):
+        op.execute("ALTER TABLE tracking_updates RENAME TO tracking_updates_unpartitioned")
+        op.execute("ALTER INDEX IF EXISTS tracking_updates_pkey RENAME TO tracking_updates_unpartitioned_pkey")
+        op.execute(
+            "CREATE TABLE tracking_updates ("
+            "id UUID NOT NULL, "
+            "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+            "shipment_id UUID NOT NULL REFERENCES shipments (id), "
+            "location VARCHAR(255) NOT NULL, "
+            "status VARCHAR(50) NOT NULL, "
+            "description TEXT, "
+            "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+            "PRIMARY KEY (id, created_at)"
+            ") PARTITION BY RANGE (created_at)"
+        )
+        oldest = bind.execute(sa.text("SELECT min(created_at) FROM tracking_updates_unpartitioned")).scalar()
+        ensure_monthly_partitions(bind, start=oldest.date() if oldest else None)
+        op.execute(
+            f"INSERT INTO tracking_updates ({COLUMNS}) "
+            f"SELECT {COLUMNS} FROM tracking_updates_unpartitioned"
+        )
+        op.execute("DROP TABLE tracking_updates_unpartitioned")
+
+    op.execute(HISTORY_INDEX)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.execute("DROP INDEX IF EXISTS ix_tracking_updates_shipment_id_created_at")
+
+    if bind.dialect.name == "postgresql" and _is_partitioned(bind):
+        op.execute("ALTER TABLE tracking_updates RENAME TO tracking_updates_partitioned")
+        op.execute("ALTER INDEX IF EXISTS tracking_updates_pkey RENAME TO tracking_updates_partitioned_pkey")
+        op.execute(
+            "CREATE TABLE tracking_updates ("
+            "id UUID PRIMARY KEY, "
+            "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+            "shipment_id UUID NOT NULL REFERENCES shipments (id), "
+            "location VARCHAR(255) NOT NULL, "
+            "status VARCHAR(50) NOT NULL, "
+            "description TEXT, "
+            "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL"
+            ")"
+        )
+        op.execute(
+            f"INSERT INTO tracking_updates ({COLUMNS}) "
+            f"SELECT {COLUMNS} FROM tracking_updates_partitioned"
+        )
+        op.execute("DROP TABLE tracking_updates_partitioned CASCADE")
+
+    if _has_column(bind, "shipments", "tracking_archived_at"):
+        op.drop_column("shipments", "tracking_archived_at")
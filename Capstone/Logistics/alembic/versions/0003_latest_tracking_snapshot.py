@@ -0,0 +1,72 @@
+"""Denormalize the latest tracking update onto shipments
+
+Adds shipments.last_tracking_status, last_tracking_at and
+last_tracking_location and backfills them from each shipment's newest
+row in tracking_updates. Shipments whose history is entirely archived
+keep NULLs until their next tracking update.
+
+Revision ID: 0003_latest_tracking
+Revises: 0002_tracking_partitions
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_latest_tracking"
+down_revision = "0002_tracking_partitions"
+branch_labels = None
+depends_on = None
+
+SNAPSHOT_COLUMNS = (
+    ("last_tracking_status", "status", sa.String(50)),
+    ("last_tracking_at", "created_at", sa.DateTime()),
+    ("last_tracking_location", "location", sa.String(255)),
+)
+
+BACKFILL_POSTGRESQL = """
+UPDATE shipments SET
+    last_tracking_status = latest.status,
+    last_tracking_at = latest.created_at,
+    last_tracking_location = latest.location
+FROM (
+    SELECT DISTINCT ON (shipment_id) shipment_id, status, created_at, location
+    FROM tracking_updates
+    ORDER BY shipment_id, created_at DESC
+) AS latest
+WHERE latest.shipment_id = shipments.id
+"""
+
+
+def _has_column(bind, table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(bind).get_columns(table)}
+
+
+def _backfill_portable() -> str:
+    latest = (
+        "(SELECT {source} FROM tracking_updates t WHERE t.shipment_id = shipments.id "
+        "ORDER BY t.created_at DESC LIMIT 1)"
+    )
+    assignments = ", ".join(
+        f"{column} = {latest.format(source=source)}" for column, source, _ in SNAPSHOT_COLUMNS
+    )
+    return f"UPDATE shipments SET {assignments}"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for column, _, column_type in SNAPSHOT_COLUMNS:
+        if not _has_column(bind, "shipments", column):
+            op.add_column("shipments", sa.Column(column, column_type, nullable=True))
+
+    if bind.dialect.name == "postgresql":
+        op.execute(BACKFILL_POSTGRESQL)
+    else:
+        op.execute(_backfill_portable())
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for column, _, _ in SNAPSHOT_COLUMNS:
+        if _has_column(bind, "shipments", column):
+            op.drop_column("shipments", column)
@@ -0,0 +1,38 @@
+"""Add hub coordinates for nearest-hub lookups
+
+Adds hubs.latitude and hubs.longitude (WGS84 degrees, nullable). Existing
+hubs stay without coordinates, and out of nearest-hub results, until they
+are set through PUT /hubs/{hub_id}.
+
+Revision ID: 0004_hub_coordinates
+Revises: 0003_latest_tracking
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_hub_coordinates"
+down_revision = "0003_latest_tracking"
+branch_labels = None
+depends_on = None
+
+COORDINATE_COLUMNS = ("latitude", "longitude")
+
+
+def _has_column(bind, table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(bind).get_columns(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for column in COORDINATE_COLUMNS:
+        if not _has_column(bind, "hubs", column):
+            op.add_column("hubs", sa.Column(column, sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for column in COORDINATE_COLUMNS:
+        if _has_column(bind, "hubs", column):
+            op.drop_column("hubs", column)
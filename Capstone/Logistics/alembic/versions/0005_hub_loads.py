@@ -0,0 +1,53 @@
+"""Maintained per-hub occupancy counters
+
+Creates hub_loads (shipments currently at each hub: status AT_HUB with
+current_hub_id set) and backfills it from shipments. Afterwards the
+counters are kept up to date by the shipment writes themselves; POST
+/admin/hubs/loads/rebuild recomputes them.
+
+Revision ID: 0005_hub_loads
+Revises: 0004_hub_coordinates
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.shipment import ShipmentStatus
+from app.models.types import GUID
+
+# revision identifiers, used by Alembic.
+revision = "0005_hub_loads"
+down_revision = "0004_hub_coordinates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("hub_loads"):
+        op.create_table(
+            "hub_loads",
+            sa.Column("hub_id", GUID(), sa.ForeignKey("hubs.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("at_hub", sa.Integer(), server_default=sa.text("0"), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+    # Bind the status through the model's Enum type so it matches the stored form
+    shipments = sa.table(
+        "shipments",
+        sa.column("current_hub_id", GUID()),
+        sa.column("status", sa.Enum(ShipmentStatus)),
+    )
+    hub_loads = sa.table("hub_loads", sa.column("hub_id"), sa.column("at_hub"), sa.column("updated_at"))
+    op.execute(hub_loads.delete())
+    op.execute(hub_loads.insert().from_select(
+        ["hub_id", "at_hub", "updated_at"],
+        sa.select(shipments.c.current_hub_id, sa.func.count(), sa.func.current_timestamp())
+        .where(shipments.c.status == ShipmentStatus.AT_HUB, shipments.c.current_hub_id.isnot(None))
+        .group_by(shipments.c.current_hub_id)
+    ))
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("hub_loads"):
+        op.drop_table("hub_loads")
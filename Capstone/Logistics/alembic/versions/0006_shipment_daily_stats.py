@@ -0,0 +1,67 @@
+"""Maintained per-day shipment counters
+
+Creates shipment_daily_stats (per UTC creation day: shipments created and
+how many of them are currently in each status) and backfills it from
+shipments. Afterwards the counters are kept up to date by the shipment
+writes themselves; POST /admin/reports/rebuild recomputes a date range.
+
+Revision ID: 0006_shipment_daily_stats
+Revises: 0005_hub_loads
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.shipment import ShipmentStatus
+
+# revision identifiers, used by Alembic.
+revision = "0006_shipment_daily_stats"
+down_revision = "0005_hub_loads"
+branch_labels = None
+depends_on = None
+
+
+def _counter(name: str) -> sa.Column:
+    return sa.Column(name, sa.Integer(), server_default=sa.text("0"), nullable=False)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("shipment_daily_stats"):
+        op.create_table(
+            "shipment_daily_stats",
+            sa.Column("day", sa.Date(), primary_key=True),
+            _counter("total"),
+            *[_counter(status.value) for status in ShipmentStatus],
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+    # Bind the status through the model's Enum type so it matches the stored form
+    shipments = sa.table(
+        "shipments",
+        sa.column("created_at", sa.DateTime()),
+        sa.column("status", sa.Enum(ShipmentStatus)),
+    )
+    counters = ["total"] + [status.value for status in ShipmentStatus]
+    daily_stats = sa.table(
+        "shipment_daily_stats",
+        sa.column("day"),
+        sa.column("updated_at"),
+        *[sa.column(name) for name in counters],
+    )
+    day = sa.func.date(shipments.c.created_at)
+    op.execute(daily_stats.delete())
+    op.execute(daily_stats.insert().from_select(
+        ["day", "updated_at"] + counters,
+        sa.select(
+            day,
+            sa.func.current_timestamp(),
+            sa.func.count(),
+            *[sa.func.sum(sa.case((shipments.c.status == status, 1), else_=0)) for status in ShipmentStatus],
+        ).group_by(day)
+    ))
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("shipment_daily_stats"):
+        op.drop_table("shipment_daily_stats")
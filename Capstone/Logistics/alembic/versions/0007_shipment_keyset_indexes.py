@@ -0,0 +1,51 @@
+"""Shipment keyset pagination indexes
+
+Adds the (created_at, id) indexes declared on Shipment that serve
+ORDER BY created_at DESC, id DESC listings, overall and per customer/agent.
+Base tables are created by the application (Base.metadata.create_all),
+which also creates these indexes for new databases, so every step is
+idempotent.
+
+PostgreSQL builds them with CREATE INDEX CONCURRENTLY, outside the
+migration transaction, so shipment writes are not blocked while they build.
+A failed concurrent build leaves an INVALID index behind; drop it before
+running the upgrade again.
+
+Revision ID: 0007_shipment_keyset_indexes
+Revises: 0006_shipment_daily_stats
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_shipment_keyset_indexes"
+down_revision = "0006_shipment_daily_stats"
+branch_labels = None
+depends_on = None
+
+KEYSET_INDEXES = {
+    "ix_shipments_created_at_id": ["created_at", "id"],
+    "ix_shipments_customer_created_at_id": ["customer_id", "created_at", "id"],
+    "ix_shipments_agent_created_at_id": ["agent_id", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY cannot run inside a transaction block
+        with op.get_context().autocommit_block():
+            for name, columns in KEYSET_INDEXES.items():
+                op.create_index(name, "shipments", columns, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, columns in KEYSET_INDEXES.items():
+            op.create_index(name, "shipments", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name in KEYSET_INDEXES:
+                op.drop_index(name, table_name="shipments", if_exists=True, postgresql_concurrently=True)
+    else:
+        for name in KEYSET_INDEXES:
+            op.drop_index(name, table_name="shipments", if_exists=True)
@@ -1,18 +1,27 @@
 """
 Admin routes
 """
+from datetime import date
 from typing import Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from ...core.database import get_db
 from ...core.dependencies import require_admin
 from ...models.user import User, UserRole
+from ...models.shipment import ShipmentStatus
 from ...services.user_service import UserService
 from ...services.shipment_service import ShipmentService
 from ...services.hub_service import HubService
+from ...services.stats_service import StatsService
+from ...services.export_service import ExportService, EXPORT_MEDIA_TYPES
+from ...services.archive_service import TrackingArchiveService
+from ...core.config import settings
 from ...schemas.user_schema import UserResponse, UserListResponse, UserUpdate
-from ...schemas.hub_schema import AdminReportResponse
+from ...schemas.hub_schema import AdminReportResponse, HubLoadRebuildResponse, HubUtilizationResponse
+from ...schemas.stats_schema import ShipmentStatsRangeResponse, StatsRebuildResponse
+from ...schemas.tracking_schema import TrackingArchiveResponse
 
 router = APIRouter()
 
@@ -114,6 +123,8 @@ def get_reports(
     """
     Get administrative reports and statistics.
     
+    Shipment figures come from the materialized daily statistics.
+    
     Admin only.
     """
     shipment_service = ShipmentService(db)
@@ -141,3 +152,116 @@ def get_reports(
         total_agents=user_counts["agents"],
         total_hubs=hub_count
     )
+
+
+@router.get("/reports/daily", response_model=ShipmentStatsRangeResponse)
+def get_daily_reports(
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get daily shipment statistics for a date range (UTC days, inclusive).
+    
+    Admin only.
+    """
+    service = StatsService(db)
+    return service.get_stats_range(start_date, end_date)
+
+
+@router.post("/reports/rebuild", response_model=StatsRebuildResponse)
+def rebuild_reports(
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Recompute the daily shipment statistics for a date range from the
+    shipments table (backfill or repair).
+    
+    Admin only.
+    """
+    service = StatsService(db)
+    days_rebuilt = service.rebuild_stats(start_date, end_date)
+    return StatsRebuildResponse(start_date=start_date, end_date=end_date, days_rebuilt=days_rebuilt)
+
+
+@router.get("/hubs/utilization", response_model=HubUtilizationResponse)
+def get_hub_utilization(
+    active_only: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Get every hub's current load against its capacity, fullest first.
+    
+    Admin only.
+    """
+    service = HubService(db)
+    return service.get_hub_utilization(active_only)
+
+
+@router.post("/hubs/loads/rebuild", response_model=HubLoadRebuildResponse)
+def rebuild_hub_loads(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Recompute every hub's load from the shipments table (backfill or repair).
+    
+    Admin only.
+    """
+    service = StatsService(db)
+    return HubLoadRebuildResponse(hubs_with_load=service.rebuild_hub_loads())
+
+
+@router.get("/shipments/export")
+def export_shipments(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    status: Optional[ShipmentStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Export shipments as CSV or NDJSON, streamed in creation order.
+    
+    Optional filters: status and creation date range (UTC days, inclusive).
+    
+    Admin only.
+    """
+    service = ExportService(db)
+    chunks = service.export_shipments(export_format, status, start_date, end_date)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="shipments.{export_format}"'}
+    )
+
+
+@router.post("/tracking/archive", response_model=TrackingArchiveResponse)
+def archive_tracking_history(
+    older_than_days: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Move delivered shipments' tracking updates older than `older_than_days`
+    (default TRACKING_ARCHIVE_AFTER_DAYS) to the archive now, instead of
+    waiting for the background job. Archived history is still returned by
+    the tracking endpoints.
+    
+    Admin only.
+    """
+    if older_than_days is None:
+        older_than_days = settings.TRACKING_ARCHIVE_AFTER_DAYS
+    service = TrackingArchiveService(db)
+    shipments, updates = service.archive_delivered(older_than_days)
+    return TrackingArchiveResponse(
+        older_than_days=older_than_days,
+        shipments_archived=shipments,
+        updates_archived=updates
+    )
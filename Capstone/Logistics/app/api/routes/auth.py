@@ -13,7 +13,7 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: Session = Depends(get_db)):
     """
     Register a new user (customer or agent).
     
@@ -24,12 +24,12 @@ def register(request: RegisterRequest, db: Session = Depends(get_db)):
     - **role**: User role (customer, agent)
     """
     auth_service = AuthService(db)
-    user = auth_service.register(request)
+    user = await auth_service.register(request)
     return user
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Authenticate user and return JWT token.
     
@@ -37,13 +37,13 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     """
     auth_service = AuthService(db)
     login_request = LoginRequest(email=form_data.username, password=form_data.password)
-    return auth_service.login(login_request)
+    return await auth_service.login(login_request)
 
 
 @router.post("/token", response_model=TokenResponse)
-def login_json(request: LoginRequest, db: Session = Depends(get_db)):
+async def login_json(request: LoginRequest, db: Session = Depends(get_db)):
     """
     Alternative login endpoint accepting JSON body.
     """
     auth_service = AuthService(db)
-    return auth_service.login(request)
+    return await auth_service.login(request)
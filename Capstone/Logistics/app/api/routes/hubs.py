@@ -6,18 +6,24 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
 from ...core.database import get_db
-from ...core.dependencies import require_admin
+from ...core.dependencies import require_admin, require_agent
 from ...models.user import User
 from ...services.hub_service import HubService
+from ...utils.serialization import OrmSerializer, json_response
 from ...schemas.hub_schema import (
     HubCreate,
     HubUpdate,
     HubResponse,
-    HubListResponse
+    HubListResponse,
+    HubLoadResponse,
+    NearestHubsResponse,
+    MAX_NEAREST_HUBS
 )
 
 router = APIRouter()
 
+hub_serializer = OrmSerializer(HubResponse)
+
 
 @router.get("", response_model=HubListResponse)
 def get_hubs(
@@ -41,12 +47,34 @@ def get_hubs(
         skip = (page - 1) * page_size
         hubs, total = service.get_all_hubs(skip, page_size, active_only)
     
-    return HubListResponse(
-        hubs=hubs,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return json_response({
+        "hubs": hub_serializer.to_list(hubs),
+        "total": total,
+        "page": page,
+        "page_size": page_size
+    })
+
+
+@router.get("/nearest", response_model=NearestHubsResponse)
+def get_nearest_hubs(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=MAX_NEAREST_HUBS),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the `k` active hubs closest to a point, nearest first.
+    
+    Public endpoint. Distances are great-circle kilometres; hubs without
+    coordinates are not considered.
+    """
+    service = HubService(db)
+    return json_response({
+        "hubs": [
+            {**hub_serializer.to_dict(hub), "distance_km": round(distance, 3)}
+            for hub, distance in service.get_nearest_hubs(lat, lon, k)
+        ]
+    })
 
 
 @router.get("/{hub_id}", response_model=HubResponse)
@@ -57,8 +85,23 @@ def get_hub(hub_id: UUID, db: Session = Depends(get_db)):
     Public endpoint.
     """
     service = HubService(db)
-    hub = service.get_hub(hub_id)
-    return hub
+    hub = service.find_hub(hub_id)
+    return json_response(hub_serializer.to_dict(hub))
+
+
+@router.get("/{hub_id}/load", response_model=HubLoadResponse)
+def get_hub_load(
+    hub_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_agent)
+):
+    """
+    Get a hub's current load (shipments at the hub) against its capacity.
+    
+    Accessible by delivery agents and admins only.
+    """
+    service = HubService(db)
+    return service.get_hub_load(hub_id)
 
 
 @router.post("", response_model=HubResponse, status_code=status.HTTP_201_CREATED)
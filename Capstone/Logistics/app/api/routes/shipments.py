@@ -1,11 +1,16 @@
 """
 Shipment routes
 """
-from typing import Optional
+import json
+from typing import Any, Dict, Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from ...core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from ...core.cache import get_cache, track_shipment_key
+from ...core.config import settings
+from ...core.database import get_db, get_lookup_db
 from ...core.dependencies import (
     get_current_user,
     require_agent,
@@ -13,21 +18,50 @@ from ...core.dependencies import (
     require_any_authenticated
 )
 from ...models.user import User, UserRole
-from ...models.shipment import ShipmentStatus
+from ...models.shipment import Shipment, ShipmentStatus
+from ...repositories.shipment_repository import AsyncShipmentRepository
 from ...services.shipment_service import ShipmentService
+from ...services.tracking_service import get_tracking_validator
+from ...services.archive_service import with_archived_history
+from ...utils.conditional import (
+    is_conditional,
+    is_not_modified,
+    not_modified_response,
+    pack_validated,
+    shipment_etag,
+    unpack_validated,
+    validator_headers
+)
+from ...utils.serialization import OrmSerializer, dumps, json_response
+from ...exceptions.custom_exceptions import (
+    ShipmentNotFoundException,
+    InvalidBulkPayloadException,
+    BulkPayloadTooLargeException
+)
 from ...schemas.shipment_schema import (
     ShipmentCreate,
     ShipmentUpdate,
     ShipmentStatusUpdate,
+    ShipmentStatusBatchRequest,
+    ShipmentStatusBatchResponse,
     ShipmentResponse,
     ShipmentDetailResponse,
     ShipmentTrackResponse,
     ShipmentListResponse,
-    ShipmentAssignAgent
+    TrackingUpdateResponse,
+    ShipmentAssignAgent,
+    BulkShipmentResponse,
+    ShipmentSearchResponse
 )
 
 router = APIRouter()
 
+# Hot read paths encode ORM rows directly (see utils.serialization)
+shipment_serializer = OrmSerializer(ShipmentResponse)
+tracking_update_serializer = OrmSerializer(TrackingUpdateResponse)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
 
 @router.post("", response_model=ShipmentResponse, status_code=status.HTTP_201_CREATED)
 def create_shipment(
@@ -45,11 +79,66 @@ def create_shipment(
     return shipment
 
 
+@router.post("/bulk", response_model=BulkShipmentResponse)
+async def bulk_create_shipments(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create shipments in bulk from a manifest.
+    
+    Accepts a JSON array of shipment objects, or NDJSON (one object per
+    line) with `Content-Type: application/x-ndjson`. Rows are validated
+    individually; the response reports success or the error for each row.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    
+    if content_type in NDJSON_MEDIA_TYPES:
+        # Lines are parsed (and reported on) individually by the service
+        rows = [line for line in body.splitlines() if line.strip()]
+    else:
+        try:
+            rows = json.loads(body)
+        except ValueError:
+            raise InvalidBulkPayloadException()
+        if not isinstance(rows, list):
+            raise InvalidBulkPayloadException()
+    
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise BulkPayloadTooLargeException(settings.BULK_MAX_ROWS)
+    
+    service = ShipmentService(db)
+    return await run_in_threadpool(service.bulk_create_shipments, current_user.id, rows)
+
+
+@router.post("/status-batch", response_model=ShipmentStatusBatchResponse)
+def batch_update_shipment_status(
+    batch: ShipmentStatusBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_agent)
+):
+    """
+    Apply a batch of status scans, e.g. an agent's device syncing after
+    being offline.
+    
+    Accessible by delivery agents and admins only. Scans are applied in
+    order (oldest first) and committed together; the response reports
+    success or the error for each scan.
+    """
+    service = ShipmentService(db)
+    return service.batch_update_status(batch.updates, current_user)
+
+
 @router.get("", response_model=ShipmentListResponse)
 def get_shipments(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     status: Optional[ShipmentStatus] = None,
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -59,8 +148,25 @@ def get_shipments(
     - Customers see their own shipments
     - Agents see their assigned shipments
     - Admins see all shipments
+    
+    Cursor mode (`pagination=cursor`, or any `cursor` value) pages on
+    (created_at, id): pass the returned `next_cursor` to get the next page.
+    `include_total` adds an approximate total in cursor mode.
     """
     service = ShipmentService(db)
+    
+    if pagination == "cursor" or cursor:
+        shipments, next_cursor, total = service.get_shipments_page(
+            current_user, cursor, page_size, status, include_total
+        )
+        return json_response({
+            "shipments": shipment_serializer.to_list(shipments),
+            "total": total,
+            "page": None,
+            "page_size": page_size,
+            "next_cursor": next_cursor
+        })
+    
     skip = (page - 1) * page_size
     
     if current_user.role == UserRole.CUSTOMER:
@@ -71,45 +177,143 @@ def get_shipments(
     else:
         shipments, total = service.get_all_shipments(skip, page_size, status)
     
-    return ShipmentListResponse(
-        shipments=shipments,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return json_response({
+        "shipments": shipment_serializer.to_list(shipments),
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": None
+    })
+
+
+@router.get("/search", response_model=ShipmentSearchResponse)
+def search_shipments(
+    q: str = Query(..., min_length=3, max_length=200),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_agent)
+):
+    """
+    Search shipments by source/destination address and description.
+    
+    Accessible by agents and admins. Matches substrings of at least three
+    characters; results are ordered by relevance. Pass the returned
+    `next_cursor` as `cursor` to get the next page.
+    """
+    service = ShipmentService(db)
+    hits, next_cursor = service.search_shipments(q, cursor, page_size)
+    return json_response({
+        "results": [
+            {**shipment_serializer.to_dict(shipment), "score": score}
+            for shipment, score in hits
+        ],
+        "page_size": page_size,
+        "next_cursor": next_cursor
+    })
+
+
+def _build_track_response(shipment: Shipment) -> Dict[str, Any]:
+    """Build the public tracking response (ShipmentTrackResponse) for a shipment"""
+    history = with_archived_history(shipment, shipment.tracking_updates, newest_first=False)
+    return {
+        "tracking_number": shipment.tracking_number,
+        "status": shipment.status,
+        "current_location": shipment.current_location,
+        "source_address": shipment.source_address,
+        "destination_address": shipment.destination_address,
+        "tracking_updates": tracking_update_serializer.to_list(history)
+    }
+
+
+def _track_shipment_sync(db: Session, tracking_number: str) -> Tuple[Shipment, Dict[str, Any]]:
+    """Sync lookup path (runs in the threadpool)"""
+    service = ShipmentService(db)
+    shipment = service.get_shipment_by_tracking(tracking_number, with_tracking=True)
+    return shipment, _build_track_response(shipment)
 
 
 @router.get("/track/{tracking_number}", response_model=ShipmentTrackResponse)
-def track_shipment(tracking_number: str, db: Session = Depends(get_db)):
+async def track_shipment(tracking_number: str, request: Request, db: Session = Depends(get_lookup_db)):
     """
     Track a shipment by tracking number.
     
-    Public endpoint - no authentication required.
+    Public endpoint - no authentication required. Responses are served
+    from the tracking cache until the shipment changes. Send the returned
+    ETag in If-None-Match (or Last-Modified in If-Modified-Since) to get
+    304 Not Modified while the shipment is unchanged.
     """
-    service = ShipmentService(db)
-    shipment = service.get_shipment_by_tracking(tracking_number)
-    return ShipmentTrackResponse(
-        tracking_number=shipment.tracking_number,
-        status=shipment.status,
-        current_location=shipment.current_location,
-        source_address=shipment.source_address,
-        destination_address=shipment.destination_address,
-        tracking_updates=shipment.tracking_updates
+    cache = get_cache()
+    cache_key = track_shipment_key(tracking_number)
+    cached = unpack_validated(await cache.aget(cache_key))
+    if cached is not None:
+        etag, updated_at, payload = cached
+        if is_not_modified(request.headers, etag, updated_at):
+            return not_modified_response(etag, updated_at)
+        return Response(content=payload, media_type="application/json", headers=validator_headers(etag, updated_at))
+    
+    if is_conditional(request.headers):
+        # One (updated_at, count) query decides before anything is loaded
+        updated_at, tracking_count = await get_tracking_validator(db, tracking_number)
+        etag = shipment_etag(updated_at, tracking_count)
+        if is_not_modified(request.headers, etag, updated_at):
+            return not_modified_response(etag, updated_at)
+    
+    if isinstance(db, AsyncSession):
+        shipment = await AsyncShipmentRepository(db).get_by_tracking_number(tracking_number)
+        if not shipment:
+            raise ShipmentNotFoundException(tracking_number)
+        if shipment.tracking_archived_at:
+            # Reading archived history is file I/O
+            track_response = await run_in_threadpool(_build_track_response, shipment)
+        else:
+            track_response = _build_track_response(shipment)
+    else:
+        shipment, track_response = await run_in_threadpool(_track_shipment_sync, db, tracking_number)
+    
+    etag = shipment_etag(shipment.updated_at, len(shipment.tracking_updates))
+    payload = dumps(track_response).decode()
+    await cache.aset(
+        cache_key,
+        pack_validated(etag, shipment.updated_at, payload),
+        settings.TRACKING_CACHE_TTL_SECONDS
+    )
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers=validator_headers(etag, shipment.updated_at)
     )
 
 
 @router.get("/{shipment_id}", response_model=ShipmentDetailResponse)
 def get_shipment(
     shipment_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get shipment details by ID.
+    
+    Supports conditional requests (If-None-Match / If-Modified-Since).
     """
     service = ShipmentService(db)
-    shipment = service.get_shipment(shipment_id)
-    return shipment
+    if is_conditional(request.headers):
+        updated_at, tracking_count = service.get_validator(shipment_id)
+        etag = shipment_etag(updated_at, tracking_count)
+        if is_not_modified(request.headers, etag, updated_at):
+            return not_modified_response(etag, updated_at, private=True)
+    
+    shipment = service.get_shipment(shipment_id, with_tracking=True)
+    history = with_archived_history(shipment, shipment.tracking_updates, newest_first=False)
+    return json_response(
+        {**shipment_serializer.to_dict(shipment), "tracking_updates": tracking_update_serializer.to_list(history)},
+        headers=validator_headers(
+            shipment_etag(shipment.updated_at, len(shipment.tracking_updates)),
+            shipment.updated_at,
+            private=True
+        )
+    )
 
 
 @router.put("/{shipment_id}", response_model=ShipmentResponse)
@@ -1,14 +1,40 @@
 """
 Tracking routes
 """
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from ...core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from ...core.broker import Subscription, get_tracking_broker
+from ...core.cache import get_cache, tracking_history_key
+from ...core.config import settings
+from ...core.database import get_db, get_lookup_db
 from ...core.dependencies import require_agent
+from ...models.shipment import Shipment
+from ...models.tracking import TrackingUpdate
 from ...models.user import User
-from ...services.tracking_service import TrackingService
+from ...repositories.shipment_repository import AsyncShipmentRepository, ShipmentRepository
+from ...services.shipment_service import ShipmentService
+from ...services.tracking_service import TrackingService, get_tracking_validator
+from ...services.archive_service import with_archived_history
+from ...utils.conditional import (
+    is_conditional,
+    is_not_modified,
+    not_modified_response,
+    pack_validated,
+    shipment_etag,
+    unpack_validated,
+    validator_headers
+)
+from ...utils.serialization import OrmSerializer, dumps, json_response
+from ...exceptions.custom_exceptions import ShipmentNotFoundException
 from ...schemas.tracking_schema import (
+    LatestTrackingBatchRequest,
+    LatestTrackingBatchResponse,
     TrackingUpdateCreate,
     TrackingUpdateResponse,
     TrackingHistoryResponse
@@ -16,6 +42,27 @@ from ...schemas.tracking_schema import (
 
 router = APIRouter()
 
+tracking_update_serializer = OrmSerializer(TrackingUpdateResponse)
+
+# Reconnect delay suggested to EventSource clients (ms)
+SSE_RETRY_MS = 3000
+
+
+@router.post("/latest", response_model=LatestTrackingBatchResponse)
+def get_latest_tracking_batch(
+    batch: LatestTrackingBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_agent)
+):
+    """
+    Get the latest tracking status of up to 1,000 shipments in one query.
+    
+    Accessible by delivery agents and admins only. Unknown ids are listed
+    under `missing`.
+    """
+    shipments, missing = TrackingService(db).get_latest_statuses(batch.shipment_ids)
+    return LatestTrackingBatchResponse(shipments=shipments, missing=missing)
+
 
 @router.post("/{shipment_id}", response_model=TrackingUpdateResponse, status_code=status.HTTP_201_CREATED)
 def add_tracking_update(
@@ -34,46 +81,205 @@ def add_tracking_update(
     return tracking
 
 
+def _history_etag(shipment: Shipment, updates: Sequence[Any]) -> str:
+    """ETag of a tracking history (archived updates are not in the validator count)"""
+    return shipment_etag(
+        shipment.updated_at,
+        sum(isinstance(update, TrackingUpdate) for update in updates)
+    )
+
+
+def _build_history(tracking_number: str, updates: Sequence[Any]) -> Dict[str, Any]:
+    """TrackingHistoryResponse content"""
+    return {
+        "tracking_number": tracking_number,
+        "updates": tracking_update_serializer.to_list(updates),
+        "total_updates": len(updates)
+    }
+
+
 @router.get("/{shipment_id}", response_model=TrackingHistoryResponse)
 def get_tracking_history(
     shipment_id: UUID,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Get tracking history for a shipment.
     
-    Public endpoint - no authentication required.
+    Public endpoint - no authentication required. Supports conditional
+    requests (If-None-Match / If-Modified-Since).
     """
+    shipment_service = ShipmentService(db)
+    if is_conditional(request.headers):
+        updated_at, tracking_count = shipment_service.get_validator(shipment_id)
+        etag = shipment_etag(updated_at, tracking_count)
+        if is_not_modified(request.headers, etag, updated_at):
+            return not_modified_response(etag, updated_at)
+    
+    # Keep the shipment referenced so the history lookup reuses it from the
+    # session identity map instead of selecting it again
+    shipment = shipment_service.get_shipment(shipment_id)
     service = TrackingService(db)
     updates = service.get_tracking_history(shipment_id)
     
-    # Get shipment for tracking number
-    from ...repositories.shipment_repository import ShipmentRepository
-    shipment_repo = ShipmentRepository(db)
-    shipment = shipment_repo.get_by_id(shipment_id)
-    
-    return TrackingHistoryResponse(
-        tracking_number=shipment.tracking_number if shipment else str(shipment_id),
-        updates=updates,
-        total_updates=len(updates)
+    return json_response(
+        _build_history(shipment.tracking_number, updates),
+        headers=validator_headers(_history_etag(shipment, updates), shipment.updated_at)
     )
 
 
 @router.get("/number/{tracking_number}", response_model=TrackingHistoryResponse)
-def get_tracking_by_number(
+async def get_tracking_by_number(
     tracking_number: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_lookup_db)
 ):
     """
     Get tracking history by tracking number.
     
-    Public endpoint - no authentication required.
+    Public endpoint - no authentication required. Responses are served
+    from the tracking cache until the shipment changes; conditional
+    requests get 304 Not Modified while it is unchanged.
     """
-    service = TrackingService(db)
-    shipment, updates = service.get_tracking_by_tracking_number(tracking_number)
+    cache = get_cache()
+    cache_key = tracking_history_key(tracking_number)
+    cached = unpack_validated(await cache.aget(cache_key))
+    if cached is not None:
+        etag, updated_at, payload = cached
+        if is_not_modified(request.headers, etag, updated_at):
+            return not_modified_response(etag, updated_at)
+        return Response(content=payload, media_type="application/json", headers=validator_headers(etag, updated_at))
+    
+    if is_conditional(request.headers):
+        updated_at, tracking_count = await get_tracking_validator(db, tracking_number)
+        etag = shipment_etag(updated_at, tracking_count)
+        if is_not_modified(request.headers, etag, updated_at):
+            return not_modified_response(etag, updated_at)
     
-    return TrackingHistoryResponse(
-        tracking_number=tracking_number,
-        updates=updates,
-        total_updates=len(updates)
+    if isinstance(db, AsyncSession):
+        shipment = await AsyncShipmentRepository(db).get_by_tracking_number(tracking_number)
+        if not shipment:
+            raise ShipmentNotFoundException(tracking_number)
+        # Tracking updates are eager-loaded with the shipment; newest first
+        updates = sorted(shipment.tracking_updates, key=lambda u: u.created_at, reverse=True)
+        if shipment.tracking_archived_at:
+            updates = await run_in_threadpool(with_archived_history, shipment, updates)
+    else:
+        service = TrackingService(db)
+        shipment, updates = await run_in_threadpool(
+            service.get_tracking_by_tracking_number, tracking_number
+        )
+    
+    etag = _history_etag(shipment, updates)
+    payload = dumps(_build_history(tracking_number, updates)).decode()
+    await cache.aset(
+        cache_key,
+        pack_validated(etag, shipment.updated_at, payload),
+        settings.TRACKING_CACHE_TTL_SECONDS
+    )
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers=validator_headers(etag, shipment.updated_at)
     )
+
+
+async def _require_tracking_number(tracking_number: str, db: Union[Session, AsyncSession]) -> None:
+    """
+    Raise ShipmentNotFoundException for an unknown tracking number, then
+    release the session: a stream may stay open for hours and must not hold
+    a pooled connection.
+    """
+    if isinstance(db, AsyncSession):
+        exists = await AsyncShipmentRepository(db).tracking_number_exists(tracking_number)
+        await db.close()
+    else:
+        exists = await run_in_threadpool(ShipmentRepository(db).tracking_number_exists, tracking_number)
+        await run_in_threadpool(db.close)
+    if not exists:
+        raise ShipmentNotFoundException(tracking_number)
+
+
+async def _next_update(subscription: Subscription) -> Optional[str]:
+    """Next payload, None once the subscriber has fallen behind; TimeoutError when idle"""
+    return await asyncio.wait_for(subscription.get(), settings.TRACKING_STREAM_HEARTBEAT_SECONDS)
+
+
+@router.get("/number/{tracking_number}/events")
+async def stream_tracking_events(
+    tracking_number: str,
+    db: Session = Depends(get_lookup_db)
+):
+    """
+    Stream new tracking updates of a shipment as Server-Sent Events.
+    
+    Public endpoint - no authentication required. Each update is sent as
+    a `tracking` event whose data is the tracking update JSON; history is
+    not replayed, so fetch it with GET /tracking/number/{tracking_number}
+    after connecting. Comment lines are sent as keep-alives. A client too
+    slow to keep up is disconnected and should reconnect.
+    """
+    await _require_tracking_number(tracking_number, db)
+    
+    async def events() -> AsyncIterator[str]:
+        async with get_tracking_broker().subscribe(tracking_number) as subscription:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                try:
+                    payload = await _next_update(subscription)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if payload is None:
+                    return
+                yield f"event: tracking\ndata: {payload}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/number/{tracking_number}/ws")
+async def stream_tracking_websocket(
+    websocket: WebSocket,
+    tracking_number: str,
+    db: Session = Depends(get_lookup_db)
+):
+    """
+    Stream new tracking updates of a shipment over a WebSocket.
+    
+    Public endpoint - no authentication required. Each update is sent as
+    one text message holding the tracking update JSON; messages from the
+    client are ignored. Unknown tracking numbers are closed with 4404, and
+    clients too slow to keep up with 1013 (try again later).
+    """
+    try:
+        await _require_tracking_number(tracking_number, db)
+    except ShipmentNotFoundException:
+        await websocket.close(code=4404)
+        return
+    
+    async with get_tracking_broker().subscribe(tracking_number) as subscription:
+        await websocket.accept()
+        receiver = asyncio.ensure_future(websocket.receive())
+        try:
+            while True:
+                getter = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    payload = getter.result()
+                    if payload is None:
+                        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                        return
+                    await websocket.send_text(payload)
+                else:
+                    getter.cancel()
+                if receiver in done:
+                    if receiver.result()["type"] == "websocket.disconnect":
+                        return
+                    receiver = asyncio.ensure_future(websocket.receive())
+        finally:
+            receiver.cancel()
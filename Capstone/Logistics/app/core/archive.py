@@ -0,0 +1,74 @@
+"""
+Cold storage for archived tracking history
+
+One gzipped NDJSON file per shipment under TRACKING_ARCHIVE_DIR (a local
+disk or a mounted bucket), sharded by the last two hex digits of the
+shipment id. Each archival run appends a gzip member, so a file may hold
+several runs' rows; readers de-duplicate by update id.
+"""
+import gzip
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List
+from uuid import UUID
+from .config import settings
+
+ARCHIVED_FIELDS = ("id", "shipment_id", "location", "status", "description", "created_at", "updated_at")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class TrackingArchive:
+    """Append-only per-shipment archive of tracking updates"""
+    
+    def __init__(self, root: str):
+        self.root = root
+    
+    def path(self, shipment_id: UUID) -> str:
+        return os.path.join(self.root, shipment_id.hex[-2:], f"{shipment_id}.ndjson.gz")
+    
+    def append(self, shipment_id: UUID, updates: Iterable[Any]) -> int:
+        """Append tracking updates (objects with ARCHIVED_FIELDS); durable on return"""
+        lines = [
+            json.dumps({field: _encode(getattr(update, field)) for field in ARCHIVED_FIELDS}) + "\n"
+            for update in updates
+        ]
+        if not lines:
+            return 0
+        path = self.path(shipment_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as archive_file:
+                archive_file.write("".join(lines).encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+        return len(lines)
+    
+    def read(self, shipment_id: UUID) -> List[Dict[str, Any]]:
+        """Archived updates of a shipment, oldest first, without duplicates"""
+        path = self.path(shipment_id)
+        if not os.path.exists(path):
+            return []
+        rows = {}
+        with gzip.open(path, "rt") as archive_file:
+            for line in archive_file:
+                if line.strip():
+                    row = json.loads(line)
+                    row["created_at"] = datetime.fromisoformat(row["created_at"])
+                    row["updated_at"] = datetime.fromisoformat(row["updated_at"])
+                    rows[row["id"]] = row
+        return sorted(rows.values(), key=lambda row: (row["created_at"], row["id"]))
+
+
+@lru_cache()
+def get_tracking_archive() -> TrackingArchive:
+    """Get the configured tracking archive"""
+    return TrackingArchive(settings.TRACKING_ARCHIVE_DIR)
@@ -0,0 +1,198 @@
+"""
+Tracking update broker - fan-out to stream subscribers (in-process, Redis pub/sub)
+
+Subscribers (SSE / WebSocket connections) wait on a per-connection queue
+registered under the shipment's tracking number, so an idle connection
+costs one queue and one suspended coroutine. Publishers are the service
+layer (threadpool); payloads are serialized once per update and handed to
+each subscriber's event loop.
+"""
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Optional, Set
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One subscriber's pending payloads for a tracking number"""
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.channel = channel
+        self.max_pending = max_pending
+        self.lagged = False
+        self._loop = loop
+        self._queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    def _deliver(self, payload: str) -> None:
+        """Queue a payload (runs on the subscriber's loop)"""
+        if self.lagged:
+            return
+        if self._queue.qsize() >= self.max_pending:
+            # Too slow to keep up: end the stream so the client reconnects
+            # and re-reads the history instead of silently missing updates
+            self.lagged = True
+            self._queue.put_nowait(None)
+            return
+        self._queue.put_nowait(payload)
+
+    async def get(self) -> Optional[str]:
+        """Next payload, or None once the subscription has fallen behind"""
+        return await self._queue.get()
+
+
+class TrackingBroker:
+    """
+    In-process broker.
+
+    Only reaches subscribers connected to the same worker process; use
+    RedisTrackingBroker when running several workers.
+    """
+
+    def __init__(self, max_pending: int = 100):
+        self.max_pending = max_pending
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, payload: str) -> None:
+        """Send a payload to every subscriber of `channel` (thread-safe)"""
+        self._fan_out(channel, payload)
+
+    def _fan_out(self, channel: str, payload: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, payload)
+            except RuntimeError:
+                pass  # Subscriber's loop has shut down
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        """Receive the payloads published to `channel` while the block runs"""
+        subscription = Subscription(channel, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            subscribers = self._subscribers.setdefault(channel, set())
+            first = not subscribers
+            subscribers.add(subscription)
+        if first:
+            await self._channel_opened(channel)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel, set())
+                subscribers.discard(subscription)
+                last = not subscribers
+                if last:
+                    self._subscribers.pop(channel, None)
+            if last:
+                await self._channel_closed(channel)
+
+    def has_subscribers(self, channel: str) -> bool:
+        """Whether a publish to `channel` can reach anyone (lets publishers skip serializing)"""
+        return self.subscriber_count(channel) > 0
+
+    def subscriber_count(self, channel: Optional[str] = None) -> int:
+        """Number of subscribers (of one channel, or in total) in this process"""
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def _channel_opened(self, channel: str) -> None:
+        """Hook: first local subscriber of `channel`"""
+
+    async def _channel_closed(self, channel: str) -> None:
+        """Hook: last local subscriber of `channel` left"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class RedisTrackingBroker(TrackingBroker):
+    """
+    Broker shared by all workers over Redis pub/sub.
+
+    Publishes go to Redis; each worker subscribes (on one connection) to
+    the channels its local clients follow and fans messages out locally.
+    If Redis is unavailable, publishes still reach this worker's
+    subscribers.
+    """
+
+    def __init__(self, url: str, max_pending: int = 100, prefix: str = "logistics:tracking:"):
+        import redis
+        import redis.asyncio
+
+        super().__init__(max_pending)
+        self.prefix = prefix
+        self._error = redis.RedisError
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._pubsub = redis.asyncio.Redis.from_url(url, decode_responses=True).pubsub(
+            ignore_subscribe_messages=True
+        )
+        self._listener: Optional[asyncio.Task] = None
+        # Orders (un)subscribes of a channel whose last client leaves as a new one joins
+        self._subscription_lock = asyncio.Lock()
+
+    def has_subscribers(self, channel: str) -> bool:
+        return True  # Subscribers may be connected to other workers
+
+    def publish(self, channel: str, payload: str) -> None:
+        try:
+            self._client.publish(self.prefix + channel, payload)
+        except self._error as exc:
+            logger.warning("Tracking publish failed for %s: %s", channel, exc)
+            self._fan_out(channel, payload)
+
+    async def _channel_opened(self, channel: str) -> None:
+        async with self._subscription_lock:
+            try:
+                await self._pubsub.subscribe(self.prefix + channel)
+            except self._error as exc:
+                logger.warning("Tracking subscribe failed for %s: %s", channel, exc)
+                return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _channel_closed(self, channel: str) -> None:
+        async with self._subscription_lock:
+            if self.subscriber_count(channel):
+                return
+            try:
+                await self._pubsub.unsubscribe(self.prefix + channel)
+            except self._error as exc:
+                logger.warning("Tracking unsubscribe failed for %s: %s", channel, exc)
+
+    async def _listen(self) -> None:
+        """Fan out messages from Redis until closed (reconnects resubscribe)"""
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            except self._error as exc:
+                logger.warning("Tracking subscription lost: %s", exc)
+                await asyncio.sleep(1)
+                continue
+            if message and message["type"] == "message":
+                self._fan_out(message["channel"][len(self.prefix):], message["data"])
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await self._pubsub.aclose()
+
+
+@lru_cache()
+def get_tracking_broker() -> TrackingBroker:
+    """Get the configured tracking broker (one per process)"""
+    if settings.TRACKING_BROKER_BACKEND == "redis":
+        return RedisTrackingBroker(settings.REDIS_URL, max_pending=settings.TRACKING_STREAM_MAX_PENDING)
+    return TrackingBroker(max_pending=settings.TRACKING_STREAM_MAX_PENDING)
@@ -0,0 +1,218 @@
+"""
+Response cache - pluggable backends (in-process LRU+TTL, Redis)
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """
+    Cache backend interface.
+
+    Values are serialized payloads (str). The sync methods are used from
+    the service layer (threadpool); the async ones from async routes.
+    """
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    async def aget(self, key: str) -> Optional[str]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        self.set(key, value, ttl)
+
+
+class NullCache(CacheBackend):
+    """Cache backend that stores nothing (caching disabled)"""
+
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class InMemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL.
+
+    Entries are per worker process, so invalidations are not seen by
+    other workers until the TTL expires; use RedisCache for that.
+    """
+
+    def __init__(self, max_entries: int = 10000, default_ttl: int = 30):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis-backed cache shared by all workers.
+
+    Redis errors are logged and treated as cache misses so an unavailable
+    Redis degrades to uncached reads instead of failing requests.
+    """
+
+    def __init__(self, url: str, default_ttl: int = 30, prefix: str = "logistics:"):
+        import redis
+        import redis.asyncio
+
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self._error = redis.RedisError
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._async_client = redis.asyncio.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._client.get(self.prefix + key)
+        except self._error as exc:
+            logger.warning("Cache get failed for %s: %s", key, exc)
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        try:
+            self._client.set(self.prefix + key, value, ex=ttl or self.default_ttl)
+        except self._error as exc:
+            logger.warning("Cache set failed for %s: %s", key, exc)
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            self._client.delete(*(self.prefix + key for key in keys))
+        except self._error as exc:
+            logger.warning("Cache delete failed for %s: %s", keys, exc)
+
+    def clear(self) -> None:
+        try:
+            for key in self._client.scan_iter(match=self.prefix + "*"):
+                self._client.delete(key)
+        except self._error as exc:
+            logger.warning("Cache clear failed: %s", exc)
+
+    async def aget(self, key: str) -> Optional[str]:
+        try:
+            return await self._async_client.get(self.prefix + key)
+        except self._error as exc:
+            logger.warning("Cache get failed for %s: %s", key, exc)
+            return None
+
+    async def aset(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        try:
+            await self._async_client.set(self.prefix + key, value, ex=ttl or self.default_ttl)
+        except self._error as exc:
+            logger.warning("Cache set failed for %s: %s", key, exc)
+
+
+def _build_cache(backend: str, max_entries: int, default_ttl: int) -> CacheBackend:
+    if backend == "redis":
+        return RedisCache(settings.REDIS_URL, default_ttl=default_ttl)
+    if backend == "memory":
+        return InMemoryCache(max_entries=max_entries, default_ttl=default_ttl)
+    return NullCache()
+
+
+@lru_cache()
+def get_cache() -> CacheBackend:
+    """Get the configured response cache backend (one per process)"""
+    return _build_cache(settings.CACHE_BACKEND, settings.CACHE_MAX_ENTRIES, settings.CACHE_DEFAULT_TTL_SECONDS)
+
+
+@lru_cache()
+def get_user_cache() -> CacheBackend:
+    """
+    Get the authenticated user snapshot cache (one per process).
+
+    Kept apart from the response cache so it has its own size bound and
+    TTL and is not evicted by tracking traffic. With the "memory" backend
+    UserService invalidates only its own worker: other workers may serve
+    a deactivated or re-roled user until USER_CACHE_TTL_SECONDS pass.
+    The "redis" backend invalidates every worker at once.
+    """
+    return _build_cache(settings.USER_CACHE_BACKEND, settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+
+
+def track_shipment_key(tracking_number: str) -> str:
+    """Cache key for GET /shipments/track/{tracking_number}"""
+    return f"track:shipment:{tracking_number}"
+
+
+def tracking_history_key(tracking_number: str) -> str:
+    """Cache key for GET /tracking/number/{tracking_number}"""
+    return f"track:history:{tracking_number}"
+
+
+def invalidate_tracking(tracking_number: str) -> None:
+    """Drop every cached public tracking response for a shipment"""
+    get_cache().delete(
+        track_shipment_key(tracking_number),
+        tracking_history_key(tracking_number)
+    )
+
+
+def current_user_key(user_id) -> str:
+    """Cache key for the authenticated user snapshot used by get_current_user"""
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user(user_id) -> None:
+    """Drop the cached user snapshot so the next request reloads it"""
+    get_user_cache().delete(current_user_key(user_id))
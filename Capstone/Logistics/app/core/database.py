@@ -1,21 +1,77 @@
 """
 Database configuration - Engine, SessionLocal, Base
 """
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .metrics import DB_POOL_CHECKOUT_WAIT, instrument_pool
+from .profiling import install_query_profiler
+
+
+class _CheckoutTimingMixin:
+    """Records how long each pool checkout waits for a connection"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool with checkout wait metrics"""
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait metrics"""
+
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20
 )
+instrument_pool(engine)
+if settings.DB_PROFILING_ENABLED:
+    install_query_profiler(engine)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Objects stay loaded after commit: services commit
+# once per unit of work and return the flushed objects without a refresh.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async engine and session factory (only built when the async path is enabled,
+# so the asyncpg driver is not required for sync deployments)
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC_ENABLED:
+    async_pool_options = {} if settings.async_database_url.startswith("sqlite") else {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": 10,
+        "max_overflow": 20
+    }
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        pool_pre_ping=True,
+        **async_pool_options
+    )
+    instrument_pool(async_engine.sync_engine)
+    if settings.DB_PROFILING_ENABLED:
+        install_query_profiler(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
 
 # Base class for models
 Base = declarative_base()
@@ -28,3 +84,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session dependency for the read-heavy public lookup routes:
+# AsyncSession when DB_ASYNC_ENABLED is set, sync Session otherwise
+get_lookup_db = get_async_db if settings.DB_ASYNC_ENABLED else get_db
@@ -1,10 +1,15 @@
 """
 Dependencies - get_db, get_current_user, role checks
 """
-from typing import List
+import json
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from .cache import get_user_cache, current_user_key
+from .config import settings
 from .database import get_db
 from .security import decode_access_token
 from ..models.user import User, UserRole
@@ -12,28 +17,76 @@ from ..models.user import User, UserRole
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _dump_user(user: User) -> str:
+    """Serialize the user columns needed by routes (never the password hash)"""
+    return json.dumps({
+        "id": str(user.id),
+        "email": user.email,
+        "full_name": user.full_name,
+        "phone": user.phone,
+        "role": user.role.value,
+        "is_active": user.is_active,
+        "created_at": user.created_at.isoformat(),
+        "updated_at": user.updated_at.isoformat()
+    })
+
+
+def _load_user(payload: str) -> User:
+    """Rebuild a detached User from a cached snapshot"""
+    data = json.loads(payload)
+    return User(
+        id=UUID(data["id"]),
+        email=data["email"],
+        full_name=data["full_name"],
+        phone=data["phone"],
+        role=UserRole(data["role"]),
+        is_active=data["is_active"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        updated_at=datetime.fromisoformat(data["updated_at"])
+    )
+
+
+def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """Decode the bearer token; the payload must carry a `sub` claim"""
     payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _resolve_user(payload: dict, db: Session) -> User:
+    """
+    Load the token's user, going through the user snapshot cache.
+    
+    The snapshot is invalidated by UserService on update/delete and
+    otherwise expires after USER_CACHE_TTL_SECONDS (see get_user_cache).
+    """
+    user_id = payload["sub"]
+    cache = get_user_cache()
+    key = current_user_key(user_id)
     
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    user: Optional[User] = None
+    cached = cache.get(key)
+    if cached is not None:
+        user = _load_user(cached)
+    else:
+        try:
+            user = db.get(User, UUID(user_id))
+        except ValueError:
+            raise _credentials_exception()
+        if user is not None:
+            cache.set(key, _dump_user(user))
     
-    user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     if not user.is_active:
         raise HTTPException(
@@ -44,6 +97,27 @@ def get_current_user(
     return user
 
 
+def _user_from_claims(payload: dict) -> User:
+    """Build a detached User from the token claims alone (id, email, role)"""
+    try:
+        return User(
+            id=UUID(payload["sub"]),
+            email=payload.get("email"),
+            role=UserRole(payload.get("role")),
+            is_active=True
+        )
+    except ValueError:
+        raise _credentials_exception()
+
+
+def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current authenticated user from JWT token"""
+    return _resolve_user(payload, db)
+
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
     if not current_user.is_active:
@@ -55,12 +129,27 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
 
 
 class RoleChecker:
-    """Role-based access control dependency"""
+    """
+    Role-based access control dependency.
+    
+    With AUTH_TRUST_TOKEN_CLAIMS enabled the role comes from the token and
+    the returned user carries only the claims (id, email, role), so no
+    database lookup is made; otherwise the user is resolved as in
+    get_current_user.
+    """
     
     def __init__(self, allowed_roles: List[UserRole]):
         self.allowed_roles = allowed_roles
     
-    def __call__(self, current_user: User = Depends(get_current_user)) -> User:
+    def __call__(
+        self,
+        payload: dict = Depends(get_token_payload),
+        db: Session = Depends(get_db)
+    ) -> User:
+        if settings.AUTH_TRUST_TOKEN_CLAIMS:
+            current_user = _user_from_claims(payload)
+        else:
+            current_user = _resolve_user(payload, db)
         if current_user.role not in self.allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,143 @@
+"""
+Password hashing executor - bcrypt off the request thread
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional
+from passlib.context import CryptContext
+from .config import settings
+from .metrics import PASSWORD_HASH_PENDING
+from ..exceptions.custom_exceptions import HashingBusyException
+
+logger = logging.getLogger(__name__)
+
+# One context per process (built on first use inside each pool worker)
+_contexts: dict = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    context = _contexts.get(rounds)
+    if context is None:
+        context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        _contexts[rounds] = context
+    return context
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify(password: str, hashed: str, rounds: int) -> bool:
+    return _context(rounds).verify(password, hashed)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool.
+    
+    Request handlers await `ahash`/`averify`, which hold neither the GIL
+    nor a threadpool thread while the hash is computed; the blocking
+    `hash`/`verify` are for scripts and tests. At most `max_pending` operations may be queued or running;
+    beyond that HashingBusyException (503) is raised instead of letting a
+    login storm build an unbounded backlog.
+    
+    With `workers=0` hashing runs inline in the calling thread (same
+    admission control), for environments without subprocess support.
+    """
+    
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def pending(self) -> int:
+        """Hash/verify operations queued or running (queue depth)"""
+        return self._pending
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning("Password hashing queue full (%d pending)", self._pending)
+                raise HashingBusyException()
+            self._pending += 1
+        PASSWORD_HASH_PENDING.inc()
+    
+    def _release(self, _future: Optional[Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+        PASSWORD_HASH_PENDING.dec()
+    
+    def _submit(self, fn: Callable, *args) -> Future:
+        self._admit()
+        if self.workers == 0:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+            finally:
+                self._release()
+            return future
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+    
+    def hash(self, password: str) -> str:
+        """Hash a password (blocks the calling thread, not the GIL)"""
+        return self._submit(_hash, password, self.rounds).result()
+    
+    def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against its hash (blocking)"""
+        return self._submit(_verify, password, hashed, self.rounds).result()
+    
+    async def ahash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(_hash, password, self.rounds))
+    
+    async def averify(self, password: str, hashed: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(_verify, password, hashed, self.rounds))
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+@lru_cache()
+def get_hasher() -> PasswordHasher:
+    """Get the password hasher (one pool per API worker process)"""
+    workers = settings.HASH_WORKERS
+    if workers is None:
+        # Every API worker has its own pool, so split the CPUs between them
+        workers = max(1, (os.cpu_count() or 1) // max(1, settings.WEB_CONCURRENCY))
+    return PasswordHasher(
+        workers=workers,
+        max_pending=settings.HASH_MAX_PENDING,
+        rounds=settings.BCRYPT_ROUNDS
+    )
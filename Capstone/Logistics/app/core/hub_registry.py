@@ -0,0 +1,96 @@
+"""
+Hub registry - in-memory snapshot of the hubs table
+
+Hubs are few and change rarely, so hub reads are served from a snapshot
+(loaded at startup, or by the first read) instead of the database.
+HubService refreshes it after every hub write in this process; other
+workers reload theirs within HUB_REGISTRY_TTL_SECONDS, or as soon as an
+ID lookup misses a hub that is in the database. Active hubs with
+coordinates are indexed in a k-d tree for nearest-hub queries.
+"""
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from .config import settings
+from ..schemas.hub_schema import HubResponse
+from ..utils.geo import KDTree, chord_to_km, to_unit_vector
+
+
+class HubSnapshot:
+    """Read-only view of all hubs at one point in time"""
+    
+    def __init__(self, hubs: Iterable[HubResponse]):
+        self.hubs = sorted(hubs, key=lambda hub: hub.hub_name)
+        self.active = [hub for hub in self.hubs if hub.is_active]
+        self.loaded_at = time.monotonic()
+        self._by_id: Dict[UUID, HubResponse] = {hub.id: hub for hub in self.hubs}
+        self._by_city: Dict[str, List[HubResponse]] = {}
+        for hub in self.hubs:
+            self._by_city.setdefault(hub.city, []).append(hub)
+        self._located = [
+            hub for hub in self.active
+            if hub.latitude is not None and hub.longitude is not None
+        ]
+        self._tree = KDTree([to_unit_vector(hub.latitude, hub.longitude) for hub in self._located])
+    
+    def get(self, hub_id: UUID) -> Optional[HubResponse]:
+        return self._by_id.get(hub_id)
+    
+    def page(self, skip: int, limit: int, active_only: bool = False) -> Tuple[List[HubResponse], int]:
+        """A page of hubs ordered by name, and the total"""
+        hubs = self.active if active_only else self.hubs
+        return hubs[skip:skip + limit], len(hubs)
+    
+    def by_city(self, city: str) -> List[HubResponse]:
+        return list(self._by_city.get(city, ()))
+    
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> List[Tuple[HubResponse, float]]:
+        """Up to `k` closest active hubs with their great-circle distance (km)"""
+        matches = self._tree.nearest(to_unit_vector(latitude, longitude), k)
+        return [(self._located[index], chord_to_km(distance)) for distance, index in matches]
+
+
+class HubRegistry:
+    """Process-wide holder of the current HubSnapshot"""
+    
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[HubSnapshot] = None
+        # Bumped by every invalidation, so a load that started before a
+        # hub write cannot install its (stale) result afterwards
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def current(self) -> Optional[HubSnapshot]:
+        """The loaded snapshot, or None if missing or older than the TTL"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > self.ttl_seconds:
+            return None
+        return snapshot
+    
+    def snapshot(self, load: Callable[[], Iterable[Any]]) -> HubSnapshot:
+        """The current snapshot, rebuilt from `load()` (hub rows) when missing or stale"""
+        snapshot = self.current()
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            generation = self._generation
+        snapshot = HubSnapshot(HubResponse.model_validate(hub) for hub in load())
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+    
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next read reloads it"""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+
+@lru_cache()
+def get_hub_registry() -> HubRegistry:
+    """Get the hub registry (one per process)"""
+    return HubRegistry(ttl_seconds=settings.HUB_REGISTRY_TTL_SECONDS)
@@ -0,0 +1,72 @@
+"""
+Monthly range partitions (PostgreSQL)
+
+tracking_updates is declared PARTITION BY RANGE (created_at). Each month
+gets its own partition, created ahead of time by the maintenance job;
+rows outside every monthly range land in the DEFAULT partition.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from .config import settings
+
+TRACKING_TABLE = "tracking_updates"
+
+
+def month_start(value: date) -> date:
+    """First day of the month containing `value`"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+
+def monthly_partition_ddl(table: str, month: date) -> str:
+    """CREATE statement for the partition of `table` holding `month`"""
+    start = month_start(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+    )
+
+
+def default_partition_ddl(table: str) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+
+
+def ensure_monthly_partitions(
+    connection: Connection,
+    table: str = TRACKING_TABLE,
+    start: Optional[date] = None,
+    months_ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Create the monthly partitions of `table` from `start` (default: this
+    month) through `months_ahead` months from now, plus the DEFAULT
+    partition. Existing partitions are left alone; returns the names of
+    all partitions in the range. No-op on other databases.
+    """
+    if connection.dialect.name != "postgresql":
+        return []
+    if months_ahead is None:
+        months_ahead = settings.TRACKING_PARTITION_MONTHS_AHEAD
+    
+    current = month_start(datetime.utcnow().date())
+    month = month_start(start) if start else current
+    last = add_months(current, months_ahead)
+    
+    connection.execute(text(default_partition_ddl(table)))
+    names = []
+    while month <= last:
+        connection.execute(text(monthly_partition_ddl(table, month)))
+        names.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return names
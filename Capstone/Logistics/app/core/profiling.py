@@ -0,0 +1,124 @@
+"""
+SQL query profiler - per-request query counts/time and slow-query log
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+logger = logging.getLogger("app.db.profiler")
+
+_START_KEY = "query_profiler_start"
+
+
+class QueryStats:
+    """Statements executed and database time within one profiled scope"""
+    
+    __slots__ = ("count", "total_time", "statements")
+    
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Optional[List[str]] = [] if record_statements else None
+    
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Called as observer(method, route, stats) when a profiled request finishes
+_request_observers: List[Callable[[str, str, QueryStats], None]] = []
+
+
+def parameter_shape(parameters: Any) -> str:
+    """
+    Describe bound parameters by type only, never by value.
+    
+    `{"id": UUID}` -> `{id: str}`, positional -> `(str, int)`, executemany
+    batches -> `500 x (str, int)`.
+    """
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[_START_KEY].pop()
+    
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(
+            "slow query",
+            extra={
+                "duration_ms": round(elapsed * 1000, 3),
+                "statement": " ".join(statement.split()),
+                "parameters": parameter_shape(parameters)
+            }
+        )
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so it does not pile up on the (pooled) connection
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_START_KEY):
+        conn.info[_START_KEY].pop()
+
+
+def install_query_profiler(engine: Engine) -> None:
+    """Attach the profiler to an engine (idempotent)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def profile_queries(record_statements: bool = False, stats: Optional[QueryStats] = None) -> Iterator[QueryStats]:
+    """Collect stats for queries run in this context (and threads it spawns), optionally into `stats`"""
+    if stats is None:
+        stats = QueryStats(record_statements)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def add_request_observer(observer: Callable[[str, str, QueryStats], None]) -> None:
+    """Register a callback for finished profiled requests"""
+    _request_observers.append(observer)
+
+
+def has_request_observers() -> bool:
+    """Whether finished requests are observed (their statements are then recorded)"""
+    return bool(_request_observers)
+
+
+def remove_request_observer(observer: Callable[[str, str, QueryStats], None]) -> None:
+    _request_observers.remove(observer)
+
+
+def notify_request(method: str, route: str, stats: QueryStats) -> None:
+    for observer in list(_request_observers):
+        observer(method, route, stats)
@@ -0,0 +1,199 @@
+"""
+Rate limiting - GCRA limits with in-process and Redis backends
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`count` requests per `period` seconds, allowing bursts of `count`"""
+    count: int
+    period: int
+    
+    @property
+    def interval(self) -> float:
+        """Seconds between requests at the sustained rate"""
+        return self.period / self.count
+    
+    @property
+    def tolerance(self) -> float:
+        """How far ahead of now the theoretical arrival time may run"""
+        return self.period
+
+
+def parse_limit(value: str) -> RateLimit:
+    """Parse a limit such as `5/minute` or `100/second`"""
+    match = _LIMIT_RE.match(value)
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid rate limit '{value}', expected e.g. '60/minute'")
+    return RateLimit(count=int(match.group(1)), period=_PERIODS[match.group(2)])
+
+
+class RateLimitResult:
+    """Outcome of one rate-limited request"""
+    
+    __slots__ = ("allowed", "remaining", "retry_after")
+    
+    def __init__(self, allowed: bool, remaining: int, retry_after: float):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+
+def _gcra(tat: float, now: float, limit: RateLimit) -> Tuple[RateLimitResult, float]:
+    """
+    Generic cell rate algorithm step.
+    
+    The only state per key is the theoretical arrival time (TAT) of the
+    next request. Returns the result and the TAT to store (unchanged when
+    the request is rejected).
+    """
+    tat = max(tat, now)
+    new_tat = tat + limit.interval
+    ahead = new_tat - now
+    if ahead > limit.tolerance:
+        return RateLimitResult(False, 0, ahead - limit.tolerance), tat
+    remaining = int((limit.tolerance - ahead) / limit.interval)
+    return RateLimitResult(True, remaining, 0.0), new_tat
+
+
+class RateLimitBackend:
+    """Rate limit state store interface"""
+    
+    def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        raise NotImplementedError
+    
+    async def ahit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        return self.hit(key, limit)
+    
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process GCRA state: one float per key in a bounded LRU.
+    
+    Evicting a key only forgets its TAT, which at worst lets that client
+    start a fresh burst. Limits are per worker process; use the Redis
+    backend when running several workers.
+    """
+    
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        now = time.monotonic()
+        with self._lock:
+            result, self._tats[key] = _gcra(self._tats.get(key, now), now, limit)
+            self._tats.move_to_end(key)
+            while len(self._tats) > self.max_keys:
+                self._tats.popitem(last=False)
+        return result
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._tats.clear()
+    
+    def __len__(self) -> int:
+        return len(self._tats)
+
+
+# GCRA in one atomic step. Uses the Redis clock so workers on different
+# hosts agree on "now"; the key expires once its TAT has passed.
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local ahead = new_tat - now
+if ahead > tolerance then
+    return {0, tostring(ahead - tolerance)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(ahead * 1000))
+return {1, tostring(tolerance - ahead)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Redis GCRA state shared by all workers, updated by a Lua script.
+    
+    Redis errors are logged and the request is allowed (fail open), as
+    with RedisCache.
+    """
+    
+    def __init__(self, url: str, prefix: str = "logistics:ratelimit:"):
+        import redis
+        import redis.asyncio
+        
+        self.prefix = prefix
+        self._error = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+        self._script = self._client.register_script(_GCRA_SCRIPT)
+        self._async_script = self._async_client.register_script(_GCRA_SCRIPT)
+    
+    @staticmethod
+    def _result(reply, limit: RateLimit) -> RateLimitResult:
+        allowed, value = int(reply[0]), float(reply[1])
+        if allowed:
+            return RateLimitResult(True, int(value / limit.interval), 0.0)
+        return RateLimitResult(False, 0, value)
+    
+    def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        try:
+            reply = self._script(keys=[self.prefix + key], args=[limit.interval, limit.tolerance])
+        except self._error as exc:
+            logger.warning("Rate limit check failed for %s: %s", key, exc)
+            return RateLimitResult(True, limit.count, 0.0)
+        return self._result(reply, limit)
+    
+    async def ahit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        try:
+            reply = await self._async_script(keys=[self.prefix + key], args=[limit.interval, limit.tolerance])
+        except self._error as exc:
+            logger.warning("Rate limit check failed for %s: %s", key, exc)
+            return RateLimitResult(True, limit.count, 0.0)
+        return self._result(reply, limit)
+    
+    def reset(self) -> None:
+        try:
+            for key in self._client.scan_iter(match=self.prefix + "*"):
+                self._client.delete(key)
+        except self._error as exc:
+            logger.warning("Rate limit reset failed: %s", exc)
+
+
+@lru_cache()
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Get the configured rate limit backend (one per process)"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.REDIS_URL)
+    return InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+def retry_after_seconds(result: RateLimitResult) -> int:
+    """Whole seconds for the Retry-After header"""
+    return max(1, math.ceil(result.retry_after))
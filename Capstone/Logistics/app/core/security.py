@@ -4,21 +4,28 @@ Security utilities - JWT, password hashing
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from .config import settings
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .hashing import get_hasher
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash (blocks; request handlers use averify_password)"""
+    return get_hasher().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password (blocks; request handlers use aget_password_hash)"""
+    return get_hasher().hash(password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash from async code"""
+    return await get_hasher().averify(plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password from async code"""
+    return await get_hasher().ahash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
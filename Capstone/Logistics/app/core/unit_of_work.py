@@ -0,0 +1,75 @@
+"""
+Unit of work - one transaction per service operation
+"""
+from typing import Union
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_DEPTH_KEY = "unit_of_work_depth"
+
+
+class UnitOfWork:
+    """
+    Transaction scope for a service operation.
+
+    Repositories only flush; the outermost unit of work commits once when
+    the block succeeds and rolls back if it raises. Nested units of work
+    join the outer transaction, so service methods can call each other.
+
+    Usage:
+        with UnitOfWork(db):
+            shipment_repo.update(...)
+            tracking_repo.create(...)
+
+    `async with` is supported for AsyncSession.
+    """
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        self.db = db
+
+    def _enter(self) -> bool:
+        """Register this scope; returns True for the outermost one"""
+        info = self.db.info if isinstance(self.db, Session) else self.db.sync_session.info
+        depth = info.get(_DEPTH_KEY, 0)
+        info[_DEPTH_KEY] = depth + 1
+        return depth == 0
+
+    def _exit(self) -> None:
+        info = self.db.info if isinstance(self.db, Session) else self.db.sync_session.info
+        info[_DEPTH_KEY] -= 1
+
+    def __enter__(self) -> Session:
+        self._outermost = self._enter()
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self._outermost:
+                if exc_type is None:
+                    try:
+                        self.db.commit()
+                    except Exception:
+                        self.db.rollback()
+                        raise
+                else:
+                    self.db.rollback()
+        finally:
+            self._exit()
+
+    async def __aenter__(self) -> AsyncSession:
+        self._outermost = self._enter()
+        return self.db
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self._outermost:
+                if exc_type is None:
+                    try:
+                        await self.db.commit()
+                    except Exception:
+                        await self.db.rollback()
+                        raise
+                else:
+                    await self.db.rollback()
+        finally:
+            self._exit()
@@ -1,7 +1,7 @@
 """
 Custom exceptions for the application
 """
-from typing import Any
+from typing import Any, Optional
 
 
 class LogisticsBaseException(Exception):
@@ -60,6 +60,16 @@ class ShipmentCannotBeCancelledException(LogisticsBaseException):
         )
 
 
+class InvalidStatusTransitionException(LogisticsBaseException):
+    """Exception raised when a shipment cannot move to the requested status"""
+    
+    def __init__(self, old_status: Any, new_status: Any):
+        super().__init__(
+            message=f"Cannot change status from {old_status} to {new_status}",
+            status_code=400
+        )
+
+
 class HubNotFoundException(LogisticsBaseException):
     """Exception raised when hub is not found"""
     
@@ -90,6 +100,51 @@ class AgentNotFoundException(LogisticsBaseException):
         )
 
 
+class InvalidCursorException(LogisticsBaseException):
+    """Exception raised when a pagination cursor cannot be decoded"""
+    
+    def __init__(self, cursor: str):
+        super().__init__(
+            message=f"Invalid pagination cursor '{cursor}'",
+            status_code=400
+        )
+
+
+class InvalidBulkPayloadException(LogisticsBaseException):
+    """Exception raised when a bulk upload body cannot be parsed"""
+    
+    def __init__(self, message: str = "Bulk payload must be a JSON array or NDJSON"):
+        super().__init__(message=message, status_code=400)
+
+
+class BulkPayloadTooLargeException(LogisticsBaseException):
+    """Exception raised when a bulk upload has too many rows"""
+    
+    def __init__(self, max_rows: int):
+        super().__init__(
+            message=f"Bulk payload exceeds the maximum of {max_rows} rows",
+            status_code=413
+        )
+
+
+class InvalidDateRangeException(LogisticsBaseException):
+    """Exception raised for an empty or too long date range"""
+    
+    def __init__(self, start: Any, end: Any, max_days: Optional[int] = None):
+        limit = f" (at most {max_days} days)" if max_days else ""
+        super().__init__(
+            message=f"Invalid date range {start} to {end}{limit}",
+            status_code=400
+        )
+
+
+class HashingBusyException(LogisticsBaseException):
+    """Exception raised when the password hashing queue is full"""
+    
+    def __init__(self, message: str = "Authentication is busy, please retry shortly"):
+        super().__init__(message=message, status_code=503)
+
+
 class UnauthorizedAccessException(LogisticsBaseException):
     """Exception raised for unauthorized access"""
     
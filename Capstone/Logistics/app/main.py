@@ -1,14 +1,31 @@
 """
 Main application entry point
 """
+import asyncio
+import logging
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Response
+from starlette.concurrency import run_in_threadpool
+from .core.broker import get_tracking_broker
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import engine, Base, SessionLocal
+from .core.hashing import get_hasher
+from .core.logging_config import setup_logging
+from .core.metrics import render_metrics
 from .api.router import api_router
+from .services.archive_service import tracking_maintenance_loop
+from .services.hub_service import HubService
 from .middleware.cors import setup_cors
 from .middleware.logging_middleware import LoggingMiddleware
+from .middleware.metrics_middleware import MetricsMiddleware
+from .middleware.profiling_middleware import QueryProfilerMiddleware
+from .middleware.rate_limiter import RateLimiterMiddleware
 from .exceptions.exception_handlers import setup_exception_handlers
+from .utils.serialization import FastJSONResponse
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Create database tables only if not in test mode
 # In production, use Alembic migrations instead
@@ -18,8 +35,43 @@ if os.getenv("TESTING") != "true":
     except Exception:
         pass  # Database might not be available during import
 
+
+def _load_hub_registry() -> None:
+    """Warm the hub registry (hub reads load it on demand otherwise)"""
+    try:
+        with SessionLocal() as db:
+            HubService(db).load_registry()
+    except Exception:
+        logger.warning("hub registry not loaded at startup", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the hub registry and run the tracking maintenance job (partitions,
+    archival) in the background; close the tracking broker and the password
+    hashing pool on shutdown
+    """
+    task = None
+    if os.getenv("TESTING") != "true":
+        await run_in_threadpool(_load_hub_registry)
+    maintenance_needed = settings.TRACKING_ARCHIVE_ENABLED or engine.dialect.name == "postgresql"
+    if maintenance_needed and os.getenv("TESTING") != "true":
+        task = asyncio.create_task(tracking_maintenance_loop(engine))
+    yield
+    if task is not None:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await get_tracking_broker().close()
+    if os.getenv("TESTING") != "true":
+        await run_in_threadpool(get_hasher().shutdown)
+
+
 # Create FastAPI application
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="""
@@ -48,6 +100,12 @@ app = FastAPI(
 
 # Setup middleware
 setup_cors(app)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimiterMiddleware)
+if settings.DB_PROFILING_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 app.add_middleware(LoggingMiddleware)
 
 # Setup exception handlers
@@ -70,4 +128,18 @@ def root():
 @app.get("/health", tags=["Health"])
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    hasher = get_hasher()
+    return {
+        "status": "healthy",
+        "password_hashing": {
+            "pending": hasher.pending,
+            "max_pending": hasher.max_pending
+        }
+    }
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    """Prometheus metrics"""
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
@@ -1,41 +1,65 @@
 """
 Logging middleware
 """
-import time
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import random
+import time
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..core.config import settings
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
+logger = logging.getLogger("app.access")
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging requests and responses"""
+class LoggingMiddleware:
+    """
+    Pure ASGI middleware for access logging.
     
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        logger.info(f"Request: {request.method} {request.url.path}")
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate processing time
-        process_time = time.time() - start_time
+    Writes one structured record per request (method, path, status,
+    duration) and adds the X-Process-Time header. Response bodies are
+    passed through untouched, so streaming responses keep streaming.
+    2xx responses are logged with probability `sample_rate`; everything
+    else is always logged.
+    """
+    
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = settings.ACCESS_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log response
-        logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"- Status: {response.status_code} - Time: {process_time:.3f}s"
-        )
+        start_time = time.perf_counter()
+        status_code = 500
         
-        # Add custom header with processing time
-        response.headers["X-Process-Time"] = str(process_time)
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(time.perf_counter() - start_time))
+            await send(message)
         
-        return response
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self._should_log(status_code):
+                client = scope.get("client")
+                logger.info(
+                    "request",
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - start_time) * 1000, 3),
+                        "client": client[0] if client else None
+                    }
+                )
+    
+    def _should_log(self, status_code: int) -> bool:
+        if not 200 <= status_code < 300:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
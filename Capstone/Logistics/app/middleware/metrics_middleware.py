@@ -0,0 +1,45 @@
+"""
+Metrics middleware
+"""
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..core.metrics import REQUEST_LATENCY, REQUESTS_IN_PROGRESS
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency and in-flight requests.
+    
+    Latency is labelled by the matched route template (e.g.
+    `/shipments/{shipment_id}`), never the raw path, so label cardinality
+    stays bounded; requests that match no route share `unmatched`.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            route = getattr(scope.get("route"), "path_format", None) or "unmatched"
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(
+                time.perf_counter() - start_time
+            )
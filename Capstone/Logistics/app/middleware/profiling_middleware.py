@@ -0,0 +1,53 @@
+"""
+Query profiler middleware
+"""
+import logging
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..core.config import settings
+from ..core.profiling import has_request_observers, notify_request, profile_queries
+
+logger = logging.getLogger("app.db.profiler")
+
+
+class QueryProfilerMiddleware:
+    """
+    Pure ASGI middleware counting SQL statements and database time per request.
+    
+    Stats are collected through a context variable that the engine's
+    cursor events update (see app.core.profiling). With DEBUG enabled the
+    totals are returned as X-DB-Queries / X-DB-Time (ms) headers; they
+    cover queries issued before the response headers were sent. While
+    request observers are registered (tests) the statements are kept too.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        with profile_queries(record_statements=has_request_observers()) as stats:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Queries", str(stats.count))
+                    headers.append("X-DB-Time", f"{stats.total_time * 1000:.3f}")
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path_format", None) or "unmatched"
+                logger.debug(
+                    "request queries",
+                    extra={
+                        "method": scope["method"],
+                        "route": route,
+                        "queries": stats.count,
+                        "db_time_ms": round(stats.total_time * 1000, 3)
+                    }
+                )
+                notify_request(scope["method"], route, stats)
@@ -1,48 +1,132 @@
 """
 Rate limiter middleware (optional - for API protection)
 """
-import time
-from collections import defaultdict
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, List, Optional, Tuple
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..core.config import settings
+from ..core.rate_limit import (
+    RateLimit,
+    RateLimitBackend,
+    get_rate_limit_backend,
+    parse_limit,
+    retry_after_seconds
+)
+from ..core.security import decode_access_token
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
+class RateLimitPolicy:
     """
-    Simple rate limiter middleware.
+    Chooses the limit and bucket key for a request.
     
-    Limits requests per IP address to prevent abuse.
+    A route rule (longest matching path prefix) applies to every caller of
+    that route, each in its own bucket. Other requests use the limit for
+    the caller's role, or the anonymous default. Authenticated callers are
+    keyed by user id, anonymous ones by client IP.
     """
     
-    def __init__(self, app, requests_per_minute: int = 60):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.requests = defaultdict(list)
+    def __init__(
+        self,
+        default: str,
+        roles: Optional[Dict[str, str]] = None,
+        routes: Optional[Dict[str, str]] = None
+    ):
+        self.default = parse_limit(default)
+        self.roles = {role: parse_limit(limit) for role, limit in (roles or {}).items()}
+        self.routes: List[Tuple[str, RateLimit]] = sorted(
+            ((prefix, parse_limit(limit)) for prefix, limit in (routes or {}).items()),
+            key=lambda rule: len(rule[0]),
+            reverse=True
+        )
     
-    async def dispatch(self, request: Request, call_next):
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+    @classmethod
+    def from_settings(cls) -> "RateLimitPolicy":
+        return cls(settings.RATE_LIMIT_DEFAULT, settings.RATE_LIMIT_ROLES, settings.RATE_LIMIT_ROUTES)
+    
+    def resolve(self, request: Request) -> Tuple[str, RateLimit]:
+        """Get the bucket key and limit for a request"""
+        claims = _token_claims(request)
+        if claims:
+            identity = f"user:{claims['sub']}"
+        else:
+            identity = f"ip:{request.client.host if request.client else 'unknown'}"
+        
+        path = request.url.path
+        for prefix, limit in self.routes:
+            if path.startswith(prefix):
+                return f"route:{prefix}:{identity}", limit
         
-        # Get current timestamp
-        current_time = time.time()
+        role = claims.get("role") if claims else None
+        if role in self.roles:
+            return f"role:{role}:{identity}", self.roles[role]
+        return f"default:{identity}", self.default
+
+
+def _token_claims(request: Request) -> Optional[dict]:
+    """Claims of a valid bearer token, without touching the database"""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    if not payload or payload.get("sub") is None:
+        return None
+    return payload
+
+
+class RateLimiterMiddleware:
+    """
+    Pure ASGI rate limiter middleware.
+    
+    Applies GCRA limits from a RateLimitPolicy; state lives in the
+    configured backend (per-process memory or shared Redis), one value per
+    bucket key. Rejected requests get 429 with a Retry-After header.
+    Allowed responses pass through untouched apart from the X-RateLimit
+    headers, so streamed bodies (exports, SSE) are not buffered or wrapped.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        policy: Optional[RateLimitPolicy] = None,
+        backend: Optional[RateLimitBackend] = None
+    ):
+        self.app = app
+        self.policy = policy if policy is not None else RateLimitPolicy.from_settings()
+        self.backend = backend if backend is not None else get_rate_limit_backend()
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Clean old requests (older than 1 minute)
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if current_time - req_time < 60
-        ]
+        key, limit = self.policy.resolve(Request(scope))
+        result = await self.backend.ahit(key, limit)
         
-        # Check rate limit
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            raise HTTPException(
+        if not result.allowed:
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many requests. Please try again later."
+                content={
+                    "error": True,
+                    "message": "Too many requests. Please try again later.",
+                    "status_code": status.HTTP_429_TOO_MANY_REQUESTS
+                },
+                headers={
+                    "Retry-After": str(retry_after_seconds(result)),
+                    "X-RateLimit-Limit": str(limit.count),
+                    "X-RateLimit-Remaining": "0"
+                }
             )
+            await response(scope, receive, send)
+            return
         
-        # Add current request
-        self.requests[client_ip].append(current_time)
-        
-        # Process request
-        response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(limit.count)
+                headers["X-RateLimit-Remaining"] = str(result.remaining)
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_wrapper)
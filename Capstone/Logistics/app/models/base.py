@@ -1,17 +1,17 @@
 """
 Base model with common fields
 """
-import uuid
 from datetime import datetime
 from sqlalchemy import Column, DateTime
 from .types import GUID
 from ..core.database import Base
+from ..utils.ids import uuid7
 
 
 class BaseModel(Base):
     """Abstract base model with common fields"""
     __abstract__ = True
     
-    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    id = Column(GUID(), primary_key=True, default=uuid7)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,7 +1,7 @@
 """
 Hub model
 """
-from sqlalchemy import Column, String, Boolean, Text, Integer
+from sqlalchemy import Column, String, Boolean, Text, Integer, Float
 from .base import BaseModel
 
 
@@ -15,6 +15,10 @@ class Hub(BaseModel):
     contact_phone = Column(String(20), nullable=True)
     contact_email = Column(String(255), nullable=True)
     capacity = Column(Integer, nullable=True)  # Maximum shipments it can handle
+    
+    # Location (WGS84 degrees) for nearest-hub lookups
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     
     def __repr__(self):
@@ -2,11 +2,11 @@
 Shipment model
 """
 import enum
-import uuid
-from sqlalchemy import Column, String, Text, Enum, ForeignKey, Float
+from sqlalchemy import DDL, Column, DateTime, String, Text, Enum, ForeignKey, Float, Index, event
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 from .types import GUID
+from ..utils.ids import time_ordered_tracking_number
 
 
 class ShipmentStatus(str, enum.Enum):
@@ -21,14 +21,55 @@ class ShipmentStatus(str, enum.Enum):
     RETURNED = "returned"
 
 
+# Statuses a shipment may move to from each status. Movement statuses may
+# repeat (another hub, another delivery attempt); cancelled and returned
+# shipments are final.
+STATUS_TRANSITIONS = {
+    ShipmentStatus.CREATED: {
+        ShipmentStatus.PICKED_UP, ShipmentStatus.IN_TRANSIT, ShipmentStatus.AT_HUB,
+        ShipmentStatus.CANCELLED
+    },
+    ShipmentStatus.PICKED_UP: {
+        ShipmentStatus.IN_TRANSIT, ShipmentStatus.AT_HUB, ShipmentStatus.OUT_FOR_DELIVERY,
+        ShipmentStatus.CANCELLED
+    },
+    ShipmentStatus.IN_TRANSIT: {
+        ShipmentStatus.IN_TRANSIT, ShipmentStatus.AT_HUB, ShipmentStatus.OUT_FOR_DELIVERY,
+        ShipmentStatus.RETURNED
+    },
+    ShipmentStatus.AT_HUB: {
+        ShipmentStatus.IN_TRANSIT, ShipmentStatus.AT_HUB, ShipmentStatus.OUT_FOR_DELIVERY,
+        ShipmentStatus.RETURNED
+    },
+    ShipmentStatus.OUT_FOR_DELIVERY: {
+        ShipmentStatus.AT_HUB, ShipmentStatus.OUT_FOR_DELIVERY, ShipmentStatus.DELIVERED,
+        ShipmentStatus.RETURNED
+    },
+    ShipmentStatus.DELIVERED: {ShipmentStatus.RETURNED},
+    ShipmentStatus.CANCELLED: set(),
+    ShipmentStatus.RETURNED: set(),
+}
+
+
+def can_transition(old_status: ShipmentStatus, new_status: ShipmentStatus) -> bool:
+    """Check whether a shipment may move from `old_status` to `new_status`"""
+    return new_status in STATUS_TRANSITIONS[old_status]
+
+
 def generate_tracking_number():
-    """Generate a unique tracking number"""
-    return f"TRK{uuid.uuid4().hex[:10].upper()}"
+    """Generate a unique, time-ordered tracking number"""
+    return time_ordered_tracking_number()
 
 
 class Shipment(BaseModel):
     """Shipment model"""
     __tablename__ = "shipments"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC (optionally per customer/agent)
+        Index("ix_shipments_created_at_id", "created_at", "id"),
+        Index("ix_shipments_customer_created_at_id", "customer_id", "created_at", "id"),
+        Index("ix_shipments_agent_created_at_id", "agent_id", "created_at", "id"),
+    )
     
     tracking_number = Column(String(20), unique=True, index=True, default=generate_tracking_number)
     
@@ -57,8 +98,83 @@ class Shipment(BaseModel):
     status = Column(Enum(ShipmentStatus), default=ShipmentStatus.CREATED, nullable=False)
     current_location = Column(String(255), nullable=True)
     
+    # Set once tracking history has been moved to the archive (see
+    # TrackingArchiveService); reads then merge the archived updates back in
+    tracking_archived_at = Column(DateTime, nullable=True)
+    
+    # Latest tracking update, denormalized for batch status reads; kept in
+    # step by TrackingRepository.create (see record_tracking)
+    last_tracking_status = Column(String(50), nullable=True)
+    last_tracking_at = Column(DateTime, nullable=True)
+    last_tracking_location = Column(String(255), nullable=True)
+    
     # Tracking updates relationship
-    tracking_updates = relationship("TrackingUpdate", back_populates="shipment", cascade="all, delete-orphan")
+    # Lazy by default; repositories eager-load it (selectinload) where responses need it
+    tracking_updates = relationship(
+        "TrackingUpdate",
+        back_populates="shipment",
+        cascade="all, delete-orphan",
+        order_by="TrackingUpdate.created_at"
+    )
+    
+    def record_tracking(self, tracking_update) -> None:
+        """Make `tracking_update` the latest-tracking snapshot unless a newer one is recorded"""
+        if self.last_tracking_at is not None and tracking_update.created_at < self.last_tracking_at:
+            return
+        self.last_tracking_status = tracking_update.status
+        self.last_tracking_at = tracking_update.created_at
+        self.last_tracking_location = tracking_update.location
+    
+    @property
+    def occupied_hub_id(self):
+        """Hub whose load this shipment counts toward (None unless AT_HUB at a known hub)"""
+        return self.current_hub_id if self.status == ShipmentStatus.AT_HUB else None
     
     def __repr__(self):
         return f"<Shipment(id={self.id}, tracking_number={self.tracking_number}, status={self.status})>"
+
+
+# Address/description search (see ShipmentRepository.search). The same
+# structures are added to existing databases by the shipment search migration.
+# PostgreSQL: a generated tsvector with a GIN index, plus pg_trgm GIN indexes
+# for partial (ILIKE) matches.
+SHIPMENT_SEARCH_DDL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE shipments ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(source_address, '') || ' ' || "
+    "coalesce(destination_address, '') || ' ' || coalesce(description, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_shipments_search_vector ON shipments USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_shipments_source_address_trgm ON shipments USING gin (source_address gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_shipments_destination_address_trgm ON shipments USING gin (destination_address gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_shipments_description_trgm ON shipments USING gin (description gin_trgm_ops)",
+]
+
+# SQLite: an external-content FTS5 table (trigram tokenizer, so substrings
+# match) kept in sync with shipments by triggers.
+SHIPMENT_SEARCH_DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS shipments_fts USING fts5("
+    "source_address, destination_address, description, "
+    "content='shipments', content_rowid='rowid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS shipments_fts_insert AFTER INSERT ON shipments BEGIN "
+    "INSERT INTO shipments_fts(rowid, source_address, destination_address, description) "
+    "VALUES (new.rowid, new.source_address, new.destination_address, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS shipments_fts_delete AFTER DELETE ON shipments BEGIN "
+    "INSERT INTO shipments_fts(shipments_fts, rowid, source_address, destination_address, description) "
+    "VALUES ('delete', old.rowid, old.source_address, old.destination_address, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS shipments_fts_update "
+    "AFTER UPDATE OF source_address, destination_address, description ON shipments BEGIN "
+    "INSERT INTO shipments_fts(shipments_fts, rowid, source_address, destination_address, description) "
+    "VALUES ('delete', old.rowid, old.source_address, old.destination_address, old.description); "
+    "INSERT INTO shipments_fts(rowid, source_address, destination_address, description) "
+    "VALUES (new.rowid, new.source_address, new.destination_address, new.description); END",
+]
+
+for statement in SHIPMENT_SEARCH_DDL_POSTGRESQL:
+    event.listen(Shipment.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SHIPMENT_SEARCH_DDL_SQLITE:
+    event.listen(Shipment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Shipment.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS shipments_fts").execute_if(dialect="sqlite")
+)
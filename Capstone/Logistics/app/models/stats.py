@@ -0,0 +1,56 @@
+"""
+Shipment statistics model - incrementally maintained daily counters
+"""
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, text
+from .types import GUID
+from ..core.database import Base
+
+
+def _counter():
+    return Column(Integer, default=0, server_default=text("0"), nullable=False)
+
+
+class ShipmentDailyStats(Base):
+    """
+    Per-day shipment counters, keyed by the (UTC) creation day.
+    
+    `total` counts shipments created that day; each status column counts
+    how many of them are currently in that status. Rows are updated in the
+    same transaction as the shipment writes that change them.
+    """
+    __tablename__ = "shipment_daily_stats"
+    
+    day = Column(Date, primary_key=True)
+    total = _counter()
+    
+    # One column per ShipmentStatus value
+    created = _counter()
+    picked_up = _counter()
+    in_transit = _counter()
+    at_hub = _counter()
+    out_for_delivery = _counter()
+    delivered = _counter()
+    cancelled = _counter()
+    returned = _counter()
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ShipmentDailyStats(day={self.day}, total={self.total})>"
+
+
+class HubLoad(Base):
+    """
+    Per-hub occupancy: shipments currently at each hub (status AT_HUB with
+    current_hub_id set). Updated in the same transaction as the shipment
+    writes that move shipments in or out.
+    """
+    __tablename__ = "hub_loads"
+    
+    hub_id = Column(GUID(), ForeignKey("hubs.id", ondelete="CASCADE"), primary_key=True)
+    at_hub = _counter()
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<HubLoad(hub_id={self.hub_id}, at_hub={self.at_hub})>"
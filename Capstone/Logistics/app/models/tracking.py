@@ -1,15 +1,29 @@
 """
 Tracking update model
 """
-from sqlalchemy import Column, String, Text, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, DateTime, String, Text, ForeignKey, Index, event, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 from .types import GUID
+from ..core.partitioning import ensure_monthly_partitions
+from ..utils.ids import uuid7
 
 
 class TrackingUpdate(BaseModel):
     """Tracking update model for shipment history"""
     __tablename__ = "tracking_updates"
+    __table_args__ = (
+        # History reads: WHERE shipment_id = ? ORDER BY created_at DESC
+        # (on PostgreSQL created once per monthly partition)
+        Index("ix_tracking_updates_shipment_id_created_at", "shipment_id", text("created_at DESC")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    
+    # Primary key (id, created_at): a partitioned table's keys must include
+    # the partition column
+    id = Column(GUID(), primary_key=True, default=uuid7)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
     
     shipment_id = Column(GUID(), ForeignKey("shipments.id"), nullable=False)
     shipment = relationship("Shipment", back_populates="tracking_updates")
@@ -20,3 +34,9 @@ class TrackingUpdate(BaseModel):
     
     def __repr__(self):
         return f"<TrackingUpdate(id={self.id}, shipment_id={self.shipment_id}, status={self.status})>"
+
+
+@event.listens_for(TrackingUpdate.__table__, "after_create")
+def _create_partitions(target, connection, **kw):
+    """Give a newly created partitioned table its initial partitions"""
+    ensure_monthly_partitions(connection, target.name)
@@ -2,43 +2,98 @@
 Custom SQLAlchemy types for cross-database compatibility
 """
 import uuid
-from sqlalchemy import TypeDecorator, CHAR, String
+from typing import Optional
+from sqlalchemy import TypeDecorator, CHAR, BINARY
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from ..core.config import settings
+
+_UUID = uuid.UUID
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+_SAFE_UNKNOWN = uuid.SafeUUID.unknown
+
+
+def _uuid_from_int(value: int) -> uuid.UUID:
+    """Build a UUID from its 128-bit integer without re-validating it"""
+    result = _new_object(_UUID)
+    _set_attribute(result, "int", value)
+    _set_attribute(result, "is_safe", _SAFE_UNKNOWN)
+    return result
 
 
 class GUID(TypeDecorator):
     """Platform-independent GUID type.
     
-    Uses PostgreSQL's UUID type when available, otherwise uses
-    CHAR(36), storing as stringified hex values.
+    Uses PostgreSQL's UUID type when available. Elsewhere stores either
+    CHAR(36) hex strings (default) or, with `binary=True` or
+    GUID_STORAGE=binary, the 16 raw bytes in BINARY(16), which halves
+    key and index size and skips string formatting/parsing per value.
     """
     impl = CHAR
     cache_ok = True
 
+    def __init__(self, binary: Optional[bool] = None):
+        super().__init__()
+        self.binary = settings.GUID_STORAGE == "binary" if binary is None else binary
+
     def load_dialect_impl(self, dialect):
         if dialect.name == 'postgresql':
             return dialect.type_descriptor(PG_UUID(as_uuid=True))
+        elif self.binary:
+            return dialect.type_descriptor(BINARY(16))
         else:
             return dialect.type_descriptor(CHAR(36))
 
     def process_bind_param(self, value, dialect):
-        if value is None:
+        if value is None or dialect.name == 'postgresql':
             return value
-        elif dialect.name == 'postgresql':
-            return value
-        else:
-            if isinstance(value, uuid.UUID):
-                return str(value)
-            else:
-                return str(uuid.UUID(value))
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(value)
+        return value.bytes if self.binary else str(value)
 
     def process_result_value(self, value, dialect):
-        if value is None:
-            return value
-        elif dialect.name == 'postgresql':
+        if value is None or dialect.name == 'postgresql' or isinstance(value, uuid.UUID):
             return value
+        if self.binary:
+            return uuid.UUID(bytes=bytes(value))
+        return uuid.UUID(value)
+
+    def bind_processor(self, dialect):
+        # Per-dialect closures instead of process_bind_param, so each value
+        # costs one type check (no dialect lookups or re-parsing of UUIDs)
+        if dialect.name == 'postgresql':
+            return super().bind_processor(dialect)
+
+        if self.binary:
+            def process(value):
+                if value is None:
+                    return None
+                if value.__class__ is _UUID:
+                    return value.int.to_bytes(16, "big")
+                return (value if isinstance(value, _UUID) else _UUID(value)).bytes
+        else:
+            def process(value):
+                if value is None:
+                    return None
+                if value.__class__ is _UUID:
+                    return str(value)
+                return str(value if isinstance(value, _UUID) else _UUID(value))
+        return process
+
+    def result_processor(self, dialect, coltype):
+        if dialect.name == 'postgresql':
+            return super().result_processor(dialect, coltype)
+
+        # Values read back were written by bind_processor, so they are
+        # decoded directly rather than through uuid.UUID's validation
+        if self.binary:
+            def process(value):
+                if value is None:
+                    return None
+                return _uuid_from_int(int.from_bytes(value, "big"))
         else:
-            if isinstance(value, uuid.UUID):
-                return value
-            else:
-                return uuid.UUID(value)
+            def process(value):
+                if value is None:
+                    return None
+                return _uuid_from_int(int(value.replace("-", ""), 16))
+        return process
@@ -1,12 +1,16 @@
 """
 Hub repository - Data access layer for hubs
 """
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 from uuid import UUID
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.hub import Hub
+from ..core.metrics import instrument_repository
 
 
+@instrument_repository
 class HubRepository:
     """Repository for Hub model operations"""
     
@@ -16,14 +20,27 @@ class HubRepository:
     def create(self, hub: Hub) -> Hub:
         """Create a new hub"""
         self.db.add(hub)
-        self.db.commit()
-        self.db.refresh(hub)
+        self.db.flush()
         return hub
     
     def get_by_id(self, hub_id: UUID) -> Optional[Hub]:
         """Get hub by ID"""
         return self.db.query(Hub).filter(Hub.id == hub_id).first()
     
+    def lock_existing_ids(self, hub_ids: Iterable[UUID]) -> Set[UUID]:
+        """
+        The ids among `hub_ids` that exist, share-locked until commit.
+        
+        The key-share lock makes a concurrent hub delete wait until the
+        shipments referencing the hub are written (PostgreSQL; other
+        dialects ignore it).
+        """
+        hub_ids = list(hub_ids)
+        if not hub_ids:
+            return set()
+        query = select(Hub.id).where(Hub.id.in_(hub_ids)).with_for_update(read=True, key_share=True)
+        return set(self.db.execute(query).scalars())
+    
     def get_by_name(self, hub_name: str) -> Optional[Hub]:
         """Get hub by name"""
         return self.db.query(Hub).filter(Hub.hub_name == hub_name).first()
@@ -39,6 +56,10 @@ class HubRepository:
             query = query.filter(Hub.is_active == True)
         return query.order_by(Hub.hub_name).offset(skip).limit(limit).all()
     
+    def list_all(self) -> List[Hub]:
+        """Get every hub (for the hub registry)"""
+        return self.db.query(Hub).order_by(Hub.hub_name).all()
+    
     def count(self, active_only: bool = False) -> int:
         """Count hubs"""
         query = self.db.query(Hub)
@@ -51,12 +72,70 @@ class HubRepository:
         for key, value in update_data.items():
             if value is not None:
                 setattr(hub, key, value)
-        self.db.commit()
-        self.db.refresh(hub)
+        self.db.flush()
         return hub
     
     def delete(self, hub: Hub) -> bool:
         """Delete a hub"""
         self.db.delete(hub)
-        self.db.commit()
+        self.db.flush()
+        return True
+
+
+@instrument_repository
+class AsyncHubRepository:
+    """Async repository for Hub model operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(self, hub: Hub) -> Hub:
+        """Create a new hub"""
+        self.db.add(hub)
+        await self.db.flush()
+        return hub
+    
+    async def get_by_id(self, hub_id: UUID) -> Optional[Hub]:
+        """Get hub by ID"""
+        result = await self.db.execute(select(Hub).where(Hub.id == hub_id))
+        return result.scalars().first()
+    
+    async def get_by_name(self, hub_name: str) -> Optional[Hub]:
+        """Get hub by name"""
+        result = await self.db.execute(select(Hub).where(Hub.hub_name == hub_name))
+        return result.scalars().first()
+    
+    async def get_by_city(self, city: str) -> List[Hub]:
+        """Get all hubs in a city"""
+        result = await self.db.execute(select(Hub).where(Hub.city == city))
+        return list(result.scalars().all())
+    
+    async def get_all(self, skip: int = 0, limit: int = 100, active_only: bool = False) -> List[Hub]:
+        """Get all hubs with optional filtering"""
+        query = select(Hub)
+        if active_only:
+            query = query.where(Hub.is_active == True)
+        result = await self.db.execute(query.order_by(Hub.hub_name).offset(skip).limit(limit))
+        return list(result.scalars().all())
+    
+    async def count(self, active_only: bool = False) -> int:
+        """Count hubs"""
+        query = select(func.count(Hub.id))
+        if active_only:
+            query = query.where(Hub.is_active == True)
+        result = await self.db.execute(query)
+        return result.scalar_one()
+    
+    async def update(self, hub: Hub, update_data: dict) -> Hub:
+        """Update hub fields"""
+        for key, value in update_data.items():
+            if value is not None:
+                setattr(hub, key, value)
+        await self.db.flush()
+        return hub
+    
+    async def delete(self, hub: Hub) -> bool:
+        """Delete a hub"""
+        await self.db.delete(hub)
+        await self.db.flush()
         return True
@@ -1,14 +1,29 @@
 """
 Shipment repository - Data access layer for shipments
 """
-from typing import Optional, List
+from typing import Iterator, Optional, List, Sequence, Tuple
 from uuid import UUID
-from datetime import datetime, date
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from datetime import datetime
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Double, Row, cast, column, func, literal, literal_column, or_, select, table, text, tuple_, update
 from ..models.shipment import Shipment, ShipmentStatus
+from ..models.tracking import TrackingUpdate
+from ..core.metrics import instrument_repository
 
 
+def _validator_query():
+    """SELECT (updated_at, live tracking update count) of a shipment, for conditional GETs"""
+    tracking_count = (
+        select(func.count())
+        .select_from(TrackingUpdate)
+        .where(TrackingUpdate.shipment_id == Shipment.id)
+        .scalar_subquery()
+    )
+    return select(Shipment.updated_at, tracking_count.label("tracking_count"))
+
+
+@instrument_repository
 class ShipmentRepository:
     """Repository for Shipment model operations"""
     
@@ -18,17 +33,50 @@ class ShipmentRepository:
     def create(self, shipment: Shipment) -> Shipment:
         """Create a new shipment"""
         self.db.add(shipment)
-        self.db.commit()
-        self.db.refresh(shipment)
+        self.db.flush()
         return shipment
     
-    def get_by_id(self, shipment_id: UUID) -> Optional[Shipment]:
-        """Get shipment by ID"""
-        return self.db.query(Shipment).filter(Shipment.id == shipment_id).first()
+    def get_by_id(self, shipment_id: UUID, with_tracking: bool = False) -> Optional[Shipment]:
+        """
+        Get shipment by ID.
+        
+        Uses the session identity map, so repeated lookups within a request
+        do not hit the database. `with_tracking` eager-loads the history in
+        one extra SELECT instead of a lazy load on first access.
+        """
+        options = [selectinload(Shipment.tracking_updates)] if with_tracking else None
+        return self.db.get(Shipment, shipment_id, options=options)
+    
+    def get_by_ids(self, shipment_ids: Sequence[UUID]) -> List[Shipment]:
+        """Get many shipments by ID in one query (unordered; unknown ids are skipped)"""
+        if not shipment_ids:
+            return []
+        return list(self.db.execute(
+            select(Shipment).where(Shipment.id.in_(shipment_ids))
+        ).scalars())
+    
+    def get_validator(self, shipment_id: UUID) -> Optional[Row]:
+        """(updated_at, tracking_count) of a shipment, without loading it"""
+        return self.db.execute(_validator_query().where(Shipment.id == shipment_id)).first()
     
-    def get_by_tracking_number(self, tracking_number: str) -> Optional[Shipment]:
-        """Get shipment by tracking number"""
-        return self.db.query(Shipment).filter(Shipment.tracking_number == tracking_number).first()
+    def get_validator_by_tracking_number(self, tracking_number: str) -> Optional[Row]:
+        """(updated_at, tracking_count) of a shipment by tracking number, without loading it"""
+        return self.db.execute(
+            _validator_query().where(Shipment.tracking_number == tracking_number)
+        ).first()
+    
+    def tracking_number_exists(self, tracking_number: str) -> bool:
+        """Check whether a shipment has this tracking number (index-only lookup)"""
+        return self.db.execute(
+            select(Shipment.id).where(Shipment.tracking_number == tracking_number).limit(1)
+        ).first() is not None
+    
+    def get_by_tracking_number(self, tracking_number: str, with_tracking: bool = False) -> Optional[Shipment]:
+        """Get shipment by tracking number (optionally with tracking history)"""
+        query = self.db.query(Shipment)
+        if with_tracking:
+            query = query.options(selectinload(Shipment.tracking_updates))
+        return query.filter(Shipment.tracking_number == tracking_number).first()
     
     def get_by_customer(self, customer_id: UUID, skip: int = 0, limit: int = 100) -> List[Shipment]:
         """Get all shipments for a customer"""
@@ -60,41 +108,305 @@ class ShipmentRepository:
             query = query.filter(Shipment.status == status)
         return query.count()
     
-    def count_today(self, status: Optional[ShipmentStatus] = None) -> int:
-        """Count today's shipments"""
-        today = date.today()
-        query = self.db.query(Shipment).filter(
-            func.date(Shipment.created_at) == today
-        )
+    def get_page(
+        self,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 100,
+        customer_id: Optional[UUID] = None,
+        agent_id: Optional[UUID] = None,
+        status: Optional[ShipmentStatus] = None
+    ) -> List[Shipment]:
+        """
+        Get a page of shipments ordered by (created_at, id) descending.
+        
+        `after` is the (created_at, id) of the last row of the previous page;
+        rows are located by index seek rather than OFFSET.
+        """
+        query = self.db.query(Shipment)
+        if customer_id:
+            query = query.filter(Shipment.customer_id == customer_id)
+        if agent_id:
+            query = query.filter(Shipment.agent_id == agent_id)
         if status:
             query = query.filter(Shipment.status == status)
-        return query.count()
+        if after:
+            created_at, shipment_id = after
+            query = query.filter(
+                tuple_(Shipment.created_at, Shipment.id) < tuple_(
+                    literal(created_at, Shipment.created_at.type),
+                    literal(shipment_id, Shipment.id.type)
+                )
+            )
+        return query.order_by(
+            Shipment.created_at.desc(), Shipment.id.desc()
+        ).limit(limit).all()
+    
+    def estimate_count(
+        self,
+        customer_id: Optional[UUID] = None,
+        agent_id: Optional[UUID] = None,
+        status: Optional[ShipmentStatus] = None
+    ) -> int:
+        """
+        Approximate shipment count.
+        
+        For the unfiltered table on PostgreSQL this reads the planner
+        statistics instead of scanning; otherwise it falls back to COUNT.
+        """
+        if not (customer_id or agent_id or status) and self.db.bind.dialect.name == "postgresql":
+            estimate = self.db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+                {"table": Shipment.__tablename__}
+            ).scalar()
+            if estimate is not None and estimate >= 0:
+                return estimate
+        query = self.db.query(func.count(Shipment.id))
+        if customer_id:
+            query = query.filter(Shipment.customer_id == customer_id)
+        if agent_id:
+            query = query.filter(Shipment.agent_id == agent_id)
+        if status:
+            query = query.filter(Shipment.status == status)
+        return query.scalar()
+    
+    def search(
+        self,
+        query: str,
+        after: Optional[Tuple[float, UUID]] = None,
+        limit: int = 20
+    ) -> List[Tuple[Shipment, float]]:
+        """
+        Search addresses and descriptions, best matches first.
+        
+        Returns (shipment, score) pairs ordered by (score, id) descending;
+        `after` is the (score, id) of the last row of the previous page.
+        PostgreSQL ranks the generated search_vector (ts_rank_cd) and
+        pg_trgm similarity; SQLite ranks its FTS5 index with bm25.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            ranked = self._search_postgresql(query)
+        else:
+            ranked = self._search_sqlite(query)
+        
+        statement = select(Shipment, ranked.c.score).join(ranked, Shipment.id == ranked.c.id)
+        if after:
+            score, shipment_id = after
+            statement = statement.where(
+                tuple_(ranked.c.score, ranked.c.id) < tuple_(
+                    literal(score, Double), literal(shipment_id, Shipment.id.type)
+                )
+            )
+        statement = statement.order_by(ranked.c.score.desc(), ranked.c.id.desc()).limit(limit)
+        return [(shipment, score) for shipment, score in self.db.execute(statement).all()]
+    
+    @staticmethod
+    def _search_postgresql(query: str):
+        vector = literal_column("shipments.search_vector")
+        ts_query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), query)
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        # ts_rank_cd and similarity return real (float4); widened to double
+        # precision, the score round-trips exactly through a Python float
+        # cursor, so keyset pages neither skip nor repeat rows
+        score = cast(func.greatest(
+            func.ts_rank_cd(vector, ts_query),
+            func.similarity(Shipment.source_address, query),
+            func.similarity(Shipment.destination_address, query),
+            func.similarity(func.coalesce(Shipment.description, ""), query)
+        ), Double)
+        return select(Shipment.id.label("id"), score.label("score")).where(
+            or_(
+                vector.op("@@")(ts_query),
+                Shipment.source_address.ilike(pattern, escape="\\"),
+                Shipment.destination_address.ilike(pattern, escape="\\"),
+                Shipment.description.ilike(pattern, escape="\\")
+            )
+        ).subquery()
+    
+    @staticmethod
+    def _search_sqlite(query: str):
+        fts = table("shipments_fts", column("rowid"))
+        # Quoted as one FTS5 phrase: with the trigram tokenizer this is a
+        # substring match and user input cannot inject query syntax
+        phrase = '"' + query.replace('"', '""') + '"'
+        return select(
+            Shipment.id.label("id"),
+            (-func.bm25(literal_column("shipments_fts"))).label("score")
+        ).select_from(
+            fts.join(Shipment, fts.c.rowid == literal_column("shipments.rowid"))
+        ).where(
+            literal_column("shipments_fts").op("MATCH")(phrase)
+        ).subquery()
     
-    def count_by_status_today(self) -> dict:
-        """Get count of shipments by status for today"""
-        today = date.today()
-        result = self.db.query(
-            Shipment.status, func.count(Shipment.id)
-        ).filter(
-            func.date(Shipment.created_at) == today
-        ).group_by(Shipment.status).all()
-        return {status.value: count for status, count in result}
+    def get_latest_tracking(self, shipment_ids: Sequence[UUID]) -> List[Row]:
+        """Latest-tracking snapshot rows of the given shipments, in one query"""
+        if not shipment_ids:
+            return []
+        return list(self.db.execute(
+            select(
+                Shipment.id,
+                Shipment.tracking_number,
+                Shipment.status,
+                Shipment.last_tracking_status,
+                Shipment.last_tracking_at,
+                Shipment.last_tracking_location
+            ).where(Shipment.id.in_(shipment_ids))
+        ))
     
     def update(self, shipment: Shipment, update_data: dict) -> Shipment:
         """Update shipment fields"""
         for key, value in update_data.items():
             if value is not None:
                 setattr(shipment, key, value)
-        self.db.commit()
-        self.db.refresh(shipment)
+        self.db.flush()
         return shipment
     
     def delete(self, shipment: Shipment) -> bool:
         """Delete a shipment"""
         self.db.delete(shipment)
-        self.db.commit()
+        self.db.flush()
         return True
     
+    def mark_tracking_archived(self, shipment_ids: Sequence[UUID], archived_at: datetime) -> None:
+        """Record that the shipments' tracking history has (partly) been archived"""
+        self.db.execute(
+            update(Shipment)
+            .where(Shipment.id.in_(shipment_ids))
+            # Keep updated_at: archiving does not change the shipment
+            .values(tracking_archived_at=archived_at, updated_at=Shipment.updated_at),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.flush()
+    
     def can_cancel(self, shipment: Shipment) -> bool:
         """Check if shipment can be cancelled"""
         return shipment.status in [ShipmentStatus.CREATED, ShipmentStatus.PICKED_UP]
+    
+    
+    def iter_export_rows(
+        self,
+        columns: List[str],
+        status: Optional[ShipmentStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Sequence[Row]]:
+        """
+        Stream shipment rows in batches of `batch_size` for export.
+        
+        Selects plain columns (no ORM objects, nothing kept in the identity
+        map) with yield_per, which uses a server-side cursor on PostgreSQL,
+        so memory stays at one batch whatever the export size.
+        """
+        query = select(*[getattr(Shipment, column) for column in columns])
+        if status:
+            query = query.where(Shipment.status == status)
+        if created_from:
+            query = query.where(Shipment.created_at >= created_from)
+        if created_to:
+            query = query.where(Shipment.created_at < created_to)
+        query = query.order_by(Shipment.created_at, Shipment.id).execution_options(yield_per=batch_size)
+        return self.db.execute(query).partitions()
+
+
+@instrument_repository
+class AsyncShipmentRepository:
+    """Async repository for Shipment model operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(self, shipment: Shipment) -> Shipment:
+        """Create a new shipment"""
+        self.db.add(shipment)
+        await self.db.flush()
+        return shipment
+    
+    async def get_by_id(self, shipment_id: UUID) -> Optional[Shipment]:
+        """Get shipment by ID (with tracking updates loaded)"""
+        result = await self.db.execute(
+            select(Shipment)
+            .options(selectinload(Shipment.tracking_updates))
+            .where(Shipment.id == shipment_id)
+        )
+        return result.scalars().first()
+    
+    async def get_validator_by_tracking_number(self, tracking_number: str) -> Optional[Row]:
+        """(updated_at, tracking_count) of a shipment by tracking number, without loading it"""
+        result = await self.db.execute(
+            _validator_query().where(Shipment.tracking_number == tracking_number)
+        )
+        return result.first()
+    
+    async def tracking_number_exists(self, tracking_number: str) -> bool:
+        """Check whether a shipment has this tracking number (index-only lookup)"""
+        result = await self.db.execute(
+            select(Shipment.id).where(Shipment.tracking_number == tracking_number).limit(1)
+        )
+        return result.first() is not None
+    
+    async def get_by_tracking_number(self, tracking_number: str) -> Optional[Shipment]:
+        """Get shipment by tracking number (with tracking updates loaded)"""
+        result = await self.db.execute(
+            select(Shipment)
+            .options(selectinload(Shipment.tracking_updates))
+            .where(Shipment.tracking_number == tracking_number)
+        )
+        return result.scalars().first()
+    
+    async def get_by_customer(self, customer_id: UUID, skip: int = 0, limit: int = 100) -> List[Shipment]:
+        """Get all shipments for a customer"""
+        result = await self.db.execute(
+            select(Shipment).where(
+                Shipment.customer_id == customer_id
+            ).order_by(Shipment.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def count_by_customer(self, customer_id: UUID) -> int:
+        """Count shipments for a customer"""
+        result = await self.db.execute(
+            select(func.count(Shipment.id)).where(Shipment.customer_id == customer_id)
+        )
+        return result.scalar_one()
+    
+    async def get_by_agent(self, agent_id: UUID, skip: int = 0, limit: int = 100) -> List[Shipment]:
+        """Get all shipments assigned to an agent"""
+        result = await self.db.execute(
+            select(Shipment).where(
+                Shipment.agent_id == agent_id
+            ).order_by(Shipment.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def get_all(self, skip: int = 0, limit: int = 100, status: Optional[ShipmentStatus] = None) -> List[Shipment]:
+        """Get all shipments with optional filtering"""
+        query = select(Shipment)
+        if status:
+            query = query.where(Shipment.status == status)
+        result = await self.db.execute(
+            query.order_by(Shipment.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    async def count(self, status: Optional[ShipmentStatus] = None) -> int:
+        """Count shipments with optional status filter"""
+        query = select(func.count(Shipment.id))
+        if status:
+            query = query.where(Shipment.status == status)
+        result = await self.db.execute(query)
+        return result.scalar_one()
+    
+    async def update(self, shipment: Shipment, update_data: dict) -> Shipment:
+        """Update shipment fields"""
+        for key, value in update_data.items():
+            if value is not None:
+                setattr(shipment, key, value)
+        await self.db.flush()
+        return shipment
+    
+    async def delete(self, shipment: Shipment) -> bool:
+        """Delete a shipment"""
+        await self.db.delete(shipment)
+        await self.db.flush()
+        return True
@@ -0,0 +1,219 @@
+"""
+Stats repository - Data access layer for materialized shipment statistics
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import and_, delete, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from ..models.shipment import Shipment, ShipmentStatus
+from ..models.stats import HubLoad, ShipmentDailyStats
+from ..core.metrics import instrument_repository
+
+COUNTER_COLUMNS = ["total"] + [status.value for status in ShipmentStatus]
+
+
+@instrument_repository
+class StatsRepository:
+    """Repository for ShipmentDailyStats operations"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get(self, day: date) -> Optional[ShipmentDailyStats]:
+        """Get the counters for one day (primary-key read)"""
+        return self.db.get(ShipmentDailyStats, day)
+    
+    def get_range(self, start: date, end: date) -> List[ShipmentDailyStats]:
+        """Get the counters for every day in [start, end] that has any"""
+        return self.db.query(ShipmentDailyStats).filter(
+            ShipmentDailyStats.day >= start,
+            ShipmentDailyStats.day <= end
+        ).order_by(ShipmentDailyStats.day).all()
+    
+    def increment(self, day: date, deltas: Dict[str, int]) -> None:
+        """
+        Atomically add deltas to a day's counters, creating the row if needed.
+        
+        Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite, so
+        concurrent writers never lose increments.
+        """
+        deltas = {column: value for column, value in deltas.items() if value}
+        if not deltas:
+            return
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert_fn(ShipmentDailyStats).values(
+                day=day, updated_at=datetime.utcnow(), **deltas
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ShipmentDailyStats.day],
+                set_={
+                    "updated_at": stmt.excluded.updated_at,
+                    **{
+                        column: getattr(ShipmentDailyStats, column) + stmt.excluded[column]
+                        for column in deltas
+                    }
+                }
+            )
+            self.db.execute(stmt)
+            return
+        
+        result = self.db.execute(
+            update(ShipmentDailyStats)
+            .where(ShipmentDailyStats.day == day)
+            .values(**{
+                column: getattr(ShipmentDailyStats, column) + value
+                for column, value in deltas.items()
+            })
+        )
+        if result.rowcount == 0:
+            self.db.execute(insert(ShipmentDailyStats).values(day=day, **deltas))
+    
+    def record_created(self, day: date, count: int = 1) -> None:
+        """Count newly created shipments"""
+        self.increment(day, {"total": count, ShipmentStatus.CREATED.value: count})
+    
+    def record_transition(self, day: date, old_status: ShipmentStatus, new_status: ShipmentStatus) -> None:
+        """Move one shipment between status counters"""
+        if old_status == new_status:
+            return
+        self.increment(day, {old_status.value: -1, new_status.value: 1})
+    
+    def record_transitions(self, transitions: Iterable[Tuple[date, ShipmentStatus, ShipmentStatus]]) -> None:
+        """Move many shipments between status counters, one upsert per day"""
+        deltas: Dict[date, Dict[str, int]] = {}
+        for day, old_status, new_status in transitions:
+            if old_status == new_status:
+                continue
+            day_deltas = deltas.setdefault(day, {})
+            day_deltas[old_status.value] = day_deltas.get(old_status.value, 0) - 1
+            day_deltas[new_status.value] = day_deltas.get(new_status.value, 0) + 1
+        for day in sorted(deltas):
+            self.increment(day, deltas[day])
+    
+    def record_deleted(self, day: date, status: ShipmentStatus) -> None:
+        """Remove one shipment from the counters"""
+        self.increment(day, {"total": -1, status.value: -1})
+    
+    def rebuild(self, start: date, end: date) -> int:
+        """
+        Recompute the counters for [start, end] from the shipments table.
+        
+        Used to backfill or repair the statistics. Filters on a created_at
+        range so the (created_at, id) index can be used.
+        """
+        rows = self.db.query(
+            func.date(Shipment.created_at), Shipment.status, func.count(Shipment.id)
+        ).filter(
+            Shipment.created_at >= datetime.combine(start, time.min),
+            Shipment.created_at < datetime.combine(end + timedelta(days=1), time.min)
+        ).group_by(func.date(Shipment.created_at), Shipment.status).all()
+        
+        counters: Dict[date, Dict[str, int]] = {}
+        for day, status, count in rows:
+            if isinstance(day, str):
+                day = date.fromisoformat(day)
+            day_counters = counters.setdefault(day, {column: 0 for column in COUNTER_COLUMNS})
+            day_counters[status.value] += count
+            day_counters["total"] += count
+        
+        self.db.execute(
+            delete(ShipmentDailyStats).where(and_(
+                ShipmentDailyStats.day >= start,
+                ShipmentDailyStats.day <= end
+            ))
+        )
+        if counters:
+            now = datetime.utcnow()
+            self.db.execute(insert(ShipmentDailyStats), [
+                {"day": day, "updated_at": now, **day_counters}
+                for day, day_counters in counters.items()
+            ])
+        return len(counters)
+    
+    def get_hub_load(self, hub_id: UUID) -> int:
+        """Shipments currently at a hub (primary-key read)"""
+        load = self.db.get(HubLoad, hub_id)
+        return load.at_hub if load else 0
+    
+    def get_hub_loads(self, hub_ids: Optional[Sequence[UUID]] = None) -> Dict[UUID, int]:
+        """Shipments currently at each hub (all hubs, or `hub_ids`); hubs without a row are omitted"""
+        query = self.db.query(HubLoad.hub_id, HubLoad.at_hub)
+        if hub_ids is not None:
+            query = query.filter(HubLoad.hub_id.in_(hub_ids))
+        return {hub_id: at_hub for hub_id, at_hub in query.all()}
+    
+    def adjust_hub_loads(self, deltas: Dict[UUID, int]) -> None:
+        """
+        Atomically add deltas to hub loads, creating rows as needed.
+        
+        One multi-row INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and
+        SQLite.
+        """
+        deltas = {hub_id: value for hub_id, value in deltas.items() if value}
+        if not deltas:
+            return
+        
+        now = datetime.utcnow()
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert_fn(HubLoad).values([
+                {"hub_id": hub_id, "at_hub": value, "updated_at": now}
+                for hub_id, value in sorted(deltas.items(), key=lambda item: str(item[0]))
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[HubLoad.hub_id],
+                set_={
+                    "at_hub": HubLoad.at_hub + stmt.excluded.at_hub,
+                    "updated_at": stmt.excluded.updated_at
+                }
+            )
+            self.db.execute(stmt)
+            return
+        
+        for hub_id, value in deltas.items():
+            result = self.db.execute(
+                update(HubLoad)
+                .where(HubLoad.hub_id == hub_id)
+                .values(at_hub=HubLoad.at_hub + value, updated_at=now)
+            )
+            if result.rowcount == 0:
+                self.db.execute(insert(HubLoad).values(hub_id=hub_id, at_hub=value, updated_at=now))
+    
+    def record_hub_moves(self, moves: Iterable[Tuple[Optional[UUID], Optional[UUID]]]) -> None:
+        """Move shipments between hub loads ((old hub, new hub); None for no hub), one statement"""
+        deltas: Dict[UUID, int] = {}
+        for old_hub_id, new_hub_id in moves:
+            if old_hub_id == new_hub_id:
+                continue
+            if old_hub_id is not None:
+                deltas[old_hub_id] = deltas.get(old_hub_id, 0) - 1
+            if new_hub_id is not None:
+                deltas[new_hub_id] = deltas.get(new_hub_id, 0) + 1
+        self.adjust_hub_loads(deltas)
+    
+    def delete_hub_load(self, hub_id: UUID) -> None:
+        """Drop a deleted hub's counter"""
+        self.db.execute(delete(HubLoad).where(HubLoad.hub_id == hub_id))
+    
+    def rebuild_hub_loads(self) -> int:
+        """Recompute every hub load from the shipments table (backfill or repair)"""
+        rows = self.db.query(Shipment.current_hub_id, func.count(Shipment.id)).filter(
+            Shipment.status == ShipmentStatus.AT_HUB,
+            Shipment.current_hub_id.isnot(None)
+        ).group_by(Shipment.current_hub_id).all()
+        
+        self.db.execute(delete(HubLoad))
+        if rows:
+            now = datetime.utcnow()
+            self.db.execute(insert(HubLoad), [
+                {"hub_id": hub_id, "at_hub": count, "updated_at": now}
+                for hub_id, count in rows
+            ])
+        return len(rows)
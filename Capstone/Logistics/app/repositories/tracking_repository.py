@@ -1,25 +1,58 @@
 """
 Tracking repository - Data access layer for tracking updates
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Mapping, Optional, Sequence
 from uuid import UUID
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models.shipment import Shipment, ShipmentStatus
 from ..models.tracking import TrackingUpdate
+from ..core.metrics import instrument_repository
 
 
+@instrument_repository
 class TrackingRepository:
     """Repository for TrackingUpdate model operations"""
     
     def __init__(self, db: Session):
         self.db = db
     
-    def create(self, tracking_update: TrackingUpdate) -> TrackingUpdate:
-        """Create a new tracking update"""
+    def create(self, tracking_update: TrackingUpdate, shipment: Optional[Shipment] = None) -> TrackingUpdate:
+        """
+        Create a new tracking update and refresh the shipment's latest-tracking
+        snapshot. Pass the shipment when it is already loaded; its pending
+        changes go out in the same flush, so the snapshot adds no UPDATE.
+        """
+        if tracking_update.created_at is None:
+            tracking_update.created_at = datetime.utcnow()
+        if shipment is None:
+            shipment = self.db.get(Shipment, tracking_update.shipment_id)
+        if shipment is not None:
+            shipment.record_tracking(tracking_update)
         self.db.add(tracking_update)
-        self.db.commit()
-        self.db.refresh(tracking_update)
+        self.db.flush()
         return tracking_update
     
+    def create_many(
+        self,
+        tracking_updates: Sequence[TrackingUpdate],
+        shipments: Optional[Mapping[UUID, Shipment]] = None
+    ) -> List[TrackingUpdate]:
+        """Create many tracking updates in one flush (batched INSERT), refreshing snapshots like create"""
+        for tracking_update in tracking_updates:
+            if tracking_update.created_at is None:
+                tracking_update.created_at = datetime.utcnow()
+            shipment = (shipments or {}).get(tracking_update.shipment_id)
+            if shipment is None:
+                shipment = self.db.get(Shipment, tracking_update.shipment_id)
+            if shipment is not None:
+                shipment.record_tracking(tracking_update)
+        self.db.add_all(tracking_updates)
+        self.db.flush()
+        return list(tracking_updates)
+    
     def get_by_id(self, tracking_id: UUID) -> Optional[TrackingUpdate]:
         """Get tracking update by ID"""
         return self.db.query(TrackingUpdate).filter(TrackingUpdate.id == tracking_id).first()
@@ -30,12 +63,6 @@ class TrackingRepository:
             TrackingUpdate.shipment_id == shipment_id
         ).order_by(TrackingUpdate.created_at.desc()).all()
     
-    def get_latest_by_shipment(self, shipment_id: UUID) -> Optional[TrackingUpdate]:
-        """Get the latest tracking update for a shipment"""
-        return self.db.query(TrackingUpdate).filter(
-            TrackingUpdate.shipment_id == shipment_id
-        ).order_by(TrackingUpdate.created_at.desc()).first()
-    
     def count_by_shipment(self, shipment_id: UUID) -> int:
         """Count tracking updates for a shipment"""
         return self.db.query(TrackingUpdate).filter(
@@ -47,5 +74,93 @@ class TrackingRepository:
         count = self.db.query(TrackingUpdate).filter(
             TrackingUpdate.shipment_id == shipment_id
         ).delete()
-        self.db.commit()
+        self.db.flush()
         return count
+    
+    def get_archivable_shipment_ids(self, before: datetime, limit: int) -> List[UUID]:
+        """Delivered shipments that have tracking updates created before `before`"""
+        statement = (
+            select(TrackingUpdate.shipment_id)
+            .join(Shipment, Shipment.id == TrackingUpdate.shipment_id)
+            .where(
+                Shipment.status == ShipmentStatus.DELIVERED,
+                TrackingUpdate.created_at < before
+            )
+            .distinct()
+            .limit(limit)
+        )
+        return list(self.db.execute(statement).scalars())
+    
+    def get_by_shipment_before(self, shipment_id: UUID, before: datetime) -> List[TrackingUpdate]:
+        """Get a shipment's tracking updates created before `before`, oldest first"""
+        return list(self.db.execute(
+            select(TrackingUpdate).where(
+                TrackingUpdate.shipment_id == shipment_id,
+                TrackingUpdate.created_at < before
+            ).order_by(TrackingUpdate.created_at)
+        ).scalars())
+    
+    def delete_by_shipments_before(self, shipment_ids: Sequence[UUID], before: datetime) -> int:
+        """Delete the shipments' tracking updates created before `before`"""
+        result = self.db.execute(
+            delete(TrackingUpdate).where(
+                TrackingUpdate.shipment_id.in_(shipment_ids),
+                TrackingUpdate.created_at < before
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.flush()
+        return result.rowcount
+
+
+@instrument_repository
+class AsyncTrackingRepository:
+    """Async repository for TrackingUpdate model operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(self, tracking_update: TrackingUpdate, shipment: Optional[Shipment] = None) -> TrackingUpdate:
+        """Create a new tracking update and refresh the shipment's latest-tracking snapshot"""
+        if tracking_update.created_at is None:
+            tracking_update.created_at = datetime.utcnow()
+        if shipment is None:
+            shipment = await self.db.get(Shipment, tracking_update.shipment_id)
+        if shipment is not None:
+            shipment.record_tracking(tracking_update)
+        self.db.add(tracking_update)
+        await self.db.flush()
+        return tracking_update
+    
+    async def get_by_id(self, tracking_id: UUID) -> Optional[TrackingUpdate]:
+        """Get tracking update by ID"""
+        result = await self.db.execute(
+            select(TrackingUpdate).where(TrackingUpdate.id == tracking_id)
+        )
+        return result.scalars().first()
+    
+    async def get_by_shipment(self, shipment_id: UUID) -> List[TrackingUpdate]:
+        """Get all tracking updates for a shipment"""
+        result = await self.db.execute(
+            select(TrackingUpdate).where(
+                TrackingUpdate.shipment_id == shipment_id
+            ).order_by(TrackingUpdate.created_at.desc())
+        )
+        return list(result.scalars().all())
+    
+    async def count_by_shipment(self, shipment_id: UUID) -> int:
+        """Count tracking updates for a shipment"""
+        result = await self.db.execute(
+            select(func.count(TrackingUpdate.id)).where(
+                TrackingUpdate.shipment_id == shipment_id
+            )
+        )
+        return result.scalar_one()
+    
+    async def delete_by_shipment(self, shipment_id: UUID) -> int:
+        """Delete all tracking updates for a shipment"""
+        result = await self.db.execute(
+            delete(TrackingUpdate).where(TrackingUpdate.shipment_id == shipment_id)
+        )
+        await self.db.flush()
+        return result.rowcount
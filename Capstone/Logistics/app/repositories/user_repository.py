@@ -3,10 +3,14 @@ User repository - Data access layer for users
 """
 from typing import Optional, List
 from uuid import UUID
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.user import User, UserRole
+from ..core.metrics import instrument_repository
 
 
+@instrument_repository
 class UserRepository:
     """Repository for User model operations"""
     
@@ -16,8 +20,7 @@ class UserRepository:
     def create(self, user: User) -> User:
         """Create a new user"""
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        self.db.flush()
         return user
     
     def get_by_id(self, user_id: UUID) -> Optional[User]:
@@ -42,21 +45,86 @@ class UserRepository:
             query = query.filter(User.role == role)
         return query.count()
     
+    def count_by_role(self) -> dict:
+        """Count users per role in a single grouped query"""
+        result = self.db.query(User.role, func.count(User.id)).group_by(User.role).all()
+        return {role: count for role, count in result}
+    
     def update(self, user: User, update_data: dict) -> User:
         """Update user fields"""
         for key, value in update_data.items():
             if value is not None:
                 setattr(user, key, value)
-        self.db.commit()
-        self.db.refresh(user)
+        self.db.flush()
         return user
     
     def delete(self, user: User) -> bool:
         """Delete a user"""
         self.db.delete(user)
-        self.db.commit()
+        self.db.flush()
         return True
     
     def get_agents(self) -> List[User]:
         """Get all delivery agents"""
         return self.db.query(User).filter(User.role == UserRole.AGENT, User.is_active == True).all()
+
+
+@instrument_repository
+class AsyncUserRepository:
+    """Async repository for User model operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(self, user: User) -> User:
+        """Create a new user"""
+        self.db.add(user)
+        await self.db.flush()
+        return user
+    
+    async def get_by_id(self, user_id: UUID) -> Optional[User]:
+        """Get user by ID"""
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
+    
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """Get user by email"""
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+    
+    async def get_all(self, skip: int = 0, limit: int = 100, role: Optional[UserRole] = None) -> List[User]:
+        """Get all users with optional filtering"""
+        query = select(User)
+        if role:
+            query = query.where(User.role == role)
+        result = await self.db.execute(query.offset(skip).limit(limit))
+        return list(result.scalars().all())
+    
+    async def count(self, role: Optional[UserRole] = None) -> int:
+        """Count users with optional role filter"""
+        query = select(func.count(User.id))
+        if role:
+            query = query.where(User.role == role)
+        result = await self.db.execute(query)
+        return result.scalar_one()
+    
+    async def update(self, user: User, update_data: dict) -> User:
+        """Update user fields"""
+        for key, value in update_data.items():
+            if value is not None:
+                setattr(user, key, value)
+        await self.db.flush()
+        return user
+    
+    async def delete(self, user: User) -> bool:
+        """Delete a user"""
+        await self.db.delete(user)
+        await self.db.flush()
+        return True
+    
+    async def get_agents(self) -> List[User]:
+        """Get all delivery agents"""
+        result = await self.db.execute(
+            select(User).where(User.role == UserRole.AGENT, User.is_active == True)
+        )
+        return list(result.scalars().all())
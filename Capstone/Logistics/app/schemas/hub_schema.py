@@ -1,11 +1,14 @@
 """
 Hub schemas
 """
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 
+# Most hubs returned by one nearest-hub query
+MAX_NEAREST_HUBS = 20
+
 
 class HubBase(BaseModel):
     """Base hub schema"""
@@ -15,6 +18,8 @@ class HubBase(BaseModel):
     contact_phone: Optional[str] = None
     contact_email: Optional[EmailStr] = None
     capacity: Optional[int] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class HubCreate(HubBase):
@@ -29,7 +34,9 @@ class HubCreate(HubBase):
                 "address": "123 Industrial Area, Chennai",
                 "contact_phone": "+91-44-12345678",
                 "contact_email": "chennai.hub@logistics.com",
-                "capacity": 1000
+                "capacity": 1000,
+                "latitude": 13.0827,
+                "longitude": 80.2707
             }
         }
 
@@ -42,6 +49,8 @@ class HubUpdate(BaseModel):
     contact_phone: Optional[str] = None
     contact_email: Optional[EmailStr] = None
     capacity: Optional[int] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     is_active: Optional[bool] = None
 
 
@@ -56,6 +65,40 @@ class HubResponse(HubBase):
         from_attributes = True
 
 
+class NearestHubResponse(HubResponse):
+    """Hub with its great-circle distance from the query point"""
+    distance_km: float
+
+
+class NearestHubsResponse(BaseModel):
+    """Closest active hubs, nearest first"""
+    hubs: List[NearestHubResponse]
+
+
+class HubLoadResponse(BaseModel):
+    """Current occupancy of a hub"""
+    hub_id: UUID
+    hub_name: str
+    is_active: bool
+    capacity: Optional[int]
+    current_load: int
+    available: Optional[int] = None  # capacity - current_load; negative when over capacity
+    utilization: Optional[float] = None  # current_load / capacity
+    over_capacity: bool = False
+
+
+class HubUtilizationResponse(BaseModel):
+    """Occupancy of every hub, fullest first (hubs without a capacity last)"""
+    hubs: List[HubLoadResponse]
+    total_load: int
+    total_capacity: int
+
+
+class HubLoadRebuildResponse(BaseModel):
+    """Result of recomputing the hub loads"""
+    hubs_with_load: int
+
+
 class HubListResponse(BaseModel):
     """Hub list response"""
     hubs: List[HubResponse]
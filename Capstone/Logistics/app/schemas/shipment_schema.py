@@ -1,12 +1,15 @@
 """
 Shipment schemas
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
 from ..models.shipment import ShipmentStatus
 
+# Most scans accepted by one status batch request
+MAX_STATUS_BATCH = 500
+
 
 class ShipmentBase(BaseModel):
     """Base shipment schema"""
@@ -43,10 +46,16 @@ class ShipmentUpdate(BaseModel):
 
 
 class ShipmentStatusUpdate(BaseModel):
-    """Shipment status update schema (for agents)"""
+    """
+    Shipment status update schema (for agents).
+    
+    `hub_id` names the hub the shipment is at (sets current_hub_id, which
+    counts toward that hub's load while the status is at_hub).
+    """
     status: ShipmentStatus
     location: str
     description: Optional[str] = None
+    hub_id: Optional[UUID] = None
     
     class Config:
         json_schema_extra = {
@@ -58,6 +67,44 @@ class ShipmentStatusUpdate(BaseModel):
         }
 
 
+class ShipmentStatusBatchItem(ShipmentStatusUpdate):
+    """One scan in a status batch: a status update with its scan time"""
+    shipment_id: UUID
+    timestamp: datetime
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "shipment_id": "01923c4e-7b1a-7c3d-9e2f-1a2b3c4d5e6f",
+                "status": "at_hub",
+                "location": "Salem Hub",
+                "timestamp": "2026-10-18T06:42:00Z"
+            }
+        }
+
+
+class ShipmentStatusBatchRequest(BaseModel):
+    """Status updates synced from an agent's device, oldest scan first"""
+    updates: List[ShipmentStatusBatchItem] = Field(..., min_length=1, max_length=MAX_STATUS_BATCH)
+
+
+class ShipmentStatusBatchItemResult(BaseModel):
+    """Result for one scan of a status batch"""
+    index: int
+    shipment_id: UUID
+    success: bool
+    status: Optional[ShipmentStatus] = None
+    error: Optional[str] = None
+
+
+class ShipmentStatusBatchResponse(BaseModel):
+    """Status batch response with per-scan results"""
+    total: int
+    applied: int
+    failed: int
+    results: List[ShipmentStatusBatchItemResult]
+
+
 class ShipmentAssignAgent(BaseModel):
     """Assign agent to shipment schema"""
     agent_id: UUID
@@ -109,9 +156,39 @@ class ShipmentTrackResponse(BaseModel):
         from_attributes = True
 
 
+class BulkShipmentItemResult(BaseModel):
+    """Result for one row of a bulk upload"""
+    index: int
+    success: bool
+    id: Optional[UUID] = None
+    tracking_number: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkShipmentResponse(BaseModel):
+    """Bulk upload response with per-row results"""
+    total: int
+    created: int
+    failed: int
+    results: List[BulkShipmentItemResult]
+
+
 class ShipmentListResponse(BaseModel):
-    """Shipment list response"""
+    """Shipment list response (offset or cursor pagination)"""
     shipments: List[ShipmentResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # Approximate in cursor mode, only if requested
+    page: Optional[int] = None  # Offset mode only
+    page_size: int
+    next_cursor: Optional[str] = None  # Cursor mode only
+
+
+class ShipmentSearchHit(ShipmentResponse):
+    """Shipment search result with its relevance score"""
+    score: float
+
+
+class ShipmentSearchResponse(BaseModel):
+    """Ranked, cursor-paginated shipment search results"""
+    results: List[ShipmentSearchHit]
     page_size: int
+    next_cursor: Optional[str] = None
@@ -0,0 +1,42 @@
+"""
+Shipment statistics schemas
+"""
+from pydantic import BaseModel
+from typing import List
+from datetime import date
+
+
+class ShipmentCounters(BaseModel):
+    """Shipment counters: total created plus current status breakdown"""
+    total: int = 0
+    created: int = 0
+    picked_up: int = 0
+    in_transit: int = 0
+    at_hub: int = 0
+    out_for_delivery: int = 0
+    delivered: int = 0
+    cancelled: int = 0
+    returned: int = 0
+
+
+class DailyShipmentStatsResponse(ShipmentCounters):
+    """Counters for shipments created on one day"""
+    day: date
+    
+    class Config:
+        from_attributes = True
+
+
+class ShipmentStatsRangeResponse(BaseModel):
+    """Daily counters for a date range, with range totals"""
+    start_date: date
+    end_date: date
+    days: List[DailyShipmentStatsResponse]
+    totals: ShipmentCounters
+
+
+class StatsRebuildResponse(BaseModel):
+    """Result of recomputing the statistics for a date range"""
+    start_date: date
+    end_date: date
+    days_rebuilt: int
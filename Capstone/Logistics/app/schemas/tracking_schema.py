@@ -1,10 +1,14 @@
 """
 Tracking schemas
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
+from ..models.shipment import ShipmentStatus
+
+# Most shipment ids accepted by one latest-status batch request
+MAX_LATEST_BATCH = 1000
 
 
 class TrackingUpdateCreate(BaseModel):
@@ -41,3 +45,31 @@ class TrackingHistoryResponse(BaseModel):
     tracking_number: str
     updates: List[TrackingUpdateResponse]
     total_updates: int
+
+
+class TrackingArchiveResponse(BaseModel):
+    """Result of a tracking history archival run"""
+    older_than_days: int
+    shipments_archived: int
+    updates_archived: int
+
+
+class LatestTrackingBatchRequest(BaseModel):
+    """Shipment ids to fetch the latest tracking status of"""
+    shipment_ids: List[UUID] = Field(..., min_length=1, max_length=MAX_LATEST_BATCH)
+
+
+class LatestTrackingStatus(BaseModel):
+    """Latest tracking snapshot of one shipment"""
+    shipment_id: UUID
+    tracking_number: str
+    status: ShipmentStatus
+    last_tracking_status: Optional[str]
+    last_tracking_at: Optional[datetime]
+    last_tracking_location: Optional[str]
+
+
+class LatestTrackingBatchResponse(BaseModel):
+    """Latest tracking status of a batch of shipments"""
+    shipments: List[LatestTrackingStatus]
+    missing: List[UUID]
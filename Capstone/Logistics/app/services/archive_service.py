@@ -0,0 +1,140 @@
+"""
+Tracking archive service - Retention of tracking history
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from ..models.shipment import Shipment
+from ..repositories.tracking_repository import TrackingRepository
+from ..repositories.shipment_repository import ShipmentRepository
+from ..schemas.tracking_schema import TrackingUpdateResponse
+from ..core.archive import TrackingArchive, get_tracking_archive
+from ..core.config import settings
+from ..core.partitioning import ensure_monthly_partitions
+from ..core.unit_of_work import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock key: one maintenance run at a time across workers
+MAINTENANCE_LOCK_KEY = 0x7472_6B61_7263  # "trkarc"
+
+
+def with_archived_history(
+    shipment: Shipment,
+    updates: Sequence[Any],
+    newest_first: bool = True,
+    archive: Optional[TrackingArchive] = None
+) -> List[Any]:
+    """
+    A shipment's live tracking updates plus its archived ones.
+    
+    Returns `updates` unchanged unless the shipment has archived history;
+    archived updates come back as TrackingUpdateResponse objects.
+    """
+    if shipment.tracking_archived_at is None:
+        return list(updates)
+    archive = archive if archive is not None else get_tracking_archive()
+    live_ids = {str(update.id) for update in updates}
+    archived = [
+        TrackingUpdateResponse(**row)
+        for row in archive.read(shipment.id)
+        if row["id"] not in live_ids
+    ]
+    return sorted([*archived, *updates], key=lambda update: update.created_at, reverse=newest_first)
+
+
+class TrackingArchiveService:
+    """Service moving delivered shipments' old tracking history to the archive"""
+    
+    def __init__(self, db: Session, archive: Optional[TrackingArchive] = None):
+        self.db = db
+        self.archive = archive if archive is not None else get_tracking_archive()
+        self.tracking_repo = TrackingRepository(db)
+        self.shipment_repo = ShipmentRepository(db)
+    
+    def archive_delivered(
+        self,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Archive tracking updates older than `older_than_days` (default
+        TRACKING_ARCHIVE_AFTER_DAYS) of delivered shipments.
+        
+        Returns (shipments, updates) archived. Each batch is written to the
+        archive before its rows are deleted; if the delete fails the rows
+        stay live and are appended again by the next run (reads
+        de-duplicate).
+        """
+        if older_than_days is None:
+            older_than_days = settings.TRACKING_ARCHIVE_AFTER_DAYS
+        batch_size = batch_size or settings.TRACKING_ARCHIVE_BATCH_SIZE
+        before = datetime.utcnow() - timedelta(days=older_than_days)
+        
+        shipments = updates = 0
+        while True:
+            shipment_ids = self.tracking_repo.get_archivable_shipment_ids(before, batch_size)
+            if not shipment_ids:
+                break
+            for shipment_id in shipment_ids:
+                updates += self.archive.append(
+                    shipment_id,
+                    self.tracking_repo.get_by_shipment_before(shipment_id, before)
+                )
+            with UnitOfWork(self.db):
+                self.tracking_repo.delete_by_shipments_before(shipment_ids, before)
+                self.shipment_repo.mark_tracking_archived(shipment_ids, datetime.utcnow())
+            shipments += len(shipment_ids)
+        return shipments, updates
+
+
+def run_tracking_maintenance(engine: Engine) -> Optional[Tuple[int, int]]:
+    """
+    Create upcoming tracking_updates partitions (PostgreSQL) and, when
+    TRACKING_ARCHIVE_ENABLED, archive old history.
+    
+    Returns (shipments, updates) archived, or None if another worker holds
+    the maintenance lock. Runs on one dedicated connection, which holds
+    the session-level advisory lock for the whole run.
+    """
+    with engine.connect() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if postgresql:
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+            ).scalar()
+            connection.commit()
+            if not locked:
+                return None
+        try:
+            with connection.begin():
+                ensure_monthly_partitions(connection)
+            if not settings.TRACKING_ARCHIVE_ENABLED:
+                return 0, 0
+            with Session(bind=connection, autoflush=False, expire_on_commit=False) as db:
+                return TrackingArchiveService(db).archive_delivered()
+        finally:
+            if postgresql:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+                connection.commit()
+
+
+async def tracking_maintenance_loop(engine: Engine, interval: Optional[float] = None) -> None:
+    """Run tracking maintenance every `interval` seconds until cancelled"""
+    interval = interval or settings.TRACKING_ARCHIVE_INTERVAL_SECONDS
+    while True:
+        try:
+            result = await run_in_threadpool(run_tracking_maintenance, engine)
+            if result and result[0]:
+                logger.info(
+                    "archived tracking history",
+                    extra={"shipments": result[0], "updates": result[1]}
+                )
+        except Exception:
+            logger.exception("tracking maintenance failed")
+        await asyncio.sleep(interval)
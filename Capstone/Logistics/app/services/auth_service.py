@@ -3,11 +3,13 @@ Authentication service - Business logic for authentication
 """
 from datetime import timedelta
 from sqlalchemy.orm import Session
-from ..models.user import User, UserRole
+from starlette.concurrency import run_in_threadpool
+from ..models.user import User
 from ..repositories.user_repository import UserRepository
 from ..schemas.auth_schema import RegisterRequest, LoginRequest, TokenResponse
-from ..core.security import get_password_hash, verify_password, create_access_token
+from ..core.security import aget_password_hash, averify_password, create_access_token
 from ..core.config import settings
+from ..core.unit_of_work import UnitOfWork
 from ..exceptions.custom_exceptions import (
     EmailAlreadyExistsException,
     InvalidCredentialsException
@@ -15,38 +17,47 @@ from ..exceptions.custom_exceptions import (
 
 
 class AuthService:
-    """Service for authentication operations"""
+    """
+    Service for authentication operations.
+    
+    Login and registration are async: the bcrypt work is awaited on the
+    hashing pool and only the short database calls use a threadpool thread.
+    """
     
     def __init__(self, db: Session):
         self.db = db
         self.user_repo = UserRepository(db)
     
-    def register(self, request: RegisterRequest) -> User:
+    async def register(self, request: RegisterRequest) -> User:
         """Register a new user"""
         # Check if email already exists
-        existing_user = self.user_repo.get_by_email(request.email)
+        existing_user = await run_in_threadpool(self.user_repo.get_by_email, request.email)
         if existing_user:
             raise EmailAlreadyExistsException(request.email)
         
         # Create new user
         user = User(
             email=request.email,
-            password_hash=get_password_hash(request.password),
+            password_hash=await aget_password_hash(request.password),
             full_name=request.full_name,
             phone=request.phone,
             role=request.role
         )
         
-        return self.user_repo.create(user)
+        return await run_in_threadpool(self._create_user, user)
+    
+    def _create_user(self, user: User) -> User:
+        with UnitOfWork(self.db):
+            return self.user_repo.create(user)
     
-    def login(self, request: LoginRequest) -> TokenResponse:
+    async def login(self, request: LoginRequest) -> TokenResponse:
         """Authenticate user and return token"""
-        user = self.user_repo.get_by_email(request.email)
+        user = await run_in_threadpool(self.user_repo.get_by_email, request.email)
         
         if not user:
             raise InvalidCredentialsException()
         
-        if not verify_password(request.password, user.password_hash):
+        if not await averify_password(request.password, user.password_hash):
             raise InvalidCredentialsException()
         
         if not user.is_active:
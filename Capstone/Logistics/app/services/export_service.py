@@ -0,0 +1,115 @@
+"""
+Export service - Streaming shipment exports (CSV / NDJSON)
+"""
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterator, List, Optional, Sequence
+from uuid import UUID
+from sqlalchemy.orm import Session
+from ..models.shipment import ShipmentStatus
+from ..repositories.shipment_repository import ShipmentRepository
+from ..core.config import settings
+from ..exceptions.custom_exceptions import InvalidDateRangeException
+
+EXPORT_COLUMNS = [
+    "id",
+    "tracking_number",
+    "customer_id",
+    "agent_id",
+    "current_hub_id",
+    "source_address",
+    "destination_address",
+    "weight",
+    "dimensions",
+    "description",
+    "status",
+    "current_location",
+    "created_at",
+    "updated_at"
+]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+
+def _plain(value: Any) -> Any:
+    """Convert a column value to a CSV/JSON scalar"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportService:
+    """Service for bulk shipment exports"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def export_shipments(
+        self,
+        export_format: str,
+        status: Optional[ShipmentStatus] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Iterator[bytes]:
+        """
+        Get an iterator of encoded chunks (one per database batch).
+        
+        Filters are validated here, before the response starts. The rows
+        are read through a separate session on the same engine, opened and
+        closed by the iterator, because the request session is closed
+        before a streaming body is sent.
+        """
+        if start_date and end_date and end_date < start_date:
+            raise InvalidDateRangeException(start_date, end_date)
+        created_from = datetime.combine(start_date, time.min) if start_date else None
+        created_to = datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None
+        return self._stream(export_format, status, created_from, created_to)
+    
+    def _stream(
+        self,
+        export_format: str,
+        status: Optional[ShipmentStatus],
+        created_from: Optional[datetime],
+        created_to: Optional[datetime]
+    ) -> Iterator[bytes]:
+        if export_format == "csv":
+            encode = self._encode_csv
+            yield encode([EXPORT_COLUMNS])
+        else:
+            encode = self._encode_ndjson
+        
+        session = Session(bind=self.db.get_bind(), autoflush=False)
+        try:
+            batches = ShipmentRepository(session).iter_export_rows(
+                EXPORT_COLUMNS,
+                status=status,
+                created_from=created_from,
+                created_to=created_to,
+                batch_size=settings.EXPORT_BATCH_SIZE
+            )
+            for rows in batches:
+                yield encode([[_plain(value) for value in row] for row in rows])
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _encode_csv(rows: List[Sequence[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+    
+    @staticmethod
+    def _encode_ndjson(rows: List[Sequence[Any]]) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows
+        ).encode()
@@ -1,12 +1,21 @@
 """
 Hub service - Business logic for hub management
 """
-from typing import List, Optional, Tuple
+from typing import List, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
 from ..models.hub import Hub
 from ..repositories.hub_repository import HubRepository
-from ..schemas.hub_schema import HubCreate, HubUpdate
+from ..repositories.stats_repository import StatsRepository
+from ..schemas.hub_schema import (
+    HubCreate,
+    HubUpdate,
+    HubResponse,
+    HubLoadResponse,
+    HubUtilizationResponse
+)
+from ..core.hub_registry import HubSnapshot, get_hub_registry
+from ..core.unit_of_work import UnitOfWork
 from ..exceptions.custom_exceptions import HubNotFoundException, HubAlreadyExistsException
 
 
@@ -16,6 +25,7 @@ class HubService:
     def __init__(self, db: Session):
         self.db = db
         self.hub_repo = HubRepository(db)
+        self.stats_repo = StatsRepository(db)
     
     def create_hub(self, hub_data: HubCreate) -> Hub:
         """Create a new hub"""
@@ -30,10 +40,15 @@ class HubService:
             address=hub_data.address,
             contact_phone=hub_data.contact_phone,
             contact_email=hub_data.contact_email,
-            capacity=hub_data.capacity
+            capacity=hub_data.capacity,
+            latitude=hub_data.latitude,
+            longitude=hub_data.longitude
         )
         
-        return self.hub_repo.create(hub)
+        with UnitOfWork(self.db):
+            hub = self.hub_repo.create(hub)
+        self._refresh_registry()
+        return hub
     
     def get_hub(self, hub_id: UUID) -> Hub:
         """Get a hub by ID"""
@@ -42,20 +57,39 @@ class HubService:
             raise HubNotFoundException(hub_id)
         return hub
     
+    def find_hub(self, hub_id: UUID) -> HubResponse:
+        """
+        Get a hub by ID from the hub registry.
+        
+        A miss falls back to the database: the hub may have been created by
+        another worker since this process loaded its snapshot, in which case
+        the snapshot is dropped so the next read picks the new hub up.
+        """
+        hub = self._snapshot().get(hub_id)
+        if hub is not None:
+            return hub
+        row = self.hub_repo.get_by_id(hub_id)
+        if row is None:
+            raise HubNotFoundException(hub_id)
+        get_hub_registry().invalidate()
+        return HubResponse.model_validate(row)
+    
     def get_all_hubs(
         self,
         skip: int = 0,
         limit: int = 100,
         active_only: bool = False
-    ) -> Tuple[List[Hub], int]:
-        """Get all hubs with pagination"""
-        hubs = self.hub_repo.get_all(skip, limit, active_only)
-        total = self.hub_repo.count(active_only)
-        return hubs, total
+    ) -> Tuple[List[HubResponse], int]:
+        """Get all hubs with pagination (from the hub registry)"""
+        return self._snapshot().page(skip, limit, active_only)
     
-    def get_hubs_by_city(self, city: str) -> List[Hub]:
-        """Get all hubs in a city"""
-        return self.hub_repo.get_by_city(city)
+    def get_hubs_by_city(self, city: str) -> List[HubResponse]:
+        """Get all hubs in a city (from the hub registry)"""
+        return self._snapshot().by_city(city)
+    
+    def get_nearest_hubs(self, latitude: float, longitude: float, k: int = 1) -> List[Tuple[HubResponse, float]]:
+        """The `k` closest active hubs and their distance in km (from the hub registry)"""
+        return self._snapshot().nearest(latitude, longitude, k)
     
     def update_hub(self, hub_id: UUID, update_data: HubUpdate) -> Hub:
         """Update a hub"""
@@ -67,13 +101,68 @@ class HubService:
             if existing_hub and existing_hub.id != hub_id:
                 raise HubAlreadyExistsException(update_data.hub_name)
         
-        return self.hub_repo.update(hub, update_data.model_dump(exclude_unset=True))
+        with UnitOfWork(self.db):
+            hub = self.hub_repo.update(hub, update_data.model_dump(exclude_unset=True))
+        self._refresh_registry()
+        return hub
     
     def delete_hub(self, hub_id: UUID) -> bool:
         """Delete a hub"""
         hub = self.get_hub(hub_id)
-        return self.hub_repo.delete(hub)
+        with UnitOfWork(self.db):
+            self.stats_repo.delete_hub_load(hub_id)
+            deleted = self.hub_repo.delete(hub)
+        self._refresh_registry()
+        return deleted
+    
+    def get_hub_load(self, hub_id: UUID) -> HubLoadResponse:
+        """Current occupancy of a hub (one primary-key read of its counter)"""
+        hub = self.find_hub(hub_id)
+        return _hub_load(hub, self.stats_repo.get_hub_load(hub_id))
+    
+    def get_hub_utilization(self, active_only: bool = False) -> HubUtilizationResponse:
+        """Occupancy of every hub, fullest first (one read of the hub counters)"""
+        snapshot = self._snapshot()
+        loads = self.stats_repo.get_hub_loads()
+        hubs = sorted(
+            (_hub_load(hub, loads.get(hub.id, 0)) for hub in (snapshot.active if active_only else snapshot.hubs)),
+            key=lambda load: (load.utilization is None, -(load.utilization or 0), load.hub_name)
+        )
+        return HubUtilizationResponse(
+            hubs=hubs,
+            total_load=sum(load.current_load for load in hubs),
+            total_capacity=sum(load.capacity or 0 for load in hubs)
+        )
     
     def get_hub_count(self) -> int:
         """Get total hub count"""
         return self.hub_repo.count()
+    
+    def load_registry(self) -> HubSnapshot:
+        """Load the hub registry now (startup warm-up)"""
+        get_hub_registry().invalidate()
+        return self._snapshot()
+    
+    def _snapshot(self) -> HubSnapshot:
+        return get_hub_registry().snapshot(self.hub_repo.list_all)
+    
+    def _refresh_registry(self) -> None:
+        """Reload the hub registry after a committed hub write"""
+        get_hub_registry().invalidate()
+        self._snapshot()
+
+
+def _hub_load(hub: HubResponse, current_load: int) -> HubLoadResponse:
+    """Occupancy figures of a hub holding `current_load` shipments"""
+    load = HubLoadResponse(
+        hub_id=hub.id,
+        hub_name=hub.hub_name,
+        is_active=hub.is_active,
+        capacity=hub.capacity,
+        current_load=current_load
+    )
+    if hub.capacity:
+        load.available = hub.capacity - current_load
+        load.utilization = round(current_load / hub.capacity, 4)
+        load.over_capacity = current_load > hub.capacity
+    return load
@@ -1,22 +1,57 @@
 """
 Shipment service - Business logic for shipment management
 """
-from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
-from ..models.shipment import Shipment, ShipmentStatus
+from ..models.shipment import Shipment, ShipmentStatus, can_transition, generate_tracking_number
 from ..models.tracking import TrackingUpdate
 from ..models.user import User, UserRole
 from ..repositories.shipment_repository import ShipmentRepository
 from ..repositories.tracking_repository import TrackingRepository
-from ..schemas.shipment_schema import ShipmentCreate, ShipmentUpdate, ShipmentStatusUpdate
+from ..repositories.stats_repository import StatsRepository
+from ..repositories.hub_repository import HubRepository
+from ..schemas.shipment_schema import (
+    ShipmentCreate,
+    ShipmentUpdate,
+    ShipmentStatusUpdate,
+    ShipmentStatusBatchItem,
+    ShipmentStatusBatchItemResult,
+    ShipmentStatusBatchResponse,
+    BulkShipmentItemResult,
+    BulkShipmentResponse
+)
+from ..core.config import settings
+from ..core.unit_of_work import UnitOfWork
+from ..core.cache import invalidate_tracking
+from .tracking_service import publish_tracking_updates
+from ..utils.ids import uuid7
+from ..utils.pagination import (
+    encode_cursor,
+    decode_cursor,
+    encode_score_cursor,
+    decode_score_cursor
+)
 from ..exceptions.custom_exceptions import (
     ShipmentNotFoundException,
     ShipmentCannotBeCancelledException,
+    InvalidStatusTransitionException,
+    HubNotFoundException,
     UnauthorizedAccessException,
     AgentNotFoundException
 )
 
+# Device clocks may run slightly ahead of the server's
+STATUS_BATCH_CLOCK_SKEW = timedelta(minutes=5)
+
+# Tracking numbers are random, so an insert may hit the unique constraint;
+# it is retried with a new number this many times in total
+TRACKING_NUMBER_ATTEMPTS = 3
+
 
 class ShipmentService:
     """Service for shipment operations"""
@@ -25,45 +60,190 @@ class ShipmentService:
         self.db = db
         self.shipment_repo = ShipmentRepository(db)
         self.tracking_repo = TrackingRepository(db)
+        self.stats_repo = StatsRepository(db)
+        self.hub_repo = HubRepository(db)
     
     def create_shipment(self, customer_id: UUID, shipment_data: ShipmentCreate) -> Shipment:
         """Create a new shipment"""
-        shipment = Shipment(
-            customer_id=customer_id,
-            source_address=shipment_data.source_address,
-            destination_address=shipment_data.destination_address,
-            weight=shipment_data.weight,
-            dimensions=shipment_data.dimensions,
-            description=shipment_data.description
-        )
+        for attempt in range(1, TRACKING_NUMBER_ATTEMPTS + 1):
+            shipment = Shipment(
+                tracking_number=generate_tracking_number(),
+                customer_id=customer_id,
+                source_address=shipment_data.source_address,
+                destination_address=shipment_data.destination_address,
+                weight=shipment_data.weight,
+                dimensions=shipment_data.dimensions,
+                description=shipment_data.description
+            )
+            
+            # Initial tracking update
+            tracking = TrackingUpdate(
+                location=shipment_data.source_address,
+                status="created",
+                description="Shipment created and awaiting pickup",
+                created_at=datetime.utcnow()
+            )
+            
+            try:
+                with UnitOfWork(self.db):
+                    # One flush inserts both; the snapshot recorded by the tracking
+                    # repository goes out with the shipment INSERT
+                    tracking.shipment = shipment
+                    self.tracking_repo.create(tracking, shipment)
+                    self.stats_repo.record_created(shipment.created_at.date())
+            except IntegrityError:
+                # Most likely a tracking number collision: draw a new one
+                if attempt == TRACKING_NUMBER_ATTEMPTS:
+                    raise
+                continue
+            return shipment
+    
+    def bulk_create_shipments(self, customer_id: UUID, rows: Iterable[Any]) -> BulkShipmentResponse:
+        """
+        Create many shipments from a manifest.
+        
+        Each row is a dict (JSON array item) or a JSON string (NDJSON line).
+        Valid rows are inserted with their initial tracking update using
+        batched INSERTs, one transaction per chunk. Invalid rows are
+        reported individually and do not abort the rest of the batch.
+        """
+        results: List[BulkShipmentItemResult] = []
+        chunk: List[Tuple[int, ShipmentCreate]] = []
         
-        shipment = self.shipment_repo.create(shipment)
+        for index, raw in enumerate(rows):
+            try:
+                if isinstance(raw, (str, bytes)):
+                    shipment_data = ShipmentCreate.model_validate_json(raw)
+                else:
+                    shipment_data = ShipmentCreate.model_validate(raw)
+            except ValidationError as exc:
+                results.append(BulkShipmentItemResult(
+                    index=index,
+                    success=False,
+                    error=_format_validation_error(exc)
+                ))
+                continue
+            
+            chunk.append((index, shipment_data))
+            if len(chunk) >= settings.BULK_INSERT_CHUNK_SIZE:
+                results.extend(self._insert_shipment_chunk(customer_id, chunk))
+                chunk = []
         
-        # Create initial tracking update
-        tracking = TrackingUpdate(
-            shipment_id=shipment.id,
-            location=shipment_data.source_address,
-            status="created",
-            description="Shipment created and awaiting pickup"
+        if chunk:
+            results.extend(self._insert_shipment_chunk(customer_id, chunk))
+        
+        results.sort(key=lambda result: result.index)
+        created = sum(1 for result in results if result.success)
+        return BulkShipmentResponse(
+            total=len(results),
+            created=created,
+            failed=len(results) - created,
+            results=results
         )
-        self.tracking_repo.create(tracking)
+    
+    def _insert_shipment_chunk(
+        self,
+        customer_id: UUID,
+        chunk: List[Tuple[int, ShipmentCreate]],
+        attempts: int = TRACKING_NUMBER_ATTEMPTS
+    ) -> List[BulkShipmentItemResult]:
+        """
+        Insert one chunk in a single transaction, falling back to per-row on
+        failure. Rows are rebuilt (new tracking numbers) on every attempt.
+        """
+        shipment_rows, tracking_rows = self._build_bulk_rows(customer_id, chunk)
+        try:
+            with UnitOfWork(self.db):
+                self.db.execute(insert(Shipment), shipment_rows)
+                self.db.execute(insert(TrackingUpdate), tracking_rows)
+                self.stats_repo.record_created(
+                    shipment_rows[0]["created_at"].date(), len(shipment_rows)
+                )
+        except SQLAlchemyError as exc:
+            if len(chunk) == 1:
+                if isinstance(exc, IntegrityError) and attempts > 1:
+                    # Most likely a tracking number collision: draw a new one
+                    return self._insert_shipment_chunk(customer_id, chunk, attempts - 1)
+                return [BulkShipmentItemResult(
+                    index=chunk[0][0],
+                    success=False,
+                    error="Could not store shipment"
+                )]
+            # Isolate the offending rows; the rest of the chunk still goes in
+            results = []
+            for item in chunk:
+                results.extend(self._insert_shipment_chunk(customer_id, [item]))
+            return results
         
-        return shipment
+        return [
+            BulkShipmentItemResult(
+                index=index,
+                success=True,
+                id=row["id"],
+                tracking_number=row["tracking_number"]
+            )
+            for (index, _), row in zip(chunk, shipment_rows)
+        ]
+    
+    @staticmethod
+    def _build_bulk_rows(
+        customer_id: UUID,
+        chunk: List[Tuple[int, ShipmentCreate]]
+    ) -> Tuple[List[dict], List[dict]]:
+        """Build shipment and initial tracking rows in memory (ids, tracking numbers, timestamps)"""
+        now = datetime.utcnow()
+        shipment_rows = []
+        tracking_rows = []
+        for _, shipment_data in chunk:
+            shipment_id = uuid7()
+            shipment_rows.append({
+                "id": shipment_id,
+                "tracking_number": generate_tracking_number(),
+                "customer_id": customer_id,
+                "source_address": shipment_data.source_address,
+                "destination_address": shipment_data.destination_address,
+                "weight": shipment_data.weight,
+                "dimensions": shipment_data.dimensions,
+                "description": shipment_data.description,
+                "status": ShipmentStatus.CREATED,
+                "last_tracking_status": "created",
+                "last_tracking_at": now,
+                "last_tracking_location": shipment_data.source_address,
+                "created_at": now,
+                "updated_at": now
+            })
+            tracking_rows.append({
+                "id": uuid7(),
+                "shipment_id": shipment_id,
+                "location": shipment_data.source_address,
+                "status": "created",
+                "description": "Shipment created and awaiting pickup",
+                "created_at": now,
+                "updated_at": now
+            })
+        return shipment_rows, tracking_rows
     
-    def get_shipment(self, shipment_id: UUID) -> Shipment:
+    def get_shipment(self, shipment_id: UUID, with_tracking: bool = False) -> Shipment:
         """Get a shipment by ID"""
-        shipment = self.shipment_repo.get_by_id(shipment_id)
+        shipment = self.shipment_repo.get_by_id(shipment_id, with_tracking)
         if not shipment:
             raise ShipmentNotFoundException(shipment_id)
         return shipment
     
-    def get_shipment_by_tracking(self, tracking_number: str) -> Shipment:
+    def get_shipment_by_tracking(self, tracking_number: str, with_tracking: bool = False) -> Shipment:
         """Get a shipment by tracking number"""
-        shipment = self.shipment_repo.get_by_tracking_number(tracking_number)
+        shipment = self.shipment_repo.get_by_tracking_number(tracking_number, with_tracking)
         if not shipment:
             raise ShipmentNotFoundException(tracking_number)
         return shipment
     
+    def get_validator(self, shipment_id: UUID) -> Tuple[datetime, int]:
+        """(updated_at, live tracking update count) of a shipment, for conditional GETs"""
+        validator = self.shipment_repo.get_validator(shipment_id)
+        if validator is None:
+            raise ShipmentNotFoundException(shipment_id)
+        return validator.updated_at, validator.tracking_count
+    
     def get_customer_shipments(
         self,
         customer_id: UUID,
@@ -95,6 +275,59 @@ class ShipmentService:
         total = self.shipment_repo.count(status)
         return shipments, total
     
+    def get_shipments_page(
+        self,
+        current_user: User,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        status: Optional[ShipmentStatus] = None,
+        include_total: bool = False
+    ) -> Tuple[List[Shipment], Optional[str], Optional[int]]:
+        """
+        Get a keyset-paginated page of shipments visible to the user.
+        
+        Returns (shipments, next_cursor, approximate_total).
+        """
+        filters = {"status": status}
+        if current_user.role == UserRole.CUSTOMER:
+            filters = {"customer_id": current_user.id}
+        elif current_user.role == UserRole.AGENT:
+            filters = {"agent_id": current_user.id}
+        
+        after = decode_cursor(cursor) if cursor else None
+        # Fetch one extra row to know whether another page exists
+        shipments = self.shipment_repo.get_page(after, limit + 1, **filters)
+        
+        next_cursor = None
+        if len(shipments) > limit:
+            shipments = shipments[:limit]
+            last = shipments[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        
+        total = self.shipment_repo.estimate_count(**filters) if include_total else None
+        return shipments, next_cursor, total
+    
+    def search_shipments(
+        self,
+        query: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[Tuple[Shipment, float]], Optional[str]]:
+        """
+        Search shipment addresses and descriptions, best matches first.
+        
+        Returns ((shipment, score) pairs, next_cursor).
+        """
+        after = decode_score_cursor(cursor) if cursor else None
+        hits = self.shipment_repo.search(query.strip(), after, limit + 1)
+        
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            last, score = hits[-1]
+            next_cursor = encode_score_cursor(score, last.id)
+        return hits, next_cursor
+    
     def update_shipment(
         self,
         shipment_id: UUID,
@@ -112,7 +345,10 @@ class ShipmentService:
             if shipment.status not in [ShipmentStatus.CREATED]:
                 raise UnauthorizedAccessException("Cannot modify shipment after pickup")
         
-        return self.shipment_repo.update(shipment, update_data.model_dump(exclude_unset=True))
+        with UnitOfWork(self.db):
+            shipment = self.shipment_repo.update(shipment, update_data.model_dump(exclude_unset=True))
+        invalidate_tracking(shipment.tracking_number)
+        return shipment
     
     def update_shipment_status(
         self,
@@ -122,25 +358,129 @@ class ShipmentService:
     ) -> Shipment:
         """Update shipment status (agent only)"""
         shipment = self.get_shipment(shipment_id)
+        if not can_transition(shipment.status, status_update.status):
+            raise InvalidStatusTransitionException(shipment.status.value, status_update.status.value)
+        # Checked against the database, not the (possibly stale) hub registry
+        if status_update.hub_id is not None and not self.hub_repo.lock_existing_ids([status_update.hub_id]):
+            raise HubNotFoundException(status_update.hub_id)
         
-        # Update shipment status and location
-        update_data = {
-            "status": status_update.status,
-            "current_location": status_update.location
-        }
-        shipment = self.shipment_repo.update(shipment, update_data)
-        
-        # Create tracking update
-        tracking = TrackingUpdate(
-            shipment_id=shipment.id,
-            location=status_update.location,
-            status=status_update.status.value,
-            description=status_update.description
-        )
-        self.tracking_repo.create(tracking)
+        # Status change, its history row, the stats and the hub loads are written atomically
+        old_status = shipment.status
+        old_hub_id = shipment.occupied_hub_id
+        with UnitOfWork(self.db):
+            tracking = TrackingUpdate(
+                shipment_id=shipment.id,
+                location=status_update.location,
+                status=status_update.status.value,
+                description=status_update.description,
+                created_at=datetime.utcnow()
+            )
+            # Status, location, hub (which may be cleared) and the snapshot go
+            # out in one UPDATE, flushed with the tracking INSERT
+            shipment.current_hub_id = _next_hub_id(shipment, status_update)
+            shipment.status = status_update.status
+            shipment.current_location = status_update.location
+            self.tracking_repo.create(tracking, shipment)
+            self.stats_repo.record_transition(shipment.created_at.date(), old_status, shipment.status)
+            self.stats_repo.record_hub_moves([(old_hub_id, shipment.occupied_hub_id)])
+        invalidate_tracking(shipment.tracking_number)
+        publish_tracking_updates(shipment.tracking_number, [tracking])
         
         return shipment
     
+    def batch_update_status(
+        self,
+        updates: List[ShipmentStatusBatchItem],
+        agent: User
+    ) -> ShipmentStatusBatchResponse:
+        """
+        Apply status scans synced from an agent's device, in list order.
+        
+        The target shipments are loaded with one IN query and each scan is
+        checked against the status left by the scans before it. Unknown
+        shipments, disallowed transitions, scans older than the shipment's
+        latest tracking update and scans from the future fail individually;
+        a resent copy of the latest scan succeeds without adding history.
+        Accepted scans are written with one batched tracking INSERT and
+        committed together.
+        """
+        now = datetime.utcnow()
+        shipments = {
+            shipment.id: shipment
+            for shipment in self.shipment_repo.get_by_ids(list({item.shipment_id for item in updates}))
+        }
+        old_statuses = {shipment_id: shipment.status for shipment_id, shipment in shipments.items()}
+        old_hub_ids = {shipment_id: shipment.occupied_hub_id for shipment_id, shipment in shipments.items()}
+        hub_ids = self.hub_repo.lock_existing_ids({item.hub_id for item in updates if item.hub_id is not None})
+        
+        results: List[ShipmentStatusBatchItemResult] = []
+        trackings: List[TrackingUpdate] = []
+        accepted: Dict[UUID, TrackingUpdate] = {}  # latest accepted scan per shipment
+        for index, item in enumerate(updates):
+            shipment = shipments.get(item.shipment_id)
+            scanned_at = _as_utc_naive(item.timestamp)
+            latest_at, latest_status, latest_location = _latest_tracking(shipment, accepted.get(item.shipment_id))
+            error = None
+            if shipment is None:
+                error = "Shipment not found"
+            elif scanned_at > now + STATUS_BATCH_CLOCK_SKEW:
+                error = "Scan time is in the future"
+            elif (scanned_at, item.status.value, item.location) == (latest_at, latest_status, latest_location):
+                pass  # Already applied by an earlier sync
+            elif latest_at is not None and scanned_at < latest_at:
+                error = "Scan is older than the shipment's latest tracking update"
+            elif not can_transition(shipment.status, item.status):
+                error = f"Cannot change status from {shipment.status.value} to {item.status.value}"
+            elif item.hub_id is not None and item.hub_id not in hub_ids:
+                error = "Hub not found"
+            else:
+                tracking = TrackingUpdate(
+                    shipment_id=shipment.id,
+                    location=item.location,
+                    status=item.status.value,
+                    description=item.description,
+                    created_at=scanned_at
+                )
+                shipment.current_hub_id = _next_hub_id(shipment, item)
+                shipment.status = item.status
+                shipment.current_location = item.location
+                trackings.append(tracking)
+                accepted[shipment.id] = tracking
+            
+            results.append(ShipmentStatusBatchItemResult(
+                index=index,
+                shipment_id=item.shipment_id,
+                success=error is None,
+                status=shipment.status if error is None else None,
+                error=error
+            ))
+        
+        changed = [shipments[shipment_id] for shipment_id in dict.fromkeys(t.shipment_id for t in trackings)]
+        if trackings:
+            with UnitOfWork(self.db):
+                self.tracking_repo.create_many(trackings, shipments)
+                self.stats_repo.record_transitions(
+                    (shipment.created_at.date(), old_statuses[shipment.id], shipment.status)
+                    for shipment in changed
+                )
+                self.stats_repo.record_hub_moves(
+                    (old_hub_ids[shipment.id], shipment.occupied_hub_id) for shipment in changed
+                )
+            for shipment in changed:
+                invalidate_tracking(shipment.tracking_number)
+                publish_tracking_updates(
+                    shipment.tracking_number,
+                    [tracking for tracking in trackings if tracking.shipment_id == shipment.id]
+                )
+        
+        applied = sum(1 for result in results if result.success)
+        return ShipmentStatusBatchResponse(
+            total=len(results),
+            applied=applied,
+            failed=len(results) - applied,
+            results=results
+        )
+    
     def assign_agent(self, shipment_id: UUID, agent_id: UUID) -> Shipment:
         """Assign an agent to a shipment"""
         shipment = self.get_shipment(shipment_id)
@@ -154,7 +494,8 @@ class ShipmentService:
             raise AgentNotFoundException(agent_id)
         
         update_data = {"agent_id": agent_id}
-        return self.shipment_repo.update(shipment, update_data)
+        with UnitOfWork(self.db):
+            return self.shipment_repo.update(shipment, update_data)
     
     def cancel_shipment(self, shipment_id: UUID, current_user: User) -> Shipment:
         """Cancel a shipment"""
@@ -169,17 +510,23 @@ class ShipmentService:
         if not self.shipment_repo.can_cancel(shipment):
             raise ShipmentCannotBeCancelledException(shipment.tracking_number)
         
-        update_data = {"status": ShipmentStatus.CANCELLED}
-        shipment = self.shipment_repo.update(shipment, update_data)
-        
-        # Add tracking update
-        tracking = TrackingUpdate(
-            shipment_id=shipment.id,
-            location=shipment.current_location or shipment.source_address,
-            status="cancelled",
-            description="Shipment cancelled by customer"
-        )
-        self.tracking_repo.create(tracking)
+        old_status = shipment.status
+        old_hub_id = shipment.occupied_hub_id
+        with UnitOfWork(self.db):
+            # Add tracking update
+            tracking = TrackingUpdate(
+                shipment_id=shipment.id,
+                location=shipment.current_location or shipment.source_address,
+                status="cancelled",
+                description="Shipment cancelled by customer",
+                created_at=datetime.utcnow()
+            )
+            shipment.status = ShipmentStatus.CANCELLED
+            self.tracking_repo.create(tracking, shipment)
+            self.stats_repo.record_transition(shipment.created_at.date(), old_status, shipment.status)
+            self.stats_repo.record_hub_moves([(old_hub_id, shipment.occupied_hub_id)])
+        invalidate_tracking(shipment.tracking_number)
+        publish_tracking_updates(shipment.tracking_number, [tracking])
         
         return shipment
     
@@ -195,18 +542,62 @@ class ShipmentService:
             if shipment.status not in [ShipmentStatus.CREATED, ShipmentStatus.CANCELLED]:
                 raise UnauthorizedAccessException("Cannot delete shipment after pickup")
         
-        return self.shipment_repo.delete(shipment)
+        tracking_number = shipment.tracking_number
+        with UnitOfWork(self.db):
+            self.stats_repo.record_deleted(shipment.created_at.date(), shipment.status)
+            self.stats_repo.record_hub_moves([(shipment.occupied_hub_id, None)])
+            deleted = self.shipment_repo.delete(shipment)
+        invalidate_tracking(tracking_number)
+        return deleted
     
     def get_shipment_stats(self) -> dict:
-        """Get shipment statistics for today"""
-        status_counts = self.shipment_repo.count_by_status_today()
-        total_today = self.shipment_repo.count_today()
+        """Get shipment statistics for today (single primary-key read)"""
+        stats = self.stats_repo.get(datetime.utcnow().date())
+        
+        def counter(name: str) -> int:
+            return getattr(stats, name) if stats else 0
         
         return {
-            "total_shipments_today": total_today,
-            "delivered": status_counts.get("delivered", 0),
-            "in_transit": status_counts.get("in_transit", 0),
-            "out_for_delivery": status_counts.get("out_for_delivery", 0),
-            "created": status_counts.get("created", 0),
-            "cancelled": status_counts.get("cancelled", 0)
+            "total_shipments_today": counter("total"),
+            "delivered": counter("delivered"),
+            "in_transit": counter("in_transit"),
+            "out_for_delivery": counter("out_for_delivery"),
+            "created": counter("created"),
+            "cancelled": counter("cancelled")
         }
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into one line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _latest_tracking(
+    shipment: Optional[Shipment],
+    pending: Optional[TrackingUpdate]
+) -> Tuple[Optional[datetime], Optional[str], Optional[str]]:
+    """(time, status, location) of the latest tracking update, including one pending in this batch"""
+    if pending is not None:
+        return pending.created_at, pending.status, pending.location
+    if shipment is None:
+        return None, None, None
+    return shipment.last_tracking_at, shipment.last_tracking_status, shipment.last_tracking_location
+
+
+def _next_hub_id(shipment: Shipment, status_update: ShipmentStatusUpdate) -> Optional[UUID]:
+    """current_hub_id after a status update: the named hub, cleared on arrival at an unnamed one"""
+    if status_update.hub_id is not None:
+        return status_update.hub_id
+    if status_update.status == ShipmentStatus.AT_HUB:
+        return None
+    return shipment.current_hub_id
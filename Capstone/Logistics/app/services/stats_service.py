@@ -0,0 +1,59 @@
+"""
+Stats service - Business logic for shipment statistics
+"""
+from datetime import date
+from sqlalchemy.orm import Session
+from ..repositories.stats_repository import StatsRepository, COUNTER_COLUMNS
+from ..schemas.stats_schema import (
+    ShipmentCounters,
+    DailyShipmentStatsResponse,
+    ShipmentStatsRangeResponse
+)
+from ..core.unit_of_work import UnitOfWork
+from ..exceptions.custom_exceptions import InvalidDateRangeException
+
+MAX_RANGE_DAYS = 366
+
+
+class StatsService:
+    """Service for materialized shipment statistics"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+        self.stats_repo = StatsRepository(db)
+    
+    def get_daily_stats(self, day: date) -> DailyShipmentStatsResponse:
+        """Get the counters for one day (zeros if nothing was created)"""
+        stats = self.stats_repo.get(day)
+        if stats is None:
+            return DailyShipmentStatsResponse(day=day)
+        return DailyShipmentStatsResponse.model_validate(stats)
+    
+    def get_stats_range(self, start: date, end: date) -> ShipmentStatsRangeResponse:
+        """Get the daily counters for [start, end] and their totals"""
+        self._check_range(start, end)
+        days = [
+            DailyShipmentStatsResponse.model_validate(stats)
+            for stats in self.stats_repo.get_range(start, end)
+        ]
+        totals = ShipmentCounters(**{
+            column: sum(getattr(day, column) for day in days)
+            for column in COUNTER_COLUMNS
+        })
+        return ShipmentStatsRangeResponse(start_date=start, end_date=end, days=days, totals=totals)
+    
+    def rebuild_stats(self, start: date, end: date) -> int:
+        """Recompute the counters for [start, end] from the shipments table"""
+        self._check_range(start, end)
+        with UnitOfWork(self.db):
+            return self.stats_repo.rebuild(start, end)
+    
+    def rebuild_hub_loads(self) -> int:
+        """Recompute every hub load from the shipments table; returns hubs holding shipments"""
+        with UnitOfWork(self.db):
+            return self.stats_repo.rebuild_hub_loads()
+    
+    @staticmethod
+    def _check_range(start: date, end: date) -> None:
+        if end < start or (end - start).days >= MAX_RANGE_DAYS:
+            raise InvalidDateRangeException(start, end, MAX_RANGE_DAYS)
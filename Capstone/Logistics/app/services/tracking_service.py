@@ -1,15 +1,50 @@
 """
 Tracking service - Business logic for tracking operations
 """
-from typing import List
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from ..models.tracking import TrackingUpdate
 from ..repositories.tracking_repository import TrackingRepository
-from ..repositories.shipment_repository import ShipmentRepository
-from ..schemas.tracking_schema import TrackingUpdateCreate
+from ..repositories.shipment_repository import AsyncShipmentRepository, ShipmentRepository
+from ..schemas.tracking_schema import LatestTrackingStatus, TrackingUpdateCreate, TrackingUpdateResponse
+from .archive_service import with_archived_history
+from ..core.broker import get_tracking_broker
+from ..core.cache import invalidate_tracking
+from ..core.unit_of_work import UnitOfWork
+from ..utils.serialization import OrmSerializer
 from ..exceptions.custom_exceptions import ShipmentNotFoundException
 
+_update_serializer = OrmSerializer(TrackingUpdateResponse)
+
+
+def publish_tracking_updates(tracking_number: str, updates: Iterable[TrackingUpdate]) -> None:
+    """Push committed tracking updates to the shipment's live stream subscribers"""
+    broker = get_tracking_broker()
+    if not broker.has_subscribers(tracking_number):
+        return
+    for update in updates:
+        broker.publish(tracking_number, _update_serializer.dumps(update).decode())
+
+
+async def get_tracking_validator(db: Union[Session, AsyncSession], tracking_number: str) -> Tuple[datetime, int]:
+    """
+    (updated_at, live tracking update count) of a shipment by tracking
+    number, for conditional GETs; one query on either session type.
+    """
+    if isinstance(db, AsyncSession):
+        validator = await AsyncShipmentRepository(db).get_validator_by_tracking_number(tracking_number)
+    else:
+        validator = await run_in_threadpool(
+            ShipmentRepository(db).get_validator_by_tracking_number, tracking_number
+        )
+    if validator is None:
+        raise ShipmentNotFoundException(tracking_number)
+    return validator.updated_at, validator.tracking_count
+
 
 class TrackingService:
     """Service for tracking operations"""
@@ -34,13 +69,17 @@ class TrackingService:
             shipment_id=shipment_id,
             location=tracking_data.location,
             status=tracking_data.status,
-            description=tracking_data.description
+            description=tracking_data.description,
+            created_at=datetime.utcnow()
         )
         
-        # Update shipment's current location
-        self.shipment_repo.update(shipment, {"current_location": tracking_data.location})
-        
-        return self.tracking_repo.create(tracking)
+        with UnitOfWork(self.db):
+            # Location and latest-tracking snapshot go out in one UPDATE with the INSERT
+            shipment.current_location = tracking_data.location
+            tracking = self.tracking_repo.create(tracking, shipment)
+        invalidate_tracking(shipment.tracking_number)
+        publish_tracking_updates(shipment.tracking_number, [tracking])
+        return tracking
     
     def get_tracking_history(self, shipment_id: UUID) -> List[TrackingUpdate]:
         """Get all tracking updates for a shipment"""
@@ -49,7 +88,8 @@ class TrackingService:
         if not shipment:
             raise ShipmentNotFoundException(shipment_id)
         
-        return self.tracking_repo.get_by_shipment(shipment_id)
+        # Archived history (if any) is merged back in, newest first
+        return with_archived_history(shipment, self.tracking_repo.get_by_shipment(shipment_id))
     
     def get_tracking_by_tracking_number(self, tracking_number: str) -> tuple:
         """Get tracking history by tracking number"""
@@ -57,9 +97,37 @@ class TrackingService:
         if not shipment:
             raise ShipmentNotFoundException(tracking_number)
         
-        updates = self.tracking_repo.get_by_shipment(shipment.id)
+        updates = with_archived_history(shipment, self.tracking_repo.get_by_shipment(shipment.id))
         return shipment, updates
     
-    def get_latest_update(self, shipment_id: UUID) -> TrackingUpdate:
-        """Get the latest tracking update for a shipment"""
-        return self.tracking_repo.get_latest_by_shipment(shipment_id)
+    def get_latest_update(self, shipment_id: UUID) -> Optional[LatestTrackingStatus]:
+        """
+        Latest tracking update of a shipment, from the Shipment snapshot
+        columns (one query; they survive archival of the history)
+        """
+        statuses, _ = self.get_latest_statuses([shipment_id])
+        return statuses[0] if statuses else None
+    
+    def get_latest_statuses(
+        self,
+        shipment_ids: Sequence[UUID]
+    ) -> Tuple[List[LatestTrackingStatus], List[UUID]]:
+        """
+        Latest tracking status of many shipments from the Shipment snapshot
+        columns (one query). Returns (statuses in request order, unknown ids).
+        """
+        requested = list(dict.fromkeys(shipment_ids))
+        rows = {row.id: row for row in self.shipment_repo.get_latest_tracking(requested)}
+        statuses = [
+            LatestTrackingStatus(
+                shipment_id=row.id,
+                tracking_number=row.tracking_number,
+                status=row.status,
+                last_tracking_status=row.last_tracking_status,
+                last_tracking_at=row.last_tracking_at,
+                last_tracking_location=row.last_tracking_location
+            )
+            for row in map(rows.get, requested) if row is not None
+        ]
+        missing = [shipment_id for shipment_id in requested if shipment_id not in rows]
+        return statuses, missing
@@ -7,7 +7,9 @@ from sqlalchemy.orm import Session
 from ..models.user import User, UserRole
 from ..repositories.user_repository import UserRepository
 from ..schemas.user_schema import UserCreate, UserUpdate
+from ..core.cache import invalidate_user
 from ..core.security import get_password_hash
+from ..core.unit_of_work import UnitOfWork
 from ..exceptions.custom_exceptions import (
     UserNotFoundException,
     EmailAlreadyExistsException
@@ -58,17 +60,24 @@ class UserService:
             role=user_data.role
         )
         
-        return self.user_repo.create(user)
+        with UnitOfWork(self.db):
+            return self.user_repo.create(user)
     
     def update_user(self, user_id: UUID, update_data: UserUpdate) -> User:
         """Update a user"""
         user = self.get_user(user_id)
-        return self.user_repo.update(user, update_data.model_dump(exclude_unset=True))
+        with UnitOfWork(self.db):
+            user = self.user_repo.update(user, update_data.model_dump(exclude_unset=True))
+        invalidate_user(user_id)
+        return user
     
     def delete_user(self, user_id: UUID) -> bool:
         """Delete a user"""
         user = self.get_user(user_id)
-        return self.user_repo.delete(user)
+        with UnitOfWork(self.db):
+            deleted = self.user_repo.delete(user)
+        invalidate_user(user_id)
+        return deleted
     
     def get_agents(self) -> List[User]:
         """Get all delivery agents"""
@@ -76,9 +85,10 @@ class UserService:
     
     def count_by_role(self) -> dict:
         """Get user count by role"""
+        counts = self.user_repo.count_by_role()
         return {
-            "total": self.user_repo.count(),
-            "customers": self.user_repo.count(UserRole.CUSTOMER),
-            "agents": self.user_repo.count(UserRole.AGENT),
-            "admins": self.user_repo.count(UserRole.ADMIN)
+            "total": sum(counts.values()),
+            "customers": counts.get(UserRole.CUSTOMER, 0),
+            "agents": counts.get(UserRole.AGENT, 0),
+            "admins": counts.get(UserRole.ADMIN, 0)
         }
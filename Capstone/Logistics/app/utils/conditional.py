@@ -0,0 +1,101 @@
+"""
+Conditional GET helpers (ETag / Last-Modified)
+
+A shipment's representations change only when its row changes (which
+bumps updated_at; new tracking updates also refresh its latest-tracking
+snapshot) or its tracking history gains or loses rows. Its validator is
+therefore (updated_at, live tracking update count): readable with one
+cheap query, and derivable from an already loaded shipment.
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Tuple
+from starlette.responses import Response
+
+
+def shipment_etag(updated_at: datetime, tracking_count: int) -> str:
+    """Weak ETag of a shipment's representations"""
+    micros = int(updated_at.replace(tzinfo=timezone.utc).timestamp() * 1_000_000)
+    return f'W/"{micros:x}-{tracking_count:x}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date (second precision)"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def validator_headers(etag: str, updated_at: datetime, private: bool = False) -> Dict[str, str]:
+    """Response headers letting clients revalidate instead of re-downloading"""
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(updated_at),
+        # Cacheable, but only after revalidation
+        "Cache-Control": "private, no-cache" if private else "no-cache"
+    }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match list"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, updated_at: datetime) -> bool:
+    """
+    Whether a GET can be answered with 304 Not Modified.
+    
+    If-None-Match takes precedence; If-Modified-Since is only used
+    without it (RFC 9110).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and updated_at.replace(microsecond=0) <= since
+    return False
+
+
+def is_conditional(headers: Mapping[str, str]) -> bool:
+    """Whether the request carries a validator worth checking before loading anything"""
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def not_modified_response(etag: str, updated_at: datetime, private: bool = False) -> Response:
+    """304 Not Modified carrying the current validators"""
+    return Response(status_code=304, headers=validator_headers(etag, updated_at, private))
+
+
+def pack_validated(etag: str, updated_at: datetime, payload: str) -> str:
+    """Cache entry holding a payload with its validators"""
+    return f"{etag}\t{updated_at.isoformat()}\n{payload}"
+
+
+def unpack_validated(value: Optional[str]) -> Optional[Tuple[str, datetime, str]]:
+    """(etag, updated_at, payload) of a pack_validated entry; None for a miss or another format"""
+    if not value:
+        return None
+    header, separator, payload = value.partition("\n")
+    etag, tab, updated_at = header.partition("\t")
+    if not separator or not tab:
+        return None
+    try:
+        return etag, datetime.fromisoformat(updated_at), payload
+    except ValueError:
+        return None
@@ -0,0 +1,87 @@
+"""
+Geospatial helpers - great-circle distances and nearest-point search
+
+Points are indexed as 3D unit vectors on the sphere: straight-line (chord)
+distance between them orders points exactly like great-circle distance,
+and the antimeridian and poles need no special cases.
+"""
+import heapq
+import math
+from typing import List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+Vector = Tuple[float, float, float]
+
+
+def to_unit_vector(latitude: float, longitude: float) -> Vector:
+    """Unit vector of a (latitude, longitude) point in degrees"""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord_squared: float) -> float:
+    """Great-circle distance (km) for a squared chord length between unit vectors"""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_squared) / 2))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance (km) between two points in degrees"""
+    a = to_unit_vector(lat1, lon1)
+    b = to_unit_vector(lat2, lon2)
+    return chord_to_km(sum((x - y) ** 2 for x, y in zip(a, b)))
+
+
+class KDTree:
+    """Static k-d tree over 3D points, built once and queried many times"""
+    
+    def __init__(self, points: Sequence[Vector]):
+        self.points = list(points)
+        self._root = self._build(list(range(len(self.points))), 0)
+    
+    def __len__(self) -> int:
+        return len(self.points)
+    
+    def _build(self, indices: List[int], depth: int) -> Optional[tuple]:
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda index: self.points[index][axis])
+        middle = len(indices) // 2
+        return (
+            indices[middle],
+            axis,
+            self._build(indices[:middle], depth + 1),
+            self._build(indices[middle + 1:], depth + 1)
+        )
+    
+    def nearest(self, point: Vector, k: int = 1) -> List[Tuple[float, int]]:
+        """(squared distance, point index) of the `k` points closest to `point`, closest first"""
+        if k <= 0 or self._root is None:
+            return []
+        best: List[Tuple[float, int]] = []  # max-heap of (-distance, -index)
+        
+        def visit(node: Optional[tuple]) -> None:
+            if node is None:
+                return
+            index, axis, left, right = node
+            candidate = self.points[index]
+            distance = (
+                (candidate[0] - point[0]) ** 2
+                + (candidate[1] - point[1]) ** 2
+                + (candidate[2] - point[2]) ** 2
+            )
+            entry = (-distance, -index)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+            offset = point[axis] - candidate[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            # The far side can only help if the splitting plane is closer than the worst kept point
+            if len(best) < k or offset * offset <= -best[0][0]:
+                visit(far)
+        
+        visit(self._root)
+        return sorted((-distance, -index) for distance, index in best)
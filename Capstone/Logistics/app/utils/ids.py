@@ -0,0 +1,106 @@
+"""
+Time-ordered identifiers
+
+Random (uuid4) keys spread inserts across the whole primary-key and
+tracking-number B-trees. These generators put the creation time first, so
+new rows land on the right-most pages of each index.
+"""
+import os
+import random
+import secrets
+import threading
+import time
+import uuid
+
+# UUIDv7 (RFC 9562): 48-bit Unix ms timestamp, version, 12-bit counter
+# (rand_a, method 1: "fixed bit-length dedicated counter"), variant, 62 random bits
+_UUID7_COUNTER_MAX = 0xFFF
+_UUID7_VERSION = 0x7 << 76
+_UUID7_VARIANT = 0b10 << 62
+
+# Tracking numbers: TRK + 3 base36 digits of the UTC day since TRACKING_EPOCH
+# (~127 years) + 9 digits from the CSPRNG (~46.5 bits). Tracking numbers
+# are the only credential for the public tracking endpoints, so apart
+# from the coarse day prefix, which keeps a day's inserts on neighbouring
+# index pages, they must not be guessable from one another.
+TRACKING_EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+TRACKING_PREFIX = "TRK"
+TRACKING_DAY_DIGITS = 3
+TRACKING_RANDOM_DIGITS = 9
+_BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+
+
+def _reset_after_fork() -> None:
+    """Give a forked worker its own generator state"""
+    global _lock, _uuid7_last_ms
+    _lock = threading.Lock()
+    _uuid7_last_ms = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (version 7).
+    
+    Monotonic within the process: ids from the same millisecond take the
+    next counter value (starting from a random point with headroom), and
+    a counter overflow or a clock step backwards reuses the last
+    timestamp + 1 ms instead of going back in time.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            _uuid7_last_ms = now_ms
+            _uuid7_counter = random.getrandbits(11)
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > _UUID7_COUNTER_MAX:
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        timestamp, counter = _uuid7_last_ms, _uuid7_counter
+    
+    value = (
+        (timestamp & 0xFFFF_FFFF_FFFF) << 80
+        | _UUID7_VERSION
+        | counter << 64
+        | _UUID7_VARIANT
+        | random.getrandbits(62)
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7_timestamp_ms(value: uuid.UUID) -> int:
+    """Unix time in milliseconds encoded in a UUIDv7"""
+    return value.int >> 80
+
+
+def _base36(value: int, width: int) -> str:
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, 36)
+        digits.append(_BASE36[digit])
+    return "".join(reversed(digits))
+
+
+def time_ordered_tracking_number() -> str:
+    """
+    Generate a tracking number (TRK + 12 of [0-9A-Z]) that sorts by day.
+    
+    The random part makes numbers unguessable but not guaranteed unique:
+    callers insert them under the unique constraint and draw a new one on
+    a conflict.
+    """
+    day = max(int(time.time()) - TRACKING_EPOCH, 0) // 86400
+    return (
+        TRACKING_PREFIX
+        + _base36(day, TRACKING_DAY_DIGITS)
+        + _base36(secrets.randbelow(36 ** TRACKING_RANDOM_DIGITS), TRACKING_RANDOM_DIGITS)
+    )
@@ -0,0 +1,41 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+from ..exceptions.custom_exceptions import InvalidCursorException
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Encode a (created_at, id) position as an opaque cursor string"""
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode an opaque cursor string back into a (created_at, id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise InvalidCursorException(cursor)
+
+
+def encode_score_cursor(score: float, item_id: UUID) -> str:
+    """Encode a (score, id) position in ranked results as an opaque cursor string"""
+    raw = f"{score!r}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, UUID]:
+    """Decode an opaque ranked-results cursor back into a (score, id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, item_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return float(score), UUID(item_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise InvalidCursorException(cursor)
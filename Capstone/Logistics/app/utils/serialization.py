@@ -0,0 +1,78 @@
+"""
+Fast JSON responses (orjson)
+
+FastAPI's default path validates a returned ORM object against the
+response_model (twice when the route builds the model itself), converts
+it with jsonable_encoder and encodes it with the stdlib json module. The
+hot read schemas are flat views of already well-typed ORM rows, so
+OrmSerializer copies their fields straight off the rows and orjson encodes
+the result (UUID, datetime and enum values natively).
+"""
+import operator
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Type, get_args
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# Match pydantic's JSON output: UTC datetimes end in "Z"
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-compatible data (plus UUID, datetime, enum) with orjson"""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class: orjson instead of the stdlib encoder"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> FastJSONResponse:
+    """Response for content already shaped like the route's response_model (skips its validation)"""
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+class OrmSerializer:
+    """
+    Serializes ORM objects as `schema` would, without validating them.
+    
+    Only for flat schemas (no nested models) whose fields are plain ORM
+    attributes of the same types; nest the output of several serializers
+    for composite responses.
+    """
+    
+    def __init__(self, schema: Type[BaseModel]):
+        for name, field in schema.model_fields.items():
+            if _contains_model(field.annotation):
+                raise TypeError(f"{schema.__name__}.{name} is a nested model; OrmSerializer needs a flat schema")
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        getter = operator.attrgetter(*self.fields)
+        self._values = getter if len(self.fields) > 1 else lambda obj: (getter(obj),)
+    
+    def to_dict(self, obj: Any) -> Dict[str, Any]:
+        """The schema's fields of `obj`, ready for dumps()"""
+        return dict(zip(self.fields, self._values(obj)))
+    
+    def to_list(self, objs: Iterable[Any]) -> List[Dict[str, Any]]:
+        fields, values = self.fields, self._values
+        return [dict(zip(fields, values(obj))) for obj in objs]
+    
+    def dumps(self, obj: Any) -> bytes:
+        return dumps(self.to_dict(obj))
+    
+    def dumps_many(self, objs: Iterable[Any]) -> bytes:
+        return dumps(self.to_list(objs))
+
+
+def _contains_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_contains_model(arg) for arg in get_args(annotation))
@@ -20,8 +20,9 @@ def validate_phone(phone: str) -> bool:
 
 def validate_tracking_number(tracking_number: str) -> bool:
     """Validate tracking number format"""
-    # Format: TRK followed by 10 alphanumeric characters
-    pattern = r'^TRK[A-Z0-9]{10}$'
+    # Format: TRK followed by 12 alphanumeric characters (10 before the
+    # random day-prefixed numbers, still accepted for existing shipments)
+    pattern = r'^TRK(?:[A-Z0-9]{10}|[A-Z0-9]{12})$'
     return bool(re.match(pattern, tracking_number))
 
 
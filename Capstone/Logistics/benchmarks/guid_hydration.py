@@ -0,0 +1,136 @@
+"""
+Micro-benchmark - GUID bind/hydration cost per storage mode
+
+Loads N rows with four GUID columns (like a shipment list row: id,
+customer_id, agent_id, current_hub_id) into in-memory SQLite and times
+inserting them and reading them back as UUIDs, for:
+
+- legacy: the previous CHAR(36) TypeDecorator (process_bind_param /
+  process_result_value with uuid.UUID parsing per value)
+- char:   GUID CHAR(36) with the fast-path processors
+- binary: GUID BINARY(16)
+
+Run from Capstone/Logistics:
+    python -m benchmarks.guid_hydration [--rows 100000] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+import uuid
+from sqlalchemy import CHAR, Column, Integer, MetaData, Table, TypeDecorator, create_engine, insert, select
+
+from app.models.types import GUID
+
+GUID_COLUMNS = ("id", "customer_id", "agent_id", "current_hub_id")
+
+
+class LegacyGUID(TypeDecorator):
+    """The CHAR(36) GUID implementation before BINARY(16) storage was added"""
+    impl = CHAR
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        return dialect.type_descriptor(CHAR(36))
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return value
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return value
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(value)
+
+
+MODES = {
+    "legacy": LegacyGUID,
+    "char": lambda: GUID(binary=False),
+    "binary": lambda: GUID(binary=True)
+}
+
+
+def _best(timings):
+    return min(timings), statistics.median(timings)
+
+
+def run(mode: str, rows: int, repeat: int) -> dict:
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table(
+        "shipments",
+        metadata,
+        Column("pk", Integer, primary_key=True),
+        *(Column(name, MODES[mode]()) for name in GUID_COLUMNS)
+    )
+    metadata.create_all(engine)
+    
+    customers = [uuid.uuid4() for _ in range(1000)]
+    data = [
+        {
+            "id": uuid.uuid4(),
+            "customer_id": customers[i % len(customers)],
+            "agent_id": customers[(i * 7) % len(customers)],
+            "current_hub_id": None if i % 3 else customers[i % 50]
+        }
+        for i in range(rows)
+    ]
+    
+    with engine.begin() as conn:
+        start = time.perf_counter()
+        conn.execute(insert(table), data)
+        insert_time = time.perf_counter() - start
+        
+        statement = select(*(table.c[name] for name in GUID_COLUMNS))
+        # Driver-only fetch of the same rows, to separate hydration cost
+        raw_sql = f"SELECT {', '.join(GUID_COLUMNS)} FROM shipments"
+        conn.exec_driver_sql(raw_sql).fetchall()
+        
+        fetch, raw_fetch = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.exec_driver_sql(raw_sql).fetchall()
+            raw_fetch.append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            result = conn.execute(statement).all()
+            fetch.append(time.perf_counter() - start)
+        
+        size = conn.exec_driver_sql("SELECT sum(length(id)) FROM shipments").scalar()
+    
+    assert type(result[0].id) is uuid.UUID and result[0].id == data[0]["id"]
+    engine.dispose()
+    
+    best, median = _best(fetch)
+    return {
+        "mode": mode,
+        "insert_s": insert_time,
+        "fetch_best_s": best,
+        "fetch_median_s": median,
+        "hydration_s": best - min(raw_fetch),
+        "id_bytes": size // rows
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    print(f"{args.rows} rows x {len(GUID_COLUMNS)} GUID columns, best of {args.repeat}")
+    print(f"{'mode':<8}{'insert':>10}{'fetch':>10}{'median':>10}{'hydrate':>10}{'id size':>9}")
+    for mode in MODES:
+        r = run(mode, args.rows, args.repeat)
+        print(
+            f"{r['mode']:<8}{r['insert_s']:>9.3f}s{r['fetch_best_s']:>9.3f}s"
+            f"{r['fetch_median_s']:>9.3f}s{r['hydration_s']:>9.3f}s{r['id_bytes']:>8}B"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark - insert throughput with random vs time-ordered keys
+
+Inserts N shipment-like rows (GUID primary key, unique tracking number)
+in committed batches into a file-backed SQLite database with a small page
+cache, so index inserts that land on random pages have to hit the disk
+cache, as on a database larger than memory. Compares:
+
+- random:       uuid4 ids and random hex tracking numbers (previous scheme)
+- time-ordered: uuid7 ids and time-ordered tracking numbers
+
+Run from Capstone/Logistics:
+    python -m benchmarks.id_insert_throughput [--rows 300000] [--batch 1000] [--cache-kb 2048]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, insert
+
+from app.models.types import GUID
+from app.utils.ids import time_ordered_tracking_number, uuid7
+
+
+def random_tracking_number() -> str:
+    return f"TRK{uuid.uuid4().hex[:10].upper()}"
+
+
+SCHEMES = {
+    "random": (uuid.uuid4, random_tracking_number),
+    "time-ordered": (uuid7, time_ordered_tracking_number)
+}
+
+
+def run(scheme: str, rows: int, batch: int, cache_kb: int, binary: bool) -> dict:
+    new_id, new_tracking_number = SCHEMES[scheme]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        
+        @event.listens_for(engine, "connect")
+        def _pragmas(dbapi_connection, connection_record):
+            dbapi_connection.execute(f"PRAGMA cache_size = -{cache_kb}")
+            dbapi_connection.execute("PRAGMA journal_mode = WAL")
+            dbapi_connection.execute("PRAGMA synchronous = NORMAL")
+        
+        metadata = MetaData()
+        table = Table(
+            "shipments",
+            metadata,
+            Column("id", GUID(binary=binary), primary_key=True),
+            Column("tracking_number", String(20), unique=True, index=True),
+            Column("customer_id", GUID(binary=binary), index=True),
+            Column("weight", Integer)
+        )
+        metadata.create_all(engine)
+        customer_id = uuid.uuid4()
+        
+        elapsed = 0.0
+        last_batch = 0.0
+        for _ in range(rows // batch):
+            data = [
+                {"id": new_id(), "tracking_number": new_tracking_number(), "customer_id": customer_id, "weight": 1}
+                for _ in range(batch)
+            ]
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                conn.execute(insert(table), data)
+            last_batch = time.perf_counter() - start
+            elapsed += last_batch
+        
+        engine.dispose()
+        size = os.path.getsize(path) + (os.path.getsize(path + "-wal") if os.path.exists(path + "-wal") else 0)
+    
+    return {
+        "scheme": scheme,
+        "rows_per_s": rows / elapsed,
+        "last_batch_rows_per_s": batch / last_batch,
+        "size_mb": size / 1024 / 1024
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--cache-kb", type=int, default=2048)
+    parser.add_argument("--binary", action="store_true", help="store GUIDs as BINARY(16)")
+    args = parser.parse_args()
+    
+    print(f"{args.rows} rows in batches of {args.batch}, {args.cache_kb} KB page cache")
+    print(f"{'scheme':<14}{'rows/s':>10}{'last batch':>12}{'db size':>10}")
+    for scheme in SCHEMES:
+        r = run(scheme, args.rows, args.batch, args.cache_kb, args.binary)
+        print(
+            f"{r['scheme']:<14}{r['rows_per_s']:>10.0f}{r['last_batch_rows_per_s']:>12.0f}"
+            f"{r['size_mb']:>8.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Micro-benchmark - per-item cost of serializing a shipment list page
+
+Builds pages of N transient Shipment ORM objects and times turning one
+page into response bytes, for:
+
+- fastapi: the previous path - the route builds ShipmentListResponse from
+  the ORM rows, then FastAPI's serialize_response re-validates it against
+  the response_model and JSONResponse encodes it with the stdlib json
+- pydantic: one validation (model_validate) plus pydantic's Rust encoder
+- orm: OrmSerializer field copy plus orjson (the current path)
+
+Run from Capstone/Logistics:
+    python -m benchmarks.response_serialization [--items 100] [--repeat 200]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import hub, stats, tracking, user  # noqa: F401 - register mappers
+from app.models.shipment import Shipment, ShipmentStatus
+from app.schemas.shipment_schema import ShipmentListResponse, ShipmentResponse
+from app.utils.ids import uuid7
+from app.utils.serialization import OrmSerializer, dumps
+
+RESPONSE_FIELD = create_response_field(name="response", type_=ShipmentListResponse)
+SERIALIZER = OrmSerializer(ShipmentResponse)
+# One loop for every run, so loop setup is not timed
+LOOP = asyncio.new_event_loop()
+
+
+def make_page(items: int):
+    now = datetime.utcnow()
+    customer_id = uuid7()
+    return [
+        Shipment(
+            id=uuid7(),
+            tracking_number=f"TRK{i:010d}",
+            customer_id=customer_id,
+            agent_id=uuid7() if i % 2 else None,
+            current_hub_id=uuid7() if i % 3 else None,
+            source_address="12 Anna Salai, Chennai, Tamil Nadu",
+            destination_address="45 MG Road, Bangalore, Karnataka",
+            weight=2.5 + i,
+            dimensions="10x20x30",
+            description="Electronics package",
+            status=ShipmentStatus.IN_TRANSIT,
+            current_location="Salem Hub",
+            created_at=now - timedelta(minutes=i),
+            updated_at=now
+        )
+        for i in range(items)
+    ]
+
+
+def fastapi_path(shipments) -> bytes:
+    content = ShipmentListResponse(shipments=shipments, total=len(shipments), page=1, page_size=len(shipments))
+    data = LOOP.run_until_complete(serialize_response(field=RESPONSE_FIELD, response_content=content))
+    return JSONResponse(data).body
+
+
+def pydantic_path(shipments) -> bytes:
+    return ShipmentListResponse.model_validate({
+        "shipments": shipments, "total": len(shipments), "page": 1, "page_size": len(shipments)
+    }).model_dump_json().encode()
+
+
+def orm_path(shipments) -> bytes:
+    return dumps({
+        "shipments": SERIALIZER.to_list(shipments),
+        "total": len(shipments),
+        "page": 1,
+        "page_size": len(shipments),
+        "next_cursor": None
+    })
+
+
+PATHS = {"fastapi": fastapi_path, "pydantic": pydantic_path, "orm": orm_path}
+
+
+def run(name: str, shipments, repeat: int) -> dict:
+    path = PATHS[name]
+    body = path(shipments)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path(shipments)
+        timings.append(time.perf_counter() - start)
+    return {
+        "path": name,
+        "best_us": min(timings) / len(shipments) * 1e6,
+        "median_us": statistics.median(timings) / len(shipments) * 1e6,
+        "bytes": len(body)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    
+    shipments = make_page(args.items)
+    # Same content on every path
+    assert json.loads(orm_path(shipments)) == json.loads(fastapi_path(shipments))
+    
+    print(f"{args.items} shipments per page, best of {args.repeat}; cost per item")
+    print(f"{'path':<10}{'best':>10}{'median':>10}{'page size':>11}")
+    for name in PATHS:
+        r = run(name, shipments, args.repeat)
+        print(f"{r['path']:<10}{r['best_us']:>8.2f}us{r['median_us']:>8.2f}us{r['bytes']:>10}B")
+
+
+if __name__ == "__main__":
+    main()
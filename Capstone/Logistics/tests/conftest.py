@@ -4,6 +4,11 @@ Test configuration and fixtures
 import os
 # Set testing environment before importing app
 os.environ["TESTING"] = "true"
+# Cheap bcrypt and a small hashing pool keep the suite fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("HASH_WORKERS", "2")
+# Profile queries so tests can count them and set per-endpoint budgets
+os.environ.setdefault("DB_PROFILING_ENABLED", "true")
 
 import pytest
 from typing import Generator
@@ -13,11 +18,15 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.core.cache import get_cache, get_user_cache
+from app.core.hub_registry import get_hub_registry
 from app.core.database import Base, get_db
+from app.core.profiling import install_query_profiler
 from app.core.security import get_password_hash
 from app.models.user import User, UserRole
 from app.models.hub import Hub
-from app.models.shipment import Shipment
+
+pytest_plugins = ["tests.query_budget"]
 
 # Test database URL - using SQLite for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -27,7 +36,8 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+install_query_profiler(engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 def override_get_db():
@@ -55,6 +65,18 @@ def db() -> Generator:
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with empty response and user caches and hub registry"""
+    get_cache().clear()
+    get_user_cache().clear()
+    get_hub_registry().invalidate()
+    yield
+    get_cache().clear()
+    get_user_cache().clear()
+    get_hub_registry().invalidate()
+
+
 @pytest.fixture(scope="function")
 def client(db) -> Generator:
     """Create a test client"""
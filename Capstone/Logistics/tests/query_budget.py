@@ -0,0 +1,125 @@
+"""
+Pytest plugin - SQL query counts and per-endpoint query budgets
+
+Both are built on the query profiler (app.core.profiling). Requests
+served while a test runs are profiled by QueryProfilerMiddleware and
+checked against the budgets set for their route when the test ends;
+count_queries collects the statements issued inside a block, by requests
+or by code the test calls directly.
+
+Usage:
+    def test_detail(client, count_queries):
+        with count_queries() as queries:
+            client.get(...)
+        assert queries.count == 3
+    
+    
+    @pytest.mark.query_budget({"GET /shipments/{shipment_id}": 3})
+    def test_detail(client, ...):
+        ...
+    
+    def test_list(client, query_budget):
+        query_budget.limit("GET /shipments", 4)
+        client.get("/shipments", ...)
+"""
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple
+import pytest
+
+from app.core.profiling import QueryStats, add_request_observer, profile_queries, remove_request_observer
+
+
+class ProfiledRequest(NamedTuple):
+    """Query stats of one request"""
+    endpoint: str
+    queries: int
+    db_time_ms: float
+
+
+class QueryBudget:
+    """Collects per-request query counts and checks them against budgets"""
+    
+    def __init__(self):
+        self.budgets: Dict[str, int] = {}
+        self.requests: List[ProfiledRequest] = []
+    
+    def limit(self, endpoint: str, max_queries: int) -> None:
+        """Allow at most `max_queries` per request to `METHOD /route/{template}`"""
+        self.budgets[endpoint] = max_queries
+    
+    def _observe(self, method: str, route: str, stats: QueryStats) -> None:
+        self.requests.append(ProfiledRequest(f"{method} {route}", stats.count, stats.total_time * 1000))
+    
+    def violations(self) -> List[str]:
+        return [
+            f"{request.endpoint}: {request.queries} queries (budget {self.budgets[request.endpoint]})"
+            for request in self.requests
+            if request.endpoint in self.budgets and request.queries > self.budgets[request.endpoint]
+        ]
+    
+    def unused(self) -> List[str]:
+        seen = {request.endpoint for request in self.requests}
+        return [endpoint for endpoint in self.budgets if endpoint not in seen]
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(budgets): fail if a request to an endpoint "
+        "('METHOD /route/{template}') issues more SQL statements than its budget"
+    )
+
+
+@pytest.fixture
+def query_budget(request) -> QueryBudget:
+    """Query budget for the current test, seeded from the query_budget marker"""
+    budget = QueryBudget()
+    for marker in request.node.iter_markers("query_budget"):
+        for endpoint, max_queries in marker.args[0].items():
+            budget.budgets.setdefault(endpoint, max_queries)
+    
+    add_request_observer(budget._observe)
+    try:
+        yield budget
+    finally:
+        remove_request_observer(budget._observe)
+    
+    violations = budget.violations()
+    if violations:
+        pytest.fail("Query budget exceeded:\n  " + "\n  ".join(violations), pytrace=False)
+    unused = budget.unused()
+    if unused:
+        pytest.fail(f"Query budget set for endpoints never requested: {unused}", pytrace=False)
+
+
+@pytest.fixture(autouse=True)
+def _query_budget_marker(request):
+    """Activate the query_budget fixture for tests using the marker"""
+    if request.node.get_closest_marker("query_budget") is not None:
+        request.getfixturevalue("query_budget")
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Count SQL statements issued inside a block.
+    
+    Yields QueryStats with `count` and `statements`.
+    """
+    @contextmanager
+    def _count():
+        counter = QueryStats(record_statements=True)
+        
+        def observe(method: str, route: str, stats: QueryStats) -> None:
+            counter.count += stats.count
+            counter.statements.extend(stats.statements or ())
+        
+        add_request_observer(observe)
+        try:
+            # Requests profile into their own stats and arrive through the observer
+            with profile_queries(stats=counter):
+                yield counter
+        finally:
+            remove_request_observer(observe)
+    
+    return _count
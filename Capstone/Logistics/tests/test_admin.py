@@ -1,7 +1,9 @@
 """
 Admin tests
 """
-import pytest
+import csv
+import io
+import json
 from uuid import uuid4
 from fastapi import status
 
@@ -171,6 +173,105 @@ class TestAdminReports:
         assert "total_agents" in data
         assert "total_hubs" in data
     
+    def test_report_counters_follow_status_changes(self, client, admin_token, customer_token, agent_token):
+        """Test the materialized counters track creates, transitions and cancels"""
+        ids = []
+        for i in range(3):
+            response = client.post(
+                "/shipments",
+                headers=auth_header(customer_token),
+                json={"source_address": f"City {i}", "destination_address": f"City {i+1}"}
+            )
+            ids.append(response.json()["id"])
+        
+        client.put(
+            f"/shipments/{ids[0]}/status",
+            headers=auth_header(agent_token),
+            json={"status": "in_transit", "location": "Salem Hub"}
+        )
+        client.put(
+            f"/shipments/{ids[0]}/status",
+            headers=auth_header(agent_token),
+            json={"status": "out_for_delivery", "location": "Salem Hub"}
+        )
+        client.put(
+            f"/shipments/{ids[0]}/status",
+            headers=auth_header(agent_token),
+            json={"status": "delivered", "location": "Customer Address"}
+        )
+        client.delete(f"/shipments/{ids[1]}", headers=auth_header(customer_token))
+        
+        data = client.get("/admin/reports", headers=auth_header(admin_token)).json()
+        assert data["total_shipments_today"] == 3
+        assert data["delivered"] == 1
+        assert data["in_transit"] == 0
+        assert data["cancelled"] == 1
+        assert data["created"] == 1
+        assert data["total_users"] == 3
+        assert data["total_customers"] == 1
+    
+    def test_report_query_count(self, client, count_queries, admin_token, test_hub):
+        """Test the report no longer fans out into per-status counts"""
+        with count_queries() as queries:
+            response = client.get("/admin/reports", headers=auth_header(admin_token))
+        assert response.status_code == status.HTTP_200_OK
+        # current user + daily stats row + users by role + hubs
+        assert queries.count == 4
+    
+    def test_daily_reports_range(self, client, admin_token, customer_token):
+        """Test the date-range statistics endpoint"""
+        from datetime import datetime, timedelta
+        today = datetime.utcnow().date()
+        for i in range(2):
+            client.post(
+                "/shipments",
+                headers=auth_header(customer_token),
+                json={"source_address": f"City {i}", "destination_address": f"City {i+1}"}
+            )
+        
+        response = client.get(
+            f"/admin/reports/daily?start_date={today - timedelta(days=7)}&end_date={today}",
+            headers=auth_header(admin_token)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [day["day"] for day in data["days"]] == [str(today)]
+        assert data["totals"]["total"] == 2
+        assert data["totals"]["created"] == 2
+    
+    def test_daily_reports_invalid_range(self, client, admin_token):
+        """Test an inverted date range is rejected"""
+        response = client.get(
+            "/admin/reports/daily?start_date=2024-02-01&end_date=2024-01-01",
+            headers=auth_header(admin_token)
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_rebuild_reports(self, client, db, admin_token, customer_token):
+        """Test rebuilding the statistics from the shipments table"""
+        from datetime import datetime
+        from app.models.stats import ShipmentDailyStats
+        today = datetime.utcnow().date()
+        for i in range(2):
+            client.post(
+                "/shipments",
+                headers=auth_header(customer_token),
+                json={"source_address": f"City {i}", "destination_address": f"City {i+1}"}
+            )
+        # Simulate drift
+        db.query(ShipmentDailyStats).delete()
+        db.commit()
+        
+        response = client.post(
+            f"/admin/reports/rebuild?start_date={today}&end_date={today}",
+            headers=auth_header(admin_token)
+        )
+        assert response.json()["days_rebuilt"] == 1
+        
+        data = client.get("/admin/reports", headers=auth_header(admin_token)).json()
+        assert data["total_shipments_today"] == 2
+        assert data["created"] == 2
+    
     def test_customer_cannot_access_reports(self, client, customer_token):
         """Test that customer cannot access reports"""
         response = client.get(
@@ -211,3 +312,82 @@ class TestAdminShipmentManagement:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert len(data["shipments"]) >= 1
+
+
+class TestShipmentExport:
+    """Test the streaming shipment export"""
+    
+    def create_shipments(self, client, customer_token, count):
+        for i in range(count):
+            client.post(
+                "/shipments",
+                headers=auth_header(customer_token),
+                json={"source_address": f"Chennai, Gate {i}", "destination_address": "Bangalore"}
+            )
+    
+    def test_export_csv(self, client, admin_token, customer_token, monkeypatch):
+        """Test CSV export streams a header and every row across batches"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+        self.create_shipments(client, customer_token, 5)
+        
+        response = client.get("/admin/shipments/export", headers=auth_header(admin_token))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0][:2] == ["id", "tracking_number"]
+        assert len(rows) == 6
+        # addresses containing commas are quoted
+        assert rows[1][rows[0].index("source_address")] == "Chennai, Gate 0"
+        assert rows[1][rows[0].index("status")] == "created"
+    
+    def test_export_ndjson_with_filters(self, client, admin_token, customer_token, agent_token):
+        """Test NDJSON export honours the status filter"""
+        self.create_shipments(client, customer_token, 2)
+        shipment_id = client.get("/shipments", headers=auth_header(customer_token)).json()["shipments"][0]["id"]
+        client.put(
+            f"/shipments/{shipment_id}/status",
+            headers=auth_header(agent_token),
+            json={"status": "picked_up", "location": "Chennai Hub"}
+        )
+        
+        response = client.get(
+            "/admin/shipments/export",
+            headers=auth_header(admin_token),
+            params={"format": "ndjson", "status": "picked_up"}
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["id"] for line in lines] == [shipment_id]
+        assert lines[0]["status"] == "picked_up"
+    
+    def test_export_date_range(self, client, admin_token, customer_token):
+        """Test the creation date range filter"""
+        self.create_shipments(client, customer_token, 1)
+        
+        response = client.get(
+            "/admin/shipments/export",
+            headers=auth_header(admin_token),
+            params={"format": "ndjson", "start_date": "2000-01-01", "end_date": "2000-01-31"}
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == ""
+    
+    def test_export_invalid_range(self, client, admin_token):
+        """Test an inverted date range is rejected before streaming"""
+        response = client.get(
+            "/admin/shipments/export",
+            headers=auth_header(admin_token),
+            params={"start_date": "2024-02-01", "end_date": "2024-01-01"}
+        )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_customer_cannot_export(self, client, customer_token):
+        """Test export is admin only"""
+        response = client.get("/admin/shipments/export", headers=auth_header(customer_token))
+        
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,127 @@
+"""
+Async repository tests
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.user import User, UserRole
+from app.models.hub import Hub
+from app.models.shipment import Shipment, ShipmentStatus
+from app.models.tracking import TrackingUpdate
+from app.repositories.shipment_repository import AsyncShipmentRepository
+from app.repositories.tracking_repository import AsyncTrackingRepository
+from app.repositories.hub_repository import AsyncHubRepository
+from app.repositories.user_repository import AsyncUserRepository
+
+
+@pytest_asyncio.fixture
+async def async_db():
+    """Create a fresh async SQLite database for each test"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def customer(async_db) -> User:
+    """Create a customer"""
+    user = User(
+        email="async@test.com",
+        password_hash="not-a-real-hash",
+        full_name="Async Customer",
+        role=UserRole.CUSTOMER
+    )
+    return await AsyncUserRepository(async_db).create(user)
+
+
+class TestAsyncShipmentRepository:
+    """Test the async shipment repository"""
+    
+    @pytest.mark.asyncio
+    async def test_get_by_tracking_number_loads_updates(self, async_db, customer):
+        """Test tracking lookup returns the shipment with its history"""
+        shipment_repo = AsyncShipmentRepository(async_db)
+        tracking_repo = AsyncTrackingRepository(async_db)
+        shipment = await shipment_repo.create(Shipment(
+            customer_id=customer.id,
+            source_address="Chennai",
+            destination_address="Bangalore"
+        ))
+        await tracking_repo.create(TrackingUpdate(
+            shipment_id=shipment.id,
+            location="Chennai",
+            status="created"
+        ))
+        async_db.expunge_all()
+        
+        found = await shipment_repo.get_by_tracking_number(shipment.tracking_number)
+        assert found is not None
+        assert found.id == shipment.id
+        assert [u.status for u in found.tracking_updates] == ["created"]
+    
+    @pytest.mark.asyncio
+    async def test_filters_and_counts(self, async_db, customer):
+        """Test listing and counting by customer and status"""
+        repo = AsyncShipmentRepository(async_db)
+        for i in range(3):
+            await repo.create(Shipment(
+                customer_id=customer.id,
+                source_address=f"City {i}",
+                destination_address=f"City {i + 1}"
+            ))
+        
+        assert await repo.count_by_customer(customer.id) == 3
+        assert len(await repo.get_by_customer(customer.id, skip=0, limit=2)) == 2
+        assert await repo.count(ShipmentStatus.CREATED) == 3
+        assert await repo.count(ShipmentStatus.DELIVERED) == 0
+    
+    @pytest.mark.asyncio
+    async def test_update_and_delete(self, async_db, customer):
+        """Test updating and deleting a shipment"""
+        repo = AsyncShipmentRepository(async_db)
+        shipment = await repo.create(Shipment(
+            customer_id=customer.id,
+            source_address="Chennai",
+            destination_address="Bangalore"
+        ))
+        
+        updated = await repo.update(shipment, {"status": ShipmentStatus.IN_TRANSIT, "weight": None})
+        assert updated.status == ShipmentStatus.IN_TRANSIT
+        
+        assert await repo.delete(updated) is True
+        assert await repo.get_by_id(shipment.id) is None
+
+
+class TestAsyncHubAndUserRepository:
+    """Test the async hub and user repositories"""
+    
+    @pytest.mark.asyncio
+    async def test_hub_lookups(self, async_db):
+        """Test hub lookups by name and city"""
+        repo = AsyncHubRepository(async_db)
+        await repo.create(Hub(hub_name="Chennai Hub", city="Chennai"))
+        await repo.create(Hub(hub_name="Salem Hub", city="Salem", is_active=False))
+        
+        assert (await repo.get_by_name("Chennai Hub")).city == "Chennai"
+        assert len(await repo.get_by_city("Salem")) == 1
+        assert await repo.count() == 2
+        assert await repo.count(active_only=True) == 1
+    
+    @pytest.mark.asyncio
+    async def test_user_lookups(self, async_db, customer):
+        """Test user lookups by email and role"""
+        repo = AsyncUserRepository(async_db)
+        assert (await repo.get_by_email("async@test.com")).id == customer.id
+        assert await repo.count(UserRole.CUSTOMER) == 1
+        assert await repo.get_agents() == []
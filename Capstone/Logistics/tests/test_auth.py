@@ -143,3 +143,89 @@ class TestAuthToken:
         """Test accessing protected route without token"""
         response = client.get("/shipments")
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestCurrentUserCache:
+    """Test the cached current-user lookup"""
+    
+    def test_repeat_request_skips_user_lookup(self, client, count_queries, customer_token):
+        """Test only the first authenticated request loads the user"""
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        with count_queries() as first:
+            client.get("/shipments", headers=headers)
+        with count_queries() as second:
+            client.get("/shipments", headers=headers)
+        
+        users_queries = [s for s in first.statements if "FROM users" in s]
+        assert len(users_queries) == 1
+        assert not [s for s in second.statements if "FROM users" in s]
+    
+    def test_separate_from_response_cache(self, client, count_queries, customer_token, test_customer):
+        """Test user snapshots live in their own cache, unaffected by the response cache"""
+        from app.core.cache import current_user_key, get_cache, get_user_cache
+        
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        client.get("/shipments", headers=headers)
+        assert get_user_cache().get(current_user_key(test_customer.id)) is not None
+        assert get_cache().get(current_user_key(test_customer.id)) is None
+        
+        get_cache().clear()
+        with count_queries() as queries:
+            client.get("/shipments", headers=headers)
+        assert not [s for s in queries.statements if "FROM users" in s]
+    
+    def test_deactivation_invalidates_cache(self, client, customer_token, admin_token, test_customer):
+        """Test a deactivated user is rejected on the next request"""
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        assert client.get("/shipments", headers=headers).status_code == status.HTTP_200_OK
+        
+        response = client.put(
+            f"/admin/users/{test_customer.id}",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            json={"is_active": False}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        
+        response = client.get("/shipments", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_deleted_user_rejected(self, client, customer_token, admin_token, test_customer):
+        """Test a deleted user's token stops working immediately"""
+        headers = {"Authorization": f"Bearer {customer_token}"}
+        assert client.get("/shipments", headers=headers).status_code == status.HTTP_200_OK
+        
+        client.delete(
+            f"/admin/users/{test_customer.id}",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        
+        response = client.get("/shipments", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestTrustTokenClaims:
+    """Test role checks from token claims (AUTH_TRUST_TOKEN_CLAIMS)"""
+    
+    @pytest.fixture(autouse=True)
+    def trust_claims(self, monkeypatch):
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    
+    def test_role_check_without_user_lookup(self, client, count_queries, admin_token):
+        """Test an admin route authorizes without reading the user"""
+        with count_queries() as queries:
+            response = client.get(
+                "/admin/agents",
+                headers={"Authorization": f"Bearer {admin_token}"}
+            )
+        assert response.status_code == status.HTTP_200_OK
+        # the only users query is the agents listing itself
+        assert len([s for s in queries.statements if "FROM users" in s]) == 1
+    
+    def test_role_claim_denied(self, client, customer_token):
+        """Test a customer token is rejected on an admin route"""
+        response = client.get(
+            "/admin/agents",
+            headers={"Authorization": f"Bearer {customer_token}"}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
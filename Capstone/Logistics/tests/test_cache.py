@@ -0,0 +1,116 @@
+"""
+Response cache tests
+"""
+import time
+from fastapi import status
+
+from app.core.cache import InMemoryCache
+from app.models.shipment import Shipment
+from tests.conftest import auth_header
+
+
+class TestInMemoryCache:
+    """Test the in-process LRU+TTL backend"""
+    
+    def test_get_set_delete(self):
+        """Test basic get/set/delete"""
+        cache = InMemoryCache(max_entries=10, default_ttl=60)
+        cache.set("a", "1")
+        assert cache.get("a") == "1"
+        cache.delete("a", "missing")
+        assert cache.get("a") is None
+    
+    def test_evicts_least_recently_used(self):
+        """Test LRU eviction when the cache is full"""
+        cache = InMemoryCache(max_entries=2, default_ttl=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert len(cache) == 2
+    
+    def test_entries_expire(self):
+        """Test TTL expiry"""
+        cache = InMemoryCache(max_entries=10, default_ttl=60)
+        cache.set("a", "1", ttl=0)
+        time.sleep(0.01)
+        assert cache.get("a") is None
+
+
+class TestTrackingCache:
+    """Test caching of the public tracking endpoints"""
+    
+    def _create_shipment(self, client, token) -> dict:
+        response = client.post(
+            "/shipments",
+            headers=auth_header(token),
+            json={
+                "source_address": "Chennai",
+                "destination_address": "Bangalore"
+            }
+        )
+        return response.json()
+    
+    def test_track_response_is_cached(self, client, db, customer_token):
+        """Test repeated lookups are served from the cache"""
+        created = self._create_shipment(client, customer_token)
+        tracking_number = created["tracking_number"]
+        
+        first = client.get(f"/shipments/track/{tracking_number}")
+        assert first.status_code == status.HTTP_200_OK
+        
+        # Change the row behind the service layer's back: the cached copy wins
+        shipment = db.query(Shipment).filter(Shipment.tracking_number == tracking_number).first()
+        shipment.current_location = "Changed directly"
+        db.commit()
+        
+        second = client.get(f"/shipments/track/{tracking_number}")
+        assert second.json() == first.json()
+    
+    def test_status_update_invalidates(self, client, customer_token, agent_token):
+        """Test status updates invalidate both cached tracking responses"""
+        created = self._create_shipment(client, customer_token)
+        tracking_number = created["tracking_number"]
+        client.get(f"/shipments/track/{tracking_number}")
+        client.get(f"/tracking/number/{tracking_number}")
+        
+        client.put(
+            f"/shipments/{created['id']}/status",
+            headers=auth_header(agent_token),
+            json={"status": "in_transit", "location": "Salem Hub"}
+        )
+        
+        track = client.get(f"/shipments/track/{tracking_number}").json()
+        assert track["status"] == "in_transit"
+        assert track["current_location"] == "Salem Hub"
+        history = client.get(f"/tracking/number/{tracking_number}").json()
+        assert history["total_updates"] == 2
+    
+    def test_tracking_update_invalidates(self, client, customer_token, agent_token):
+        """Test adding a tracking update invalidates the history"""
+        created = self._create_shipment(client, customer_token)
+        tracking_number = created["tracking_number"]
+        client.get(f"/tracking/number/{tracking_number}")
+        
+        client.post(
+            f"/tracking/{created['id']}",
+            headers=auth_header(agent_token),
+            json={"location": "Salem Hub", "status": "in_transit"}
+        )
+        
+        history = client.get(f"/tracking/number/{tracking_number}").json()
+        assert history["total_updates"] == 2
+    
+    def test_cancel_invalidates(self, client, customer_token):
+        """Test cancelling a shipment invalidates the tracking response"""
+        created = self._create_shipment(client, customer_token)
+        tracking_number = created["tracking_number"]
+        client.get(f"/shipments/track/{tracking_number}")
+        
+        client.delete(f"/shipments/{created['id']}", headers=auth_header(customer_token))
+        
+        track = client.get(f"/shipments/track/{tracking_number}").json()
+        assert track["status"] == "cancelled"
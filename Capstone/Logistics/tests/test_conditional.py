@@ -0,0 +1,136 @@
+"""
+Conditional GET tests (ETag / Last-Modified)
+"""
+from datetime import datetime
+
+from fastapi import status
+
+from app.utils.conditional import is_not_modified, pack_validated, shipment_etag, unpack_validated
+from tests.conftest import auth_header
+
+
+class TestConditionalHelpers:
+    """Test validator helpers"""
+    
+    def test_etag_tracks_updated_at_and_count(self):
+        """Test the ETag changes with either half of the validator"""
+        updated_at = datetime(2026, 1, 2, 3, 4, 5, 678901)
+        etag = shipment_etag(updated_at, 3)
+        assert etag.startswith('W/"')
+        assert etag == shipment_etag(updated_at, 3)
+        assert etag != shipment_etag(updated_at, 4)
+        assert etag != shipment_etag(updated_at.replace(microsecond=678902), 3)
+    
+    def test_if_none_match_takes_precedence(self):
+        """Test If-Modified-Since is ignored when If-None-Match is present"""
+        updated_at = datetime(2026, 1, 2, 3, 4, 5)
+        etag = shipment_etag(updated_at, 1)
+        assert is_not_modified({"if-none-match": f'"other", {etag}'}, etag, updated_at)
+        assert is_not_modified({"if-none-match": "*"}, etag, updated_at)
+        assert not is_not_modified(
+            {"if-none-match": '"other"', "if-modified-since": "Fri, 02 Jan 2026 03:04:05 GMT"},
+            etag,
+            updated_at
+        )
+        assert is_not_modified({"if-modified-since": "Fri, 02 Jan 2026 03:04:05 GMT"}, etag, updated_at)
+        assert not is_not_modified({"if-modified-since": "not a date"}, etag, updated_at)
+    
+    def test_pack_round_trip(self):
+        """Test cache entries keep their validators and reject other formats"""
+        updated_at = datetime(2026, 1, 2, 3, 4, 5, 6)
+        packed = pack_validated('W/"1-2"', updated_at, '{"a": "x\\ny"}')
+        assert unpack_validated(packed) == ('W/"1-2"', updated_at, '{"a": "x\\ny"}')
+        assert unpack_validated('{"tracking_number": "TRK"}') is None
+        assert unpack_validated(None) is None
+
+
+class TestConditionalGet:
+    """Test 304 Not Modified on shipment and tracking reads"""
+    
+    def _create(self, client, customer_token):
+        return client.post(
+            "/shipments",
+            headers=auth_header(customer_token),
+            json={"source_address": "Chennai", "destination_address": "Bangalore"}
+        ).json()
+    
+    def test_shipment_detail_not_modified(self, client, customer_token, count_queries):
+        """Test If-None-Match answers 304 after one validator query"""
+        shipment = self._create(client, customer_token)
+        url = f"/shipments/{shipment['id']}"
+        
+        response = client.get(url, headers=auth_header(customer_token))
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers["etag"]
+        assert response.headers["last-modified"]
+        assert response.headers["cache-control"] == "private, no-cache"
+        
+        with count_queries() as queries:
+            response = client.get(url, headers={**auth_header(customer_token), "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        # Validator only (the current user comes from the auth cache)
+        assert queries.count == 1
+    
+    def test_etag_changes_after_tracking_update(self, client, customer_token, agent_token):
+        """Test a new tracking update invalidates the ETag"""
+        shipment = self._create(client, customer_token)
+        url = f"/tracking/{shipment['id']}"
+        etag = client.get(url).headers["etag"]
+        
+        client.post(url, headers=auth_header(agent_token), json={"location": "Salem Hub", "status": "at_hub"})
+        
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["total_updates"] == 2
+        assert response.headers["etag"] != etag
+        assert client.get(url, headers={"If-None-Match": response.headers["etag"]}).status_code == (
+            status.HTTP_304_NOT_MODIFIED
+        )
+    
+    def test_if_modified_since(self, client, customer_token):
+        """Test Last-Modified round-trips through If-Modified-Since"""
+        shipment = self._create(client, customer_token)
+        url = f"/tracking/{shipment['id']}"
+        last_modified = client.get(url).headers["last-modified"]
+        
+        response = client.get(url, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        response = client.get(url, headers={"If-Modified-Since": "Thu, 01 Jan 2015 00:00:00 GMT"})
+        assert response.status_code == status.HTTP_200_OK
+    
+    def test_cached_track_answers_without_queries(self, client, customer_token, count_queries):
+        """Test a cached tracking response revalidates without touching the database"""
+        shipment = self._create(client, customer_token)
+        url = f"/shipments/track/{shipment['tracking_number']}"
+        
+        response = client.get(url)
+        etag = response.headers["etag"]
+        with count_queries() as queries:
+            cached = client.get(url)
+            not_modified = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == status.HTTP_200_OK
+        assert cached.headers["etag"] == etag
+        assert cached.json() == response.json()
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert queries.count == 0
+    
+    def test_uncached_track_uses_validator_query(self, client, customer_token, count_queries):
+        """Test a conditional lookup on a cache miss runs only the validator query"""
+        from app.core.cache import get_cache
+        
+        shipment = self._create(client, customer_token)
+        url = f"/tracking/number/{shipment['tracking_number']}"
+        etag = client.get(url).headers["etag"]
+        get_cache().clear()
+        
+        with count_queries() as queries:
+            response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert queries.count == 1
+    
+    def test_conditional_unknown_shipment(self, client):
+        """Test conditional requests for unknown shipments still 404"""
+        response = client.get("/shipments/track/TRKUNKNOWN", headers={"If-None-Match": '"x"'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,102 @@
+"""
+Password hashing executor tests
+"""
+import pytest
+from fastapi import status
+from prometheus_client import REGISTRY
+
+from app.core import hashing
+from app.core.hashing import PasswordHasher, get_hasher
+from app.exceptions.custom_exceptions import HashingBusyException
+
+
+class TestPasswordHasher:
+    """Test the process-pool password hasher"""
+    
+    def test_hash_and_verify_in_pool(self):
+        """Test hashes computed by the pool verify correctly"""
+        hasher = get_hasher()
+        hashed = hasher.hash("password123")
+        
+        assert hashed.startswith("$2b$04$")
+        assert hasher.verify("password123", hashed) is True
+        assert hasher.verify("wrong", hashed) is False
+        assert hasher.pending == 0
+    
+    @pytest.mark.asyncio
+    async def test_async_api(self):
+        """Test the awaitable hash/verify variants"""
+        hasher = get_hasher()
+        hashed = await hasher.ahash("password123")
+        
+        assert await hasher.averify("password123", hashed) is True
+    
+    def test_inline_mode(self):
+        """Test workers=0 hashes in the calling thread"""
+        hasher = PasswordHasher(workers=0, max_pending=4, rounds=4)
+        
+        assert hasher.verify("secret", hasher.hash("secret")) is True
+        assert hasher._executor is None
+    
+    def test_admission_control(self):
+        """Test a full queue is rejected instead of waiting"""
+        hasher = PasswordHasher(workers=0, max_pending=0, rounds=4)
+        
+        with pytest.raises(HashingBusyException):
+            hasher.hash("secret")
+        assert hasher.pending == 0
+    
+    def test_queue_depth_gauge(self):
+        """Test the queue depth is published as a Prometheus gauge"""
+        hasher = PasswordHasher(workers=0, max_pending=4, rounds=4)
+        before = REGISTRY.get_sample_value("password_hash_pending")
+        
+        hasher._admit()
+        assert REGISTRY.get_sample_value("password_hash_pending") == before + 1
+        hasher._release()
+        assert REGISTRY.get_sample_value("password_hash_pending") == before
+    
+    def test_workers_split_between_api_workers(self, monkeypatch):
+        """Test the default pool size divides the CPUs between API workers"""
+        monkeypatch.setattr(hashing.settings, "HASH_WORKERS", None)
+        monkeypatch.setattr(hashing.settings, "WEB_CONCURRENCY", 4)
+        monkeypatch.setattr(hashing.os, "cpu_count", lambda: 8)
+        get_hasher.cache_clear()
+        try:
+            assert get_hasher().workers == 2
+            monkeypatch.setattr(hashing.settings, "WEB_CONCURRENCY", 16)
+            get_hasher.cache_clear()
+            assert get_hasher().workers == 1
+        finally:
+            get_hasher.cache_clear()
+    
+    def test_shutdown_stops_pool(self):
+        """Test shutdown stops the workers and a later call starts a new pool"""
+        hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+        hashed = hasher.hash("secret")
+        
+        hasher.shutdown()
+        assert hasher._executor is None
+        assert hasher.verify("secret", hashed) is True
+        hasher.shutdown()
+
+
+class TestHashingBusy:
+    """Test API behaviour when hashing is saturated"""
+    
+    def test_login_returns_503(self, client, test_customer, monkeypatch):
+        """Test login is shed with 503 while the queue is full"""
+        monkeypatch.setattr(get_hasher(), "max_pending", 0)
+        response = client.post(
+            "/auth/login",
+            data={"username": "customer@test.com", "password": "password123"}
+        )
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    def test_health_reports_queue_depth(self, client):
+        """Test the health endpoint exposes the hashing queue depth"""
+        response = client.get("/health")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["password_hashing"]["pending"] == 0
@@ -1,7 +1,6 @@
 """
 Hub tests
 """
-import pytest
 from uuid import uuid4
 from fastapi import status
 
@@ -190,3 +189,284 @@ class TestDeleteHub:
             headers=auth_header(customer_token)
         )
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestHubRegistry:
+    """Test hub reads are served from the in-memory registry"""
+    
+    def test_reads_skip_database(self, client, test_hub, count_queries):
+        """Test list, city and ID lookups hit the database once, to load the registry"""
+        with count_queries() as queries:
+            assert client.get("/hubs").json()["total"] == 1
+            assert client.get("/hubs?city=Chennai").json()["hubs"][0]["id"] == str(test_hub.id)
+            assert client.get(f"/hubs/{test_hub.id}").status_code == status.HTTP_200_OK
+        assert queries.count == 1
+    
+    def test_writes_refresh_registry(self, client, admin_token, test_hub):
+        """Test create, update and delete are visible to the next read"""
+        assert client.get("/hubs").json()["total"] == 1
+        
+        created = client.post(
+            "/hubs",
+            headers=auth_header(admin_token),
+            json={"hub_name": "Salem Hub", "city": "Salem"}
+        ).json()
+        assert [hub["hub_name"] for hub in client.get("/hubs").json()["hubs"]] == [
+            "Chennai Central Hub", "Salem Hub"
+        ]
+        
+        client.put(f"/hubs/{created['id']}", headers=auth_header(admin_token), json={"is_active": False})
+        assert client.get("/hubs?active_only=true").json()["total"] == 1
+        
+        client.delete(f"/hubs/{created['id']}", headers=auth_header(admin_token))
+        assert client.get(f"/hubs/{created['id']}").status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_lookup_miss_falls_back_to_database(self, client, db, agent_token, test_hub):
+        """Test ID lookups see hubs created by other workers, and refresh the registry"""
+        from app.models.hub import Hub
+        
+        assert client.get("/hubs").json()["total"] == 1  # warm the registry
+        other_worker_hub = Hub(hub_name="Madurai Hub", city="Madurai")
+        db.add(other_worker_hub)
+        db.commit()
+        
+        response = client.get(f"/hubs/{other_worker_hub.id}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["hub_name"] == "Madurai Hub"
+        load = client.get(f"/hubs/{other_worker_hub.id}/load", headers=auth_header(agent_token))
+        assert load.status_code == status.HTTP_200_OK
+        assert client.get("/hubs").json()["total"] == 2
+    
+    def test_invalidation_during_load_wins(self):
+        """Test a load that started before a hub write does not install a stale snapshot"""
+        from app.core.hub_registry import HubRegistry
+        
+        registry = HubRegistry()
+        
+        def load():
+            registry.invalidate()  # A write commits while the load runs
+            return []
+        
+        registry.snapshot(load)
+        assert registry.current() is None
+
+
+class TestNearestHubs:
+    """Test the nearest-hub lookup"""
+    
+    HUBS = (
+        ("Chennai Port Hub", "Chennai", 13.0827, 80.2707),
+        ("Bangalore Hub", "Bangalore", 12.9716, 77.5946),
+        ("Mumbai Hub", "Mumbai", 19.0760, 72.8777),
+        ("Delhi Hub", "Delhi", 28.7041, 77.1025)
+    )
+    
+    def _create_hubs(self, client, admin_token):
+        return {
+            name: client.post(
+                "/hubs",
+                headers=auth_header(admin_token),
+                json={"hub_name": name, "city": city, "latitude": lat, "longitude": lon}
+            ).json()
+            for name, city, lat, lon in self.HUBS
+        }
+    
+    def test_nearest_hubs_ordered_by_distance(self, client, admin_token):
+        """Test hubs come back nearest first with great-circle distances"""
+        self._create_hubs(client, admin_token)
+        
+        # Vellore
+        response = client.get("/hubs/nearest?lat=12.9165&lon=79.1325&k=3")
+        assert response.status_code == status.HTTP_200_OK
+        hubs = response.json()["hubs"]
+        assert [hub["hub_name"] for hub in hubs] == ["Chennai Port Hub", "Bangalore Hub", "Mumbai Hub"]
+        assert 115 < hubs[0]["distance_km"] < 130
+        assert hubs[0]["latitude"] == 13.0827
+    
+    def test_inactive_and_unlocated_hubs_skipped(self, client, admin_token, test_hub):
+        """Test only active hubs with coordinates are candidates"""
+        hubs = self._create_hubs(client, admin_token)
+        client.put(
+            f"/hubs/{hubs['Chennai Port Hub']['id']}",
+            headers=auth_header(admin_token),
+            json={"is_active": False}
+        )
+        
+        response = client.get("/hubs/nearest?lat=13.08&lon=80.27&k=20")
+        names = [hub["hub_name"] for hub in response.json()["hubs"]]
+        assert names == ["Bangalore Hub", "Mumbai Hub", "Delhi Hub"]
+    
+    def test_invalid_coordinates(self, client):
+        """Test out-of-range coordinates and k are rejected"""
+        assert client.get("/hubs/nearest?lat=91&lon=0").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/hubs/nearest?lat=0&lon=181").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/hubs/nearest?lat=0&lon=0&k=0").status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/hubs/nearest?lat=0&lon=0").json() == {"hubs": []}
+    
+    def test_kd_tree_matches_brute_force(self):
+        """Test the k-d tree returns the same neighbours as a linear scan"""
+        import random
+        from app.utils.geo import KDTree, haversine_km, to_unit_vector
+        
+        rng = random.Random(7)
+        points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(500)]
+        tree = KDTree([to_unit_vector(lat, lon) for lat, lon in points])
+        for _ in range(50):
+            lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            expected = sorted(range(len(points)), key=lambda i: haversine_km(lat, lon, *points[i]))[:5]
+            assert [index for _, index in tree.nearest(to_unit_vector(lat, lon), 5)] == expected
+
+
+class TestHubLoad:
+    """Test the maintained per-hub occupancy counters"""
+    
+    def _shipment(self, client, customer_token):
+        return client.post(
+            "/shipments",
+            headers=auth_header(customer_token),
+            json={"source_address": "Chennai", "destination_address": "Bangalore"}
+        ).json()["id"]
+    
+    def _status(self, client, agent_token, shipment_id, new_status, hub_id=None):
+        body = {"status": new_status, "location": "Scan point"}
+        if hub_id is not None:
+            body["hub_id"] = str(hub_id)
+        return client.put(f"/shipments/{shipment_id}/status", headers=auth_header(agent_token), json=body)
+    
+    def _load(self, client, token, hub_id):
+        return client.get(f"/hubs/{hub_id}/load", headers=auth_header(token)).json()
+    
+    def _second_hub(self, client, admin_token):
+        return client.post(
+            "/hubs",
+            headers=auth_header(admin_token),
+            json={"hub_name": "Salem Hub", "city": "Salem", "capacity": 1}
+        ).json()["id"]
+    
+    def test_status_updates_move_load(self, client, customer_token, agent_token, admin_token, test_hub):
+        """Test arriving at and leaving a hub adjust its load"""
+        first = self._shipment(client, customer_token)
+        second = self._shipment(client, customer_token)
+        
+        assert self._status(client, agent_token, first, "at_hub", test_hub.id).status_code == status.HTTP_200_OK
+        self._status(client, agent_token, second, "at_hub", test_hub.id)
+        load = self._load(client, agent_token, test_hub.id)
+        assert load["current_load"] == 2
+        assert load["available"] == 998
+        assert load["utilization"] == 0.002
+        assert load["over_capacity"] is False
+        
+        # Leaving keeps current_hub_id but no longer counts
+        self._status(client, agent_token, first, "out_for_delivery")
+        assert self._load(client, agent_token, test_hub.id)["current_load"] == 1
+        
+        # Moving straight to another hub
+        salem = self._second_hub(client, admin_token)
+        self._status(client, agent_token, second, "at_hub", salem)
+        assert self._load(client, agent_token, test_hub.id)["current_load"] == 0
+        assert self._load(client, agent_token, salem)["current_load"] == 1
+        
+        # Arrival at an unnamed hub clears the hub
+        self._status(client, agent_token, second, "at_hub")
+        assert self._load(client, agent_token, salem)["current_load"] == 0
+    
+    def test_unknown_hub_rejected(self, client, customer_token, agent_token):
+        """Test a status update naming an unknown hub fails without changes"""
+        shipment_id = self._shipment(client, customer_token)
+        response = self._status(client, agent_token, shipment_id, "at_hub", uuid4())
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert client.get(f"/shipments/{shipment_id}", headers=auth_header(agent_token)).json()["status"] == "created"
+    
+    def test_hub_checked_against_database(self, client, db, customer_token, agent_token, test_hub):
+        """Test status updates see hubs written by other workers, not the registry snapshot"""
+        from app.models.hub import Hub
+        
+        client.get("/hubs", headers=auth_header(agent_token))  # warm the registry
+        other_worker_hub = Hub(hub_name="Madurai Hub", city="Madurai")
+        db.add(other_worker_hub)
+        db.commit()
+        
+        first = self._shipment(client, customer_token)
+        assert self._status(client, agent_token, first, "at_hub", other_worker_hub.id).status_code == status.HTTP_200_OK
+        
+        db.delete(db.get(Hub, test_hub.id))
+        db.commit()
+        second = self._shipment(client, customer_token)
+        response = self._status(client, agent_token, second, "at_hub", test_hub.id)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_status_batch_moves_load(self, client, customer_token, agent_token, test_hub):
+        """Test synced scans adjust hub loads and reject unknown hubs per scan"""
+        from datetime import datetime, timedelta, timezone
+        
+        shipments = [self._shipment(client, customer_token) for _ in range(3)]
+        now = datetime.now(timezone.utc)
+        
+        def scan(shipment_id, new_status, seconds, hub_id=None):
+            return {
+                "shipment_id": shipment_id,
+                "status": new_status,
+                "location": "Chennai Central Hub",
+                "timestamp": (now + timedelta(seconds=seconds)).isoformat(),
+                "hub_id": str(hub_id) if hub_id else None
+            }
+        
+        response = client.post(
+            "/shipments/status-batch",
+            headers=auth_header(agent_token),
+            json={"updates": [
+                scan(shipments[0], "at_hub", 1, test_hub.id),
+                scan(shipments[1], "at_hub", 1, test_hub.id),
+                scan(shipments[2], "at_hub", 1, uuid4()),
+                scan(shipments[1], "in_transit", 2)
+            ]}
+        ).json()
+        assert [result["error"] for result in response["results"]] == [None, None, "Hub not found", None]
+        assert self._load(client, agent_token, test_hub.id)["current_load"] == 1
+    
+    def test_load_endpoint_reads_counter_only(self, client, customer_token, agent_token, test_hub, count_queries):
+        """Test the load lookup is one primary-key read, not a count over shipments"""
+        self._status(client, agent_token, self._shipment(client, customer_token), "at_hub", test_hub.id)
+        client.get("/hubs", headers=auth_header(agent_token))  # warm the registry
+        
+        with count_queries() as queries:
+            assert self._load(client, agent_token, test_hub.id)["current_load"] == 1
+        assert queries.count == 1
+        assert "shipments" not in queries.statements[0]
+    
+    def test_customer_cannot_read_load(self, client, customer_token, test_hub):
+        """Test hub loads are for agents and admins"""
+        response = client.get(f"/hubs/{test_hub.id}/load", headers=auth_header(customer_token))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_utilization_view(self, client, customer_token, agent_token, admin_token, test_hub):
+        """Test the admin view lists hubs fullest first with totals"""
+        salem = self._second_hub(client, admin_token)
+        client.post("/hubs", headers=auth_header(admin_token), json={"hub_name": "Depot", "city": "Vellore"})
+        for hub_id in (test_hub.id, salem, salem):
+            self._status(client, agent_token, self._shipment(client, customer_token), "at_hub", hub_id)
+        
+        response = client.get("/admin/hubs/utilization", headers=auth_header(admin_token))
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [hub["hub_name"] for hub in data["hubs"]] == ["Salem Hub", "Chennai Central Hub", "Depot"]
+        assert data["hubs"][0]["over_capacity"] is True
+        assert data["hubs"][0]["available"] == -1
+        assert data["hubs"][2]["utilization"] is None
+        assert data["total_load"] == 3
+        assert data["total_capacity"] == 1001
+        
+        response = client.get("/admin/hubs/utilization", headers=auth_header(agent_token))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_rebuild_repairs_counters(self, client, db, customer_token, agent_token, admin_token, test_hub):
+        """Test rebuilding recomputes the loads from the shipments table"""
+        from app.models.stats import HubLoad
+        
+        self._status(client, agent_token, self._shipment(client, customer_token), "at_hub", test_hub.id)
+        db.query(HubLoad).update({"at_hub": 42})
+        db.commit()
+        
+        response = client.post("/admin/hubs/loads/rebuild", headers=auth_header(admin_token))
+        assert response.json() == {"hubs_with_load": 1}
+        assert self._load(client, agent_token, test_hub.id)["current_load"] == 1
@@ -0,0 +1,109 @@
+"""
+Tests for time-ordered identifiers
+"""
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import ids
+from app.utils.ids import time_ordered_tracking_number, uuid7, uuid7_timestamp_ms
+from app.utils.validators import validate_tracking_number
+from tests.conftest import auth_header
+
+
+class TestUUID7:
+    """Test UUIDv7 generation"""
+    
+    def test_version_variant_and_timestamp(self):
+        """Test the RFC 9562 layout"""
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+        
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+        assert before <= uuid7_timestamp_ms(value) <= after + 1
+    
+    def test_monotonic_within_process(self):
+        """Test that ids always increase, including within one millisecond"""
+        values = [uuid7() for _ in range(10000)]
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+    
+    def test_counter_overflow_advances_timestamp(self, monkeypatch):
+        """Test that a full counter moves to the next millisecond"""
+        monkeypatch.setattr(ids, "_uuid7_last_ms", 0)
+        monkeypatch.setattr(ids.time, "time_ns", lambda: 1_700_000_000_000 * 1_000_000)
+        first = uuid7()
+        values = [uuid7() for _ in range(5000)]
+        
+        assert values == sorted(values)
+        assert uuid7_timestamp_ms(values[-1]) > uuid7_timestamp_ms(first)
+    
+    def test_clock_going_backwards(self, monkeypatch):
+        """Test that ids stay ordered when the clock steps back"""
+        monkeypatch.setattr(ids, "_uuid7_last_ms", 0)
+        monkeypatch.setattr(ids.time, "time_ns", lambda: 1_800_000_000_000 * 1_000_000)
+        first = uuid7()
+        monkeypatch.setattr(ids.time, "time_ns", lambda: 1_799_999_999_000 * 1_000_000)
+        assert uuid7() > first
+    
+    def test_unique_across_threads(self):
+        """Test that concurrent generation never repeats"""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            batches = list(pool.map(lambda _: [uuid7() for _ in range(2000)], range(8)))
+        values = [value for batch in batches for value in batch]
+        assert len(set(values)) == len(values)
+
+
+class TestTrackingNumbers:
+    """Test time-ordered tracking numbers"""
+    
+    def test_format_matches_validator(self):
+        """Test compatibility with validate_tracking_number"""
+        for _ in range(1000):
+            assert validate_tracking_number(time_ordered_tracking_number())
+    
+    def test_later_day_sorts_after(self, monkeypatch):
+        """Test that numbers from a later day sort after earlier ones"""
+        monkeypatch.setattr(ids.time, "time", lambda: ids.TRACKING_EPOCH + 86400 * 10 + 86399.0)
+        earlier = time_ordered_tracking_number()
+        monkeypatch.setattr(ids.time, "time", lambda: ids.TRACKING_EPOCH + 86400 * 11.0)
+        assert time_ordered_tracking_number() > earlier
+    
+    def test_not_predictable_from_neighbours(self, monkeypatch):
+        """Test that numbers issued together share only the day prefix"""
+        monkeypatch.setattr(ids.time, "time", lambda: ids.TRACKING_EPOCH + 1000.0)
+        values = [time_ordered_tracking_number() for _ in range(1000)]
+        prefix = ids.TRACKING_PREFIX + "000"
+        
+        assert all(value.startswith(prefix) for value in values)
+        assert len(set(values)) == len(values)
+        # Consecutive numbers are not close to each other
+        suffixes = [int(value[len(prefix):], 36) for value in values]
+        assert sum(abs(b - a) < 36 ** 6 for a, b in zip(suffixes, suffixes[1:])) < 5
+    
+    def test_day_prefix_covers_a_century(self):
+        """Test that the day digits last at least 100 years"""
+        assert 36 ** ids.TRACKING_DAY_DIGITS > 100 * 366
+
+
+class TestShipmentIds:
+    """Test that new shipments use the time-ordered generators"""
+    
+    def test_created_shipment_ids(self, client, customer_token):
+        created = [
+            client.post(
+                "/shipments",
+                headers=auth_header(customer_token),
+                json={"source_address": "Chennai", "destination_address": "Bangalore"}
+            ).json()
+            for _ in range(3)
+        ]
+        shipment_ids = [uuid.UUID(s["id"]) for s in created]
+        tracking_numbers = [s["tracking_number"] for s in created]
+        
+        assert all(value.version == 7 for value in shipment_ids)
+        assert shipment_ids == sorted(shipment_ids)
+        assert len({number[:6] for number in tracking_numbers}) == 1
+        assert all(validate_tracking_number(number) for number in tracking_numbers)
@@ -0,0 +1,97 @@
+"""
+Access logging middleware tests
+"""
+import json
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.logging_config import JsonFormatter
+from app.middleware.logging_middleware import LoggingMiddleware
+
+
+class ListHandler(logging.Handler):
+    """Keeps emitted records in memory"""
+    
+    def __init__(self):
+        super().__init__()
+        self.records = []
+    
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def access_records():
+    handler = ListHandler()
+    access_logger = logging.getLogger("app.access")
+    access_logger.addHandler(handler)
+    yield handler.records
+    access_logger.removeHandler(handler)
+
+
+def make_client(sample_rate: float) -> TestClient:
+    api = FastAPI()
+    
+    @api.get("/ok")
+    def ok():
+        return {"ok": True}
+    
+    @api.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]), media_type="text/plain")
+    
+    api.add_middleware(LoggingMiddleware, sample_rate=sample_rate)
+    return TestClient(api)
+
+
+class TestLoggingMiddleware:
+    """Test the ASGI access log middleware"""
+    
+    def test_process_time_header(self, client):
+        """Test every response carries X-Process-Time"""
+        response = client.get("/health")
+        
+        assert float(response.headers["X-Process-Time"]) >= 0
+    
+    def test_structured_record(self, access_records):
+        """Test one record with request fields is written per request"""
+        make_client(1.0).get("/ok")
+        
+        assert len(access_records) == 1
+        record = access_records[0]
+        assert (record.method, record.path, record.status) == ("GET", "/ok", 200)
+        assert record.duration_ms >= 0
+    
+    def test_sampling_keeps_errors(self, access_records):
+        """Test 2xx are sampled out while other statuses are kept"""
+        client = make_client(0.0)
+        client.get("/ok")
+        client.get("/missing")
+        
+        assert [r.status for r in access_records] == [404]
+    
+    def test_streaming_response(self, access_records):
+        """Test streamed bodies pass through unchanged"""
+        response = make_client(1.0).get("/stream")
+        
+        assert response.text == "abc"
+        assert "X-Process-Time" in response.headers
+        assert access_records[0].status == 200
+
+
+class TestJsonFormatter:
+    """Test JSON log lines"""
+    
+    def test_includes_extra_fields(self):
+        """Test extra fields appear next to the standard ones"""
+        record = logging.LogRecord("app.access", logging.INFO, __file__, 1, "request", (), None)
+        record.status = 201
+        
+        data = json.loads(JsonFormatter().format(record))
+        
+        assert data["message"] == "request"
+        assert data["level"] == "INFO"
+        assert data["status"] == 201
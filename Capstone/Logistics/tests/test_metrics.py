@@ -0,0 +1,78 @@
+"""
+Metrics endpoint tests
+"""
+from fastapi import status
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.database import InstrumentedQueuePool
+from tests.conftest import auth_header
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetricsEndpoint:
+    """Test /metrics"""
+    
+    def test_exposes_prometheus_text(self, client):
+        """Test the endpoint serves the Prometheus text format"""
+        response = client.get("/metrics")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds" in response.text
+        assert "db_pool_size" in response.text
+    
+    def test_latency_labelled_by_route_template(self, client, customer_token):
+        """Test request latency uses the route template, not the raw path"""
+        created = client.post(
+            "/shipments",
+            headers=auth_header(customer_token),
+            json={"source_address": "Chennai", "destination_address": "Bangalore"}
+        ).json()
+        labels = {"method": "GET", "route": "/shipments/{shipment_id}", "status": "200"}
+        before = sample("http_request_duration_seconds_count", **labels)
+        
+        client.get(f"/shipments/{created['id']}", headers=auth_header(customer_token))
+        
+        assert sample("http_request_duration_seconds_count", **labels) == before + 1
+        assert created["id"] not in client.get("/metrics").text
+        assert sample("http_requests_in_progress", method="GET") == 0
+    
+    def test_unmatched_route(self, client):
+        """Test unknown paths share one label value"""
+        before = sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+        
+        client.get("/no/such/path")
+        
+        assert sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == before + 1
+    
+    def test_repository_timings(self, client, customer_token):
+        """Test repository methods are timed"""
+        labels = {"repository": "TrackingRepository", "method": "create"}
+        before = sample("repository_call_duration_seconds_count", **labels)
+        
+        client.post(
+            "/shipments",
+            headers=auth_header(customer_token),
+            json={"source_address": "Chennai", "destination_address": "Bangalore"}
+        )
+        
+        assert sample("repository_call_duration_seconds_count", **labels) == before + 1
+
+
+class TestPoolMetrics:
+    """Test connection pool instrumentation"""
+    
+    def test_checkout_wait_recorded(self):
+        """Test each pool checkout observes its wait time"""
+        engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool)
+        before = sample("db_pool_checkout_wait_seconds_count")
+        
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        
+        assert sample("db_pool_checkout_wait_seconds_count") == before + 1
+        engine.dispose()
@@ -0,0 +1,125 @@
+"""
+Query profiler tests
+"""
+import logging
+import pytest
+from fastapi import status
+
+from app.core.config import settings
+from app.core.profiling import QueryStats, parameter_shape
+from tests.conftest import auth_header
+from tests.query_budget import QueryBudget
+
+
+def create_shipment(client, token) -> dict:
+    return client.post(
+        "/shipments",
+        headers=auth_header(token),
+        json={"source_address": "Chennai", "destination_address": "Bangalore"}
+    ).json()
+
+
+class ListHandler(logging.Handler):
+    """Keeps emitted records in memory"""
+    
+    def __init__(self):
+        super().__init__()
+        self.records = []
+    
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestQueryBudgets:
+    """Per-endpoint query budgets"""
+    
+    @pytest.mark.query_budget({
+        "POST /shipments": 4,
+        "GET /shipments/{shipment_id}": 2,
+        "GET /shipments/track/{tracking_number}": 2
+    })
+    def test_shipment_endpoints(self, client, customer_token):
+        """Test shipment create/read stay within budget"""
+        created = create_shipment(client, customer_token)
+        client.get(f"/shipments/{created['id']}", headers=auth_header(customer_token))
+        client.get(f"/shipments/track/{created['tracking_number']}")
+    
+    def test_fixture_records_requests(self, client, customer_token, query_budget):
+        """Test the fixture exposes per-request counts by route template"""
+        query_budget.limit("GET /shipments", 4)
+        client.get("/shipments", headers=auth_header(customer_token))
+        
+        request = query_budget.requests[-1]
+        assert request.endpoint == "GET /shipments"
+        assert 1 <= request.queries <= 4
+    
+    def test_violation_reported(self):
+        """Test requests over budget are reported"""
+        budget = QueryBudget()
+        budget.limit("GET /hubs", 1)
+        stats = QueryStats()
+        stats.count = 3
+        budget._observe("GET", "/hubs", stats)
+        
+        assert budget.violations() == ["GET /hubs: 3 queries (budget 1)"]
+
+
+class TestProfilerOutput:
+    """Debug headers and slow-query log"""
+    
+    def test_debug_headers(self, client, customer_token, monkeypatch):
+        """Test DEBUG adds query count and time headers"""
+        monkeypatch.setattr(settings, "DEBUG", True)
+        response = client.get("/shipments", headers=auth_header(customer_token))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert int(response.headers["X-DB-Queries"]) >= 1
+        assert float(response.headers["X-DB-Time"]) >= 0
+    
+    def test_no_headers_without_debug(self, client, customer_token, monkeypatch):
+        """Test the headers are omitted outside DEBUG"""
+        monkeypatch.setattr(settings, "DEBUG", False)
+        response = client.get("/shipments", headers=auth_header(customer_token))
+        
+        assert "X-DB-Queries" not in response.headers
+    
+    def test_slow_query_logged_without_values(self, client, customer_token, monkeypatch):
+        """Test slow statements are logged with their parameter shape only"""
+        monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+        handler = ListHandler()
+        profiler_logger = logging.getLogger("app.db.profiler")
+        profiler_logger.addHandler(handler)
+        try:
+            create_shipment(client, customer_token)
+        finally:
+            profiler_logger.removeHandler(handler)
+        
+        inserts = [r for r in handler.records if r.statement.startswith("INSERT INTO shipments")]
+        assert inserts
+        assert "Chennai" not in inserts[0].parameters
+        assert "str" in inserts[0].parameters
+    
+    def test_failed_statement_leaves_no_timer(self):
+        """Test a statement that raises does not leave its start time on the connection"""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+        from app.core.profiling import _START_KEY
+        from tests.conftest import engine
+        
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM no_such_table"))
+            assert not connection.info.get(_START_KEY)
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+            assert not connection.info.get(_START_KEY)
+
+
+class TestParameterShape:
+    """Test bound-parameter descriptions"""
+    
+    def test_shapes(self):
+        """Test dict, positional and executemany parameters"""
+        assert parameter_shape({"id": "x", "limit": 10}) == "{id: str, limit: int}"
+        assert parameter_shape(("x", 1)) == "(str, int)"
+        assert parameter_shape([("x", 1), ("y", 2)]) == "2 x (str, int)"
+        assert parameter_shape(()) == "()"
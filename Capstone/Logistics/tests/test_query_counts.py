@@ -0,0 +1,119 @@
+"""
+Query-count guards - reads must not issue per-row (N+1) queries
+"""
+from fastapi import status
+
+from tests.conftest import auth_header
+
+
+def create_shipment(client, token) -> dict:
+    """Create a shipment and return its JSON"""
+    response = client.post(
+        "/shipments",
+        headers=auth_header(token),
+        json={
+            "source_address": "Chennai",
+            "destination_address": "Bangalore"
+        }
+    )
+    return response.json()
+
+
+def add_updates(client, token, shipment_id, count):
+    """Add tracking updates to a shipment"""
+    for i in range(count):
+        client.post(
+            f"/tracking/{shipment_id}",
+            headers=auth_header(token),
+            json={"location": f"Hub {i}", "status": "in_transit"}
+        )
+
+
+class TestShipmentReadQueryCounts:
+    """Shipment reads issue a fixed number of statements"""
+    
+    def test_detail_independent_of_history_length(self, client, count_queries, customer_token, agent_token):
+        """Test GET /shipments/{id} with short and long history"""
+        short = create_shipment(client, customer_token)
+        long = create_shipment(client, customer_token)
+        add_updates(client, agent_token, long["id"], 8)
+        
+        with count_queries() as short_queries:
+            response = client.get(f"/shipments/{short['id']}", headers=auth_header(customer_token))
+        assert len(response.json()["tracking_updates"]) == 1
+        
+        with count_queries() as long_queries:
+            response = client.get(f"/shipments/{long['id']}", headers=auth_header(customer_token))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["tracking_updates"]) == 9
+        
+        assert long_queries.count == short_queries.count
+        # current user + shipment + tracking updates
+        assert long_queries.count <= 3
+    
+    def test_track_independent_of_history_length(self, client, count_queries, customer_token, agent_token):
+        """Test GET /shipments/track/{n} with short and long history"""
+        short = create_shipment(client, customer_token)
+        long = create_shipment(client, customer_token)
+        add_updates(client, agent_token, long["id"], 8)
+        
+        with count_queries() as short_queries:
+            client.get(f"/shipments/track/{short['tracking_number']}")
+        with count_queries() as long_queries:
+            response = client.get(f"/shipments/track/{long['tracking_number']}")
+        
+        assert len(response.json()["tracking_updates"]) == 9
+        assert long_queries.count == short_queries.count <= 2
+    
+    def test_list_independent_of_page_size(self, client, count_queries, customer_token):
+        """Test GET /shipments with small and large pages"""
+        for _ in range(6):
+            create_shipment(client, customer_token)
+        
+        with count_queries() as small_page:
+            client.get("/shipments?page_size=1", headers=auth_header(customer_token))
+        with count_queries() as large_page:
+            response = client.get("/shipments?page_size=6", headers=auth_header(customer_token))
+        
+        assert len(response.json()["shipments"]) == 6
+        assert large_page.count == small_page.count
+
+
+class TestTrackingReadQueryCounts:
+    """Tracking history reads issue a fixed number of statements"""
+    
+    def test_history_independent_of_length(self, client, count_queries, customer_token, agent_token):
+        """Test GET /tracking/{id} with short and long history"""
+        short = create_shipment(client, customer_token)
+        long = create_shipment(client, customer_token)
+        add_updates(client, agent_token, long["id"], 8)
+        
+        with count_queries() as short_queries:
+            client.get(f"/tracking/{short['id']}")
+        with count_queries() as long_queries:
+            response = client.get(f"/tracking/{long['id']}")
+        
+        assert response.json()["total_updates"] == 9
+        assert long_queries.count == short_queries.count <= 2
+
+
+class TestWriteQueryCounts:
+    """Writes flush once and commit once, without refresh round trips"""
+    
+    def test_status_update_statements(self, client, count_queries, customer_token, agent_token):
+        """Test PUT /shipments/{id}/status: no SELECT after the writes"""
+        shipment = create_shipment(client, customer_token)
+        
+        with count_queries() as queries:
+            response = client.put(
+                f"/shipments/{shipment['id']}/status",
+                headers=auth_header(agent_token),
+                json={"status": "in_transit", "location": "Salem Hub"}
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "in_transit"
+        
+        verbs = [statement.split()[0].upper() for statement in queries.statements]
+        # current user + shipment, then the shipment UPDATE, the tracking
+        # INSERT and the daily stats upsert (INSERT ... ON CONFLICT)
+        assert verbs == ["SELECT", "SELECT", "UPDATE", "INSERT", "INSERT"]
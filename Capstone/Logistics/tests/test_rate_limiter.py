@@ -0,0 +1,182 @@
+"""
+Rate limiter tests
+"""
+import pytest
+from fastapi import FastAPI, status
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import rate_limit
+from app.core.rate_limit import (
+    InMemoryRateLimitBackend,
+    RedisRateLimitBackend,
+    parse_limit
+)
+from app.core.security import create_access_token
+from app.middleware.rate_limiter import RateLimiterMiddleware, RateLimitPolicy
+from tests.conftest import auth_header
+
+
+class FakeClock:
+    """Monotonic clock under test control"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", fake)
+    return fake
+
+
+class TestParseLimit:
+    """Test limit strings"""
+    
+    def test_parse(self):
+        """Test count and period are parsed"""
+        limit = parse_limit("5/minute")
+        
+        assert limit.count == 5
+        assert limit.period == 60
+        assert limit.interval == 12
+    
+    @pytest.mark.parametrize("value", ["", "5", "0/minute", "5/week", "x/second"])
+    def test_invalid(self, value):
+        """Test malformed limits are rejected"""
+        with pytest.raises(ValueError):
+            parse_limit(value)
+
+
+class TestInMemoryBackend:
+    """Test GCRA on the in-process backend"""
+    
+    def test_burst_then_reject(self, clock):
+        """Test a full burst is allowed and the next request is not"""
+        backend = InMemoryRateLimitBackend()
+        limit = parse_limit("3/minute")
+        
+        results = [backend.hit("k", limit) for _ in range(4)]
+        
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert results[3].retry_after == pytest.approx(20)
+    
+    def test_recovers_at_sustained_rate(self, clock):
+        """Test one request is allowed again per emission interval"""
+        backend = InMemoryRateLimitBackend()
+        limit = parse_limit("3/minute")
+        for _ in range(3):
+            backend.hit("k", limit)
+        
+        clock.now += 20
+        assert backend.hit("k", limit).allowed is True
+        assert backend.hit("k", limit).allowed is False
+    
+    def test_keys_are_independent(self, clock):
+        """Test buckets do not share state"""
+        backend = InMemoryRateLimitBackend()
+        limit = parse_limit("1/minute")
+        
+        assert backend.hit("a", limit).allowed is True
+        assert backend.hit("b", limit).allowed is True
+        assert backend.hit("a", limit).allowed is False
+    
+    def test_memory_is_bounded(self, clock):
+        """Test least recently used keys are evicted"""
+        backend = InMemoryRateLimitBackend(max_keys=2)
+        limit = parse_limit("1/minute")
+        for key in ("a", "b", "c"):
+            backend.hit(key, limit)
+        
+        assert len(backend) == 2
+        # "a" was evicted, so it starts a fresh bucket
+        assert backend.hit("a", limit).allowed is True
+
+
+class TestRedisBackend:
+    """Test the Redis backend without a server"""
+    
+    def test_fails_open(self):
+        """Test an unreachable Redis allows the request"""
+        backend = RedisRateLimitBackend("redis://127.0.0.1:1")
+        
+        assert backend.hit("k", parse_limit("1/minute")).allowed is True
+
+
+@pytest.fixture
+def limited_client(clock) -> TestClient:
+    """Small app behind the limiter with strict login and loose tracking limits"""
+    api = FastAPI()
+    
+    @api.post("/auth/login")
+    def login():
+        return {"ok": True}
+    
+    @api.get("/shipments/track/{number}")
+    def track(number: str):
+        return {"ok": True}
+    
+    @api.get("/shipments")
+    def shipments():
+        return {"ok": True}
+    
+    @api.get("/admin/shipments/export")
+    def export():
+        return StreamingResponse(iter([b"id\n", b"1\n", b"2\n"]), media_type="text/csv")
+    
+    policy = RateLimitPolicy(
+        default="2/minute",
+        roles={"admin": "5/minute"},
+        routes={"/auth/login": "1/minute", "/shipments/track": "4/minute"}
+    )
+    api.add_middleware(RateLimiterMiddleware, policy=policy, backend=InMemoryRateLimitBackend())
+    return TestClient(api)
+
+
+def hit(client, method, path, count, headers=None):
+    return [client.request(method, path, headers=headers).status_code for _ in range(count)]
+
+
+class TestRateLimiterMiddleware:
+    """Test per-route and per-role limits"""
+    
+    def test_route_limits(self, limited_client):
+        """Test login is stricter than tracking"""
+        assert hit(limited_client, "POST", "/auth/login", 2) == [200, 429]
+        assert hit(limited_client, "GET", "/shipments/track/TRK1", 5) == [200] * 4 + [429]
+    
+    def test_rejection_headers(self, limited_client):
+        """Test 429 responses carry Retry-After"""
+        limited_client.post("/auth/login")
+        response = limited_client.post("/auth/login")
+        
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["Retry-After"] == "60"
+        assert response.json()["status_code"] == 429
+    
+    def test_role_limits(self, limited_client):
+        """Test authenticated callers get their role's limit"""
+        token = create_access_token({"sub": "user-1", "role": "admin"})
+        
+        assert hit(limited_client, "GET", "/shipments", 3) == [200, 200, 429]
+        assert hit(limited_client, "GET", "/shipments", 6, auth_header(token)) == [200] * 5 + [429]
+    
+    def test_remaining_header(self, limited_client):
+        """Test allowed responses report the remaining budget"""
+        response = limited_client.get("/shipments/track/TRK1")
+        
+        assert response.headers["X-RateLimit-Limit"] == "4"
+        assert response.headers["X-RateLimit-Remaining"] == "3"
+    
+    def test_streaming_passes_through(self, limited_client):
+        """Test streamed responses keep their chunks and get the limit headers"""
+        with limited_client.stream("GET", "/admin/shipments/export") as response:
+            chunks = list(response.iter_bytes())
+        
+        assert b"".join(chunks) == b"id\n1\n2\n"
+        assert response.headers["X-RateLimit-Remaining"] == "1"
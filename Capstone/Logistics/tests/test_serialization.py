@@ -0,0 +1,123 @@
+"""
+Fast serializer tests
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+
+from app.models.hub import Hub
+from app.models.shipment import Shipment, ShipmentStatus
+from app.models.tracking import TrackingUpdate
+from app.schemas.hub_schema import HubListResponse, HubResponse
+from app.schemas.shipment_schema import ShipmentDetailResponse, ShipmentListResponse, ShipmentResponse
+from app.schemas.tracking_schema import TrackingHistoryResponse, TrackingUpdateResponse
+from app.utils.ids import uuid7
+from app.utils.serialization import OrmSerializer, dumps
+from tests.conftest import auth_header
+
+
+def _pydantic_json(schema, obj):
+    """What FastAPI's response_model path would send"""
+    return json.loads(schema.model_validate(obj).model_dump_json())
+
+
+class TestOrmSerializer:
+    """Test serializer output matches the pydantic schemas"""
+    
+    def test_shipment_matches_schema(self):
+        """Test UUIDs, enums, floats, None and datetimes encode like pydantic"""
+        now = datetime(2026, 10, 18, 7, 30, 1, 250000)
+        shipment = Shipment(
+            id=uuid7(),
+            tracking_number="TRK0000000001",
+            customer_id=uuid7(),
+            agent_id=None,
+            current_hub_id=uuid7(),
+            source_address="Chennai",
+            destination_address="Bangalore",
+            weight=2.0,
+            dimensions=None,
+            description="Fragile – glass",
+            status=ShipmentStatus.IN_TRANSIT,
+            current_location="Salem Hub",
+            created_at=now,
+            updated_at=now.replace(microsecond=0)
+        )
+        assert orjson.loads(OrmSerializer(ShipmentResponse).dumps(shipment)) == (
+            _pydantic_json(ShipmentResponse, shipment)
+        )
+    
+    def test_tracking_update_and_hub_match_schema(self):
+        """Test the other hot schemas, including timezone-aware datetimes"""
+        update = TrackingUpdate(
+            id=uuid7(),
+            shipment_id=uuid7(),
+            location="Salem Hub",
+            status="at_hub",
+            description=None,
+            created_at=datetime(2026, 10, 18, 7, 30, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+        )
+        assert orjson.loads(OrmSerializer(TrackingUpdateResponse).dumps(update)) == (
+            _pydantic_json(TrackingUpdateResponse, update)
+        )
+        
+        hub = Hub(
+            id=uuid7(),
+            hub_name="Chennai Central Hub",
+            city="Chennai",
+            contact_email="chennai.hub@logistics.com",
+            capacity=1000,
+            is_active=True,
+            created_at=datetime(2026, 10, 18, tzinfo=timezone.utc),
+            updated_at=datetime(2026, 10, 18, 1, 2, 3)
+        )
+        assert orjson.loads(OrmSerializer(HubResponse).dumps_many([hub])) == [_pydantic_json(HubResponse, hub)]
+    
+    def test_utc_datetimes_end_in_z(self):
+        """Test aware UTC datetimes use pydantic's "Z" suffix"""
+        assert dumps(datetime(2026, 1, 1, tzinfo=timezone.utc)) == b'"2026-01-01T00:00:00Z"'
+    
+    def test_nested_schema_rejected(self):
+        """Test composite schemas must be assembled from flat serializers"""
+        with pytest.raises(TypeError):
+            OrmSerializer(ShipmentDetailResponse)
+
+
+class TestFastResponses:
+    """Test routes on the fast path still honour their response models"""
+    
+    def test_list_and_detail_validate(self, client, customer_token, agent_token):
+        """Test shipment list, detail and history bodies validate against their schemas"""
+        headers = auth_header(customer_token)
+        shipment = client.post(
+            "/shipments",
+            headers=headers,
+            json={"source_address": "Chennai", "destination_address": "Bangalore", "weight": 1.5}
+        ).json()
+        client.post(
+            f"/tracking/{shipment['id']}",
+            headers=auth_header(agent_token),
+            json={"location": "Salem Hub", "status": "at_hub"}
+        )
+        
+        for url, schema in (
+            ("/shipments", ShipmentListResponse),
+            ("/shipments?pagination=cursor", ShipmentListResponse),
+            (f"/shipments/{shipment['id']}", ShipmentDetailResponse),
+            (f"/tracking/{shipment['id']}", TrackingHistoryResponse)
+        ):
+            body = client.get(url, headers=headers).json()
+            assert json.loads(schema.model_validate(body).model_dump_json()) == body
+    
+    def test_hub_list_validates(self, client, admin_token):
+        """Test the hub list body validates against HubListResponse"""
+        client.post(
+            "/hubs",
+            headers=auth_header(admin_token),
+            json={"hub_name": "Chennai Central Hub", "city": "Chennai", "capacity": 1000}
+        )
+        body = client.get("/hubs").json()
+        assert body["total"] == 1
+        assert json.loads(HubListResponse.model_validate(body).model_dump_json()) == body
@@ -1,7 +1,6 @@
 """
 Shipment tests
 """
-import pytest
 from uuid import uuid4
 from fastapi import status
 
@@ -47,6 +46,20 @@ class TestCreateShipment:
         assert data["weight"] is None
         assert data["dimensions"] is None
     
+    def test_create_retries_tracking_number_collision(self, client, customer_token, monkeypatch):
+        """Test a taken tracking number is replaced instead of failing the request"""
+        from app.services import shipment_service
+        numbers = iter(["TRKTAKEN000000", "TRKTAKEN000000", "TRKFREE0000000"])
+        monkeypatch.setattr(shipment_service, "generate_tracking_number", lambda: next(numbers))
+        body = {"source_address": "Chennai", "destination_address": "Bangalore"}
+        
+        first = client.post("/shipments", headers=auth_header(customer_token), json=body)
+        second = client.post("/shipments", headers=auth_header(customer_token), json=body)
+        
+        assert first.json()["tracking_number"] == "TRKTAKEN000000"
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.json()["tracking_number"] == "TRKFREE0000000"
+    
     def test_create_shipment_unauthenticated(self, client):
         """Test shipment creation without authentication"""
         response = client.post(
@@ -70,6 +83,126 @@ class TestCreateShipment:
         assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
+class TestBulkCreateShipments:
+    """Test bulk shipment ingestion"""
+    
+    def test_bulk_json_array(self, client, customer_token):
+        """Test a JSON array with one invalid row"""
+        response = client.post(
+            "/shipments/bulk",
+            headers=auth_header(customer_token),
+            json=[
+                {"source_address": "Chennai", "destination_address": "Bangalore"},
+                {"source_address": "Madurai"},
+                {"source_address": "Salem", "destination_address": "Mysore", "weight": 1.5},
+            ]
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 3
+        assert data["created"] == 2
+        assert data["failed"] == 1
+        assert [r["success"] for r in data["results"]] == [True, False, True]
+        assert "destination_address" in data["results"][1]["error"]
+        assert data["results"][0]["tracking_number"].startswith("TRK")
+        
+        # Created shipments are visible with their initial tracking update
+        shipment_id = data["results"][2]["id"]
+        detail = client.get(f"/shipments/{shipment_id}", headers=auth_header(customer_token)).json()
+        assert detail["weight"] == 1.5
+        assert detail["status"] == "created"
+        assert len(detail["tracking_updates"]) == 1
+    
+    def test_bulk_ndjson_in_chunks(self, client, customer_token, monkeypatch):
+        """Test NDJSON input split across several chunks, with a malformed line"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "BULK_INSERT_CHUNK_SIZE", 2)
+        lines = [
+            '{"source_address": "A1", "destination_address": "B1"}',
+            '{"source_address": "A2", "destination_address": "B2"}',
+            '{not json',
+            '',
+            '{"source_address": "A3", "destination_address": "B3"}',
+            '{"source_address": "A4", "destination_address": "B4"}',
+            '{"source_address": "A5", "destination_address": "B5"}',
+        ]
+        response = client.post(
+            "/shipments/bulk",
+            headers={**auth_header(customer_token), "Content-Type": "application/x-ndjson"},
+            content="\n".join(lines)
+        )
+        data = response.json()
+        assert data["total"] == 6
+        assert data["created"] == 5
+        assert data["results"][2]["success"] is False
+        
+        listing = client.get("/shipments?page_size=100", headers=auth_header(customer_token)).json()
+        assert listing["total"] == 5
+    
+    def test_bulk_isolates_failing_rows(self, client, customer_token, monkeypatch):
+        """Test a DB error in a chunk only fails the offending rows"""
+        from app.services import shipment_service
+        monkeypatch.setattr(shipment_service, "generate_tracking_number", lambda: "TRKDUPLICATE1")
+        response = client.post(
+            "/shipments/bulk",
+            headers=auth_header(customer_token),
+            json=[
+                {"source_address": "A", "destination_address": "B"},
+                {"source_address": "C", "destination_address": "D"},
+            ]
+        )
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 1
+        assert data["results"][1]["error"] == "Could not store shipment"
+    
+    def test_bulk_retries_tracking_number_collision(self, client, customer_token, monkeypatch):
+        """Test a row whose tracking number is taken is retried with a new one"""
+        from app.services import shipment_service
+        # Both rows collide in the chunk; per row, the second collides once more
+        numbers = iter(["TRKAAAAAAAAAAAA", "TRKAAAAAAAAAAAA", "TRKAAAAAAAAAAAA", "TRKAAAAAAAAAAAA", "TRKBBBBBBBBBBBB"])
+        monkeypatch.setattr(shipment_service, "generate_tracking_number", lambda: next(numbers))
+        response = client.post(
+            "/shipments/bulk",
+            headers=auth_header(customer_token),
+            json=[
+                {"source_address": "A", "destination_address": "B"},
+                {"source_address": "C", "destination_address": "D"},
+            ]
+        )
+        data = response.json()
+        assert data["created"] == 2
+        assert [result["tracking_number"] for result in data["results"]] == ["TRKAAAAAAAAAAAA", "TRKBBBBBBBBBBBB"]
+    
+    def test_bulk_rejects_non_array(self, client, customer_token):
+        """Test a JSON object body is rejected"""
+        response = client.post(
+            "/shipments/bulk",
+            headers=auth_header(customer_token),
+            json={"source_address": "Chennai", "destination_address": "Bangalore"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_bulk_too_many_rows(self, client, customer_token, monkeypatch):
+        """Test the row limit"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "BULK_MAX_ROWS", 1)
+        response = client.post(
+            "/shipments/bulk",
+            headers=auth_header(customer_token),
+            json=[
+                {"source_address": "A", "destination_address": "B"},
+                {"source_address": "C", "destination_address": "D"},
+            ]
+        )
+        assert response.status_code == 413
+    
+    def test_bulk_unauthenticated(self, client):
+        """Test bulk upload requires authentication"""
+        response = client.post("/shipments/bulk", json=[])
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 class TestGetShipments:
     """Test getting shipments"""
     
@@ -119,6 +252,190 @@ class TestGetShipments:
         assert data["page_size"] == 2
 
 
+class TestCursorPagination:
+    """Test keyset (cursor) pagination of shipments"""
+    
+    def _create_shipments(self, client, token, count):
+        for i in range(count):
+            client.post(
+                "/shipments",
+                headers=auth_header(token),
+                json={
+                    "source_address": f"City {i}",
+                    "destination_address": f"City {i+1}"
+                }
+            )
+    
+    def test_cursor_pages_cover_all_shipments(self, client, customer_token):
+        """Test walking every page with next_cursor"""
+        self._create_shipments(client, customer_token, 5)
+        
+        seen = []
+        response = client.get(
+            "/shipments?pagination=cursor&page_size=2",
+            headers=auth_header(customer_token)
+        )
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            assert data["page"] is None
+            assert data["total"] is None
+            seen.extend(s["id"] for s in data["shipments"])
+            if not data["next_cursor"]:
+                break
+            response = client.get(
+                f"/shipments?cursor={data['next_cursor']}&page_size=2",
+                headers=auth_header(customer_token)
+            )
+        
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+    
+    def test_cursor_order_matches_offset_order(self, client, customer_token):
+        """Test cursor mode returns newest first, like offset mode"""
+        self._create_shipments(client, customer_token, 3)
+        
+        offset_ids = [s["id"] for s in client.get(
+            "/shipments?page_size=10",
+            headers=auth_header(customer_token)
+        ).json()["shipments"]]
+        cursor_ids = [s["id"] for s in client.get(
+            "/shipments?pagination=cursor&page_size=10",
+            headers=auth_header(customer_token)
+        ).json()["shipments"]]
+        assert cursor_ids == offset_ids
+    
+    def test_cursor_include_total(self, client, customer_token):
+        """Test requesting the approximate total in cursor mode"""
+        self._create_shipments(client, customer_token, 3)
+        
+        response = client.get(
+            "/shipments?pagination=cursor&page_size=2&include_total=true",
+            headers=auth_header(customer_token)
+        )
+        data = response.json()
+        assert data["total"] == 3
+        assert data["next_cursor"] is not None
+    
+    def test_invalid_cursor(self, client, customer_token):
+        """Test that a malformed cursor is rejected"""
+        response = client.get(
+            "/shipments?cursor=not-a-cursor",
+            headers=auth_header(customer_token)
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestSearchShipments:
+    """Test ranked shipment search over addresses and descriptions"""
+    
+    def _create(self, client, token, source, destination, description=None):
+        payload = {"source_address": source, "destination_address": destination}
+        if description:
+            payload["description"] = description
+        return client.post("/shipments", headers=auth_header(token), json=payload).json()
+    
+    def test_search_ranks_best_match_first(self, client, customer_token, agent_token):
+        """Test that shipments matching more often rank higher"""
+        self._create(client, customer_token, "Chennai", "Bangalore")
+        best = self._create(client, customer_token, "Madurai", "Mumbai", "Mumbai office, Mumbai port")
+        self._create(client, customer_token, "Delhi", "Kolkata")
+        
+        response = client.get("/shipments/search?q=mumbai", headers=auth_header(agent_token))
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert [r["id"] for r in results] == [best["id"]]
+        assert results[0]["score"] > 0
+    
+    def test_search_partial_match(self, client, customer_token, agent_token):
+        """Test that substrings of addresses match"""
+        shipment = self._create(client, customer_token, "12 Anna Salai, Chennai", "Bangalore")
+        
+        response = client.get("/shipments/search?q=salai", headers=auth_header(agent_token))
+        assert [r["id"] for r in response.json()["results"]] == [shipment["id"]]
+    
+    def test_search_cursor_pagination(self, client, customer_token, agent_token):
+        """Test walking ranked results with next_cursor"""
+        created = {
+            self._create(client, customer_token, f"Warehouse {i}, Pune", "Goa")["id"]
+            for i in range(5)
+        }
+        
+        seen, scores = [], []
+        url = "/shipments/search?q=pune&page_size=2"
+        while url:
+            data = client.get(url, headers=auth_header(agent_token)).json()
+            seen.extend(r["id"] for r in data["results"])
+            scores.extend(r["score"] for r in data["results"])
+            url = (
+                f"/shipments/search?q=pune&page_size=2&cursor={data['next_cursor']}"
+                if data["next_cursor"] else None
+            )
+        
+        assert len(seen) == 5
+        assert set(seen) == created
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_search_index_follows_updates_and_deletes(self, client, customer_token, agent_token, db):
+        """Test that the search index stays in sync with the shipments table"""
+        from app.models.shipment import Shipment
+        
+        shipment = self._create(client, customer_token, "Chennai", "Bangalore")
+        response = client.put(
+            f"/shipments/{shipment['id']}",
+            headers=auth_header(customer_token),
+            json={"destination_address": "Hyderabad"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        
+        def search(q):
+            return client.get(f"/shipments/search?q={q}", headers=auth_header(agent_token)).json()["results"]
+        
+        assert search("bangalore") == []
+        assert [r["id"] for r in search("hyderabad")] == [shipment["id"]]
+        
+        db.query(Shipment).delete()
+        db.commit()
+        assert search("hyderabad") == []
+    
+    def test_search_bulk_created_shipments(self, client, customer_token, agent_token):
+        """Test that shipments created in bulk are searchable"""
+        client.post(
+            "/shipments/bulk",
+            headers=auth_header(customer_token),
+            json=[{"source_address": "Kochi", "destination_address": f"Depot {i}, Trichy"} for i in range(3)]
+        )
+        
+        response = client.get("/shipments/search?q=trichy", headers=auth_header(agent_token))
+        assert len(response.json()["results"]) == 3
+    
+    def test_search_quotes_are_literal(self, client, customer_token, agent_token):
+        """Test that query syntax characters are matched literally"""
+        self._create(client, customer_token, "Chennai", "Bangalore")
+        
+        response = client.get('/shipments/search?q=nai" OR "ban', headers=auth_header(agent_token))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["results"] == []
+    
+    def test_postgresql_score_is_double_precision(self):
+        """Test the Postgres rank is widened to float8 so score cursors compare exactly"""
+        from sqlalchemy.dialects import postgresql
+        from app.repositories.shipment_repository import ShipmentRepository
+        
+        sql = str(ShipmentRepository._search_postgresql("Salem").compile(dialect=postgresql.dialect()))
+        assert "AS DOUBLE PRECISION) AS score" in sql
+    
+    def test_search_query_too_short(self, client, agent_token):
+        """Test that queries under three characters are rejected"""
+        response = client.get("/shipments/search?q=ab", headers=auth_header(agent_token))
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_customer_cannot_search(self, client, customer_token):
+        """Test that customers cannot search all shipments"""
+        response = client.get("/shipments/search?q=chennai", headers=auth_header(customer_token))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 class TestTrackShipment:
     """Test shipment tracking"""
     
@@ -202,6 +519,145 @@ class TestUpdateShipmentStatus:
             }
         )
         assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_disallowed_transition_rejected(self, client, customer_token, agent_token):
+        """Test a status the shipment cannot move to is rejected and nothing changes"""
+        create_response = client.post(
+            "/shipments",
+            headers=auth_header(customer_token),
+            json={
+                "source_address": "Chennai",
+                "destination_address": "Bangalore"
+            }
+        )
+        shipment_id = create_response.json()["id"]
+        
+        response = client.put(
+            f"/shipments/{shipment_id}/status",
+            headers=auth_header(agent_token),
+            json={"status": "delivered", "location": "Customer Address"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["message"] == "Cannot change status from created to delivered"
+        
+        shipment = client.get(f"/shipments/{shipment_id}", headers=auth_header(agent_token)).json()
+        assert shipment["status"] == "created"
+        history = client.get(f"/tracking/{shipment_id}").json()
+        assert [update["status"] for update in history["updates"]] == ["created"]
+
+
+class TestStatusBatch:
+    """Test batched status updates (agent device sync)"""
+    
+    def _create(self, client, token, source="Chennai"):
+        return client.post(
+            "/shipments",
+            headers=auth_header(token),
+            json={"source_address": source, "destination_address": "Bangalore"}
+        ).json()["id"]
+    
+    def _scan(self, shipment_id, scan_status, location, seconds):
+        """A scan `seconds` from now (shipments in these tests were just created)"""
+        from datetime import datetime, timedelta, timezone
+        scanned_at = datetime.now(timezone.utc) + timedelta(seconds=seconds)
+        return {
+            "shipment_id": shipment_id,
+            "status": scan_status,
+            "location": location,
+            "timestamp": scanned_at.isoformat()
+        }
+    
+    def _sync(self, client, token, updates):
+        return client.post(
+            "/shipments/status-batch",
+            headers=auth_header(token),
+            json={"updates": updates}
+        )
+    
+    def test_batch_applies_scans_in_order(self, client, db, customer_token, agent_token):
+        """Test scans for several shipments are applied in order with their scan times"""
+        from datetime import date
+        from app.repositories.stats_repository import StatsRepository
+        
+        first = self._create(client, customer_token)
+        second = self._create(client, customer_token)
+        response = self._sync(client, agent_token, [
+            self._scan(first, "picked_up", "Chennai", 1),
+            self._scan(second, "picked_up", "Chennai", 2),
+            self._scan(first, "in_transit", "Vellore", 3),
+            self._scan(first, "at_hub", "Salem Hub", 4)
+        ])
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 4
+        assert data["applied"] == 4
+        assert [result["status"] for result in data["results"]] == [
+            "picked_up", "picked_up", "in_transit", "at_hub"
+        ]
+        
+        shipment = client.get(f"/shipments/{first}", headers=auth_header(customer_token)).json()
+        assert shipment["status"] == "at_hub"
+        assert shipment["current_location"] == "Salem Hub"
+        history = client.get(f"/tracking/{first}").json()["updates"]
+        assert [update["status"] for update in history] == ["at_hub", "in_transit", "picked_up", "created"]
+        
+        stats = StatsRepository(db).get(date.today())
+        assert (stats.created, stats.picked_up, stats.at_hub) == (0, 1, 1)
+    
+    def test_batch_reports_failures_per_scan(self, client, customer_token, agent_token):
+        """Test rejected scans do not stop the rest of the batch"""
+        shipment_id = self._create(client, customer_token)
+        response = self._sync(client, agent_token, [
+            self._scan(str(uuid4()), "picked_up", "Chennai", 1),
+            self._scan(shipment_id, "delivered", "Bangalore", 2),
+            self._scan(shipment_id, "picked_up", "Chennai", 4),
+            self._scan(shipment_id, "in_transit", "Vellore", 3),
+            self._scan(shipment_id, "in_transit", "Salem", 3600)
+        ])
+        
+        data = response.json()
+        assert (data["applied"], data["failed"]) == (1, 4)
+        errors = [result["error"] for result in data["results"]]
+        assert errors[0] == "Shipment not found"
+        assert errors[1] == "Cannot change status from created to delivered"
+        assert errors[2] is None
+        assert "older than" in errors[3]
+        assert "future" in errors[4]
+    
+    def test_batch_resync_is_idempotent_for_latest_scan(self, client, customer_token, agent_token):
+        """Test resending the latest scan succeeds without duplicating history"""
+        shipment_id = self._create(client, customer_token)
+        scan = self._scan(shipment_id, "picked_up", "Chennai", 1)
+        self._sync(client, agent_token, [scan])
+        
+        response = self._sync(client, agent_token, [scan])
+        assert response.json()["results"][0]["success"] is True
+        history = client.get(f"/tracking/{shipment_id}").json()
+        assert history["total_updates"] == 2
+    
+    def test_batch_statements(self, client, count_queries, customer_token, agent_token):
+        """Test one shipment SELECT, one tracking INSERT and one commit for the whole batch"""
+        ids = [self._create(client, customer_token) for _ in range(3)]
+        updates = [self._scan(shipment_id, "picked_up", "Chennai", 1) for shipment_id in ids]
+        updates += [self._scan(shipment_id, "in_transit", "Vellore", 2) for shipment_id in ids]
+        
+        with count_queries() as queries:
+            response = self._sync(client, agent_token, updates)
+        assert response.json()["applied"] == 6
+        
+        verbs = [statement.split()[0].upper() for statement in queries.statements]
+        # current user + shipments (IN), then the batched shipment UPDATE,
+        # the batched tracking INSERT and the daily stats upsert
+        assert verbs == ["SELECT", "SELECT", "UPDATE", "INSERT", "INSERT"]
+        assert queries.statements[3].startswith("INSERT INTO tracking_updates")
+    
+    def test_batch_limits_and_roles(self, client, customer_token, agent_token):
+        """Test empty or oversized batches and customers are rejected"""
+        scan = self._scan(str(uuid4()), "picked_up", "Chennai", 1)
+        assert self._sync(client, agent_token, []).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert self._sync(client, agent_token, [scan] * 501).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert self._sync(client, customer_token, [scan]).status_code == status.HTTP_403_FORBIDDEN
 
 
 class TestCancelShipment:
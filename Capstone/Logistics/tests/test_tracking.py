@@ -1,6 +1,7 @@
 """
 Tracking tests
 """
+import re
 import pytest
 from fastapi import status
 
@@ -194,3 +195,328 @@ class TestTrackingFlow:
         history_data = history_response.json()
         # Initial created + 6 updates
         assert len(history_data["updates"]) >= 6
+
+
+@pytest.fixture
+def tracking_archive(tmp_path, monkeypatch):
+    """Archive tracking history under a temporary directory"""
+    from app.core.archive import get_tracking_archive
+    from app.core.config import settings
+    
+    monkeypatch.setattr(settings, "TRACKING_ARCHIVE_DIR", str(tmp_path))
+    get_tracking_archive.cache_clear()
+    yield get_tracking_archive()
+    get_tracking_archive.cache_clear()
+
+
+class TestTrackingArchive:
+    """Test archiving delivered shipments' tracking history"""
+    
+    def _shipment_with_history(self, client, db, customer_token, agent_token, ages_in_days, delivered=True):
+        """
+        Create a shipment with one tracking update per age (days old); its
+        initial "created" update is a day older than the oldest of them.
+        """
+        from datetime import datetime, timedelta
+        from uuid import UUID
+        from sqlalchemy import update
+        from app.models.shipment import Shipment, ShipmentStatus
+        from app.models.tracking import TrackingUpdate
+        
+        shipment = client.post(
+            "/shipments",
+            headers=auth_header(customer_token),
+            json={"source_address": "Chennai", "destination_address": "Bangalore"}
+        ).json()
+        db.execute(
+            update(TrackingUpdate)
+            .where(TrackingUpdate.shipment_id == UUID(shipment["id"]))
+            .values(created_at=datetime.utcnow() - timedelta(days=max(ages_in_days) + 1))
+        )
+        db.commit()
+        for age in ages_in_days:
+            update_id = client.post(
+                f"/tracking/{shipment['id']}",
+                headers=auth_header(agent_token),
+                json={"location": f"Hub {age}", "status": "in_transit"}
+            ).json()["id"]
+            db.execute(
+                update(TrackingUpdate)
+                .where(TrackingUpdate.id == UUID(update_id))
+                .values(created_at=datetime.utcnow() - timedelta(days=age))
+            )
+        if delivered:
+            db.execute(
+                update(Shipment)
+                .where(Shipment.id == UUID(shipment["id"]))
+                .values(status=ShipmentStatus.DELIVERED)
+            )
+        db.commit()
+        return shipment
+    
+    def _archive(self, client, admin_token, older_than_days=30):
+        response = client.post(
+            f"/admin/tracking/archive?older_than_days={older_than_days}",
+            headers=auth_header(admin_token)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+    
+    def _live_count(self, db, shipment_id):
+        from uuid import UUID
+        from app.repositories.tracking_repository import TrackingRepository
+        
+        db.expire_all()
+        return TrackingRepository(db).count_by_shipment(UUID(shipment_id))
+    
+    def test_archives_old_history_of_delivered_shipments(
+        self, client, db, customer_token, agent_token, admin_token, tracking_archive
+    ):
+        """Test that only old updates of delivered shipments are moved"""
+        from uuid import UUID
+        
+        delivered = self._shipment_with_history(client, db, customer_token, agent_token, [60, 45, 1])
+        in_transit = self._shipment_with_history(
+            client, db, customer_token, agent_token, [60], delivered=False
+        )
+        
+        result = self._archive(client, admin_token)
+        assert result == {"older_than_days": 30, "shipments_archived": 1, "updates_archived": 3}
+        
+        assert self._live_count(db, delivered["id"]) == 1
+        assert self._live_count(db, in_transit["id"]) == 2
+        archived = tracking_archive.read(UUID(delivered["id"]))
+        assert [row["location"] for row in archived] == ["Chennai", "Hub 60", "Hub 45"]
+        
+        # Nothing left to archive
+        assert self._archive(client, admin_token)["updates_archived"] == 0
+    
+    def test_history_reads_fall_back_to_archive(
+        self, client, db, customer_token, agent_token, admin_token, tracking_archive
+    ):
+        """Test that every history endpoint still returns archived updates"""
+        shipment = self._shipment_with_history(client, db, customer_token, agent_token, [60, 45, 1])
+        self._archive(client, admin_token)
+        
+        history = client.get(f"/tracking/{shipment['id']}").json()
+        newest_first = ["Hub 1", "Hub 45", "Hub 60", "Chennai"]
+        assert history["total_updates"] == 4
+        assert [u["location"] for u in history["updates"]] == newest_first
+        
+        by_number = client.get(f"/tracking/number/{shipment['tracking_number']}").json()
+        assert [u["location"] for u in by_number["updates"]] == newest_first
+        
+        tracked = client.get(f"/shipments/track/{shipment['tracking_number']}").json()
+        assert [u["location"] for u in tracked["tracking_updates"]] == newest_first[::-1]
+        
+        detail = client.get(f"/shipments/{shipment['id']}", headers=auth_header(customer_token)).json()
+        assert [u["location"] for u in detail["tracking_updates"]] == newest_first[::-1]
+    
+    def test_latest_update_from_archive(
+        self, client, db, customer_token, agent_token, admin_token, tracking_archive
+    ):
+        """Test the latest update when the whole history is archived"""
+        from uuid import UUID
+        from app.services.tracking_service import TrackingService
+        
+        shipment = self._shipment_with_history(client, db, customer_token, agent_token, [60, 45])
+        self._archive(client, admin_token)
+        
+        db.expire_all()
+        latest = TrackingService(db).get_latest_update(UUID(shipment["id"]))
+        assert latest.last_tracking_location == "Hub 45"
+    
+    def test_rearchiving_duplicates_are_ignored(
+        self, client, db, customer_token, agent_token, tracking_archive
+    ):
+        """Test that rows appended twice (e.g. after a failed delete) are read once"""
+        from uuid import UUID
+        from app.repositories.tracking_repository import TrackingRepository
+        
+        shipment = self._shipment_with_history(client, db, customer_token, agent_token, [60, 45])
+        updates = TrackingRepository(db).get_by_shipment(UUID(shipment["id"]))
+        tracking_archive.append(UUID(shipment["id"]), updates)
+        tracking_archive.append(UUID(shipment["id"]), updates)
+        
+        assert len(tracking_archive.read(UUID(shipment["id"]))) == len(updates) == 3
+    
+    def test_maintenance_job(
+        self, client, db, customer_token, agent_token, tracking_archive, monkeypatch
+    ):
+        """Test the background job's run (archival only when enabled)"""
+        from app.core.config import settings
+        from app.services.archive_service import run_tracking_maintenance
+        
+        shipment = self._shipment_with_history(client, db, customer_token, agent_token, [120])
+        engine = db.get_bind()
+        
+        assert run_tracking_maintenance(engine) == (0, 0)
+        monkeypatch.setattr(settings, "TRACKING_ARCHIVE_ENABLED", True)
+        assert run_tracking_maintenance(engine) == (1, 2)
+        assert self._live_count(db, shipment["id"]) == 0
+    
+    def test_customer_cannot_archive(self, client, customer_token):
+        """Test that archiving is admin only"""
+        response = client.post("/admin/tracking/archive", headers=auth_header(customer_token))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestTrackingPartitions:
+    """Test monthly partition DDL"""
+    
+    def test_monthly_partition_ddl(self):
+        from datetime import date
+        from app.core.partitioning import add_months, monthly_partition_ddl
+        
+        assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+        assert monthly_partition_ddl("tracking_updates", date(2026, 12, 15)) == (
+            "CREATE TABLE IF NOT EXISTS tracking_updates_2026_12 PARTITION OF tracking_updates "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        )
+
+
+class TestLatestTrackingSnapshot:
+    """Test the latest-tracking snapshot on shipments and its batch endpoint"""
+    
+    def _create(self, client, customer_token, source="Chennai"):
+        return client.post(
+            "/shipments",
+            headers=auth_header(customer_token),
+            json={"source_address": source, "destination_address": "Bangalore"}
+        ).json()
+    
+    def _latest(self, client, agent_token, shipment_ids):
+        return client.post(
+            "/tracking/latest",
+            headers=auth_header(agent_token),
+            json={"shipment_ids": shipment_ids}
+        )
+    
+    def test_snapshot_follows_tracking_updates(self, client, customer_token, agent_token):
+        """Test create, tracking updates, status changes and cancel refresh the snapshot"""
+        shipment = self._create(client, customer_token)
+        latest = self._latest(client, agent_token, [shipment["id"]]).json()["shipments"][0]
+        assert latest["last_tracking_status"] == "created"
+        assert latest["last_tracking_location"] == "Chennai"
+        
+        client.post(
+            f"/tracking/{shipment['id']}",
+            headers=auth_header(agent_token),
+            json={"location": "Salem Hub", "status": "at_hub"}
+        )
+        latest = self._latest(client, agent_token, [shipment["id"]]).json()["shipments"][0]
+        assert latest["last_tracking_status"] == "at_hub"
+        assert latest["last_tracking_location"] == "Salem Hub"
+        
+        client.put(
+            f"/shipments/{shipment['id']}/status",
+            headers=auth_header(agent_token),
+            json={"status": "picked_up", "location": "Vellore"}
+        )
+        client.delete(f"/shipments/{shipment['id']}", headers=auth_header(customer_token))
+        latest = self._latest(client, agent_token, [shipment["id"]]).json()["shipments"][0]
+        assert latest["status"] == "cancelled"
+        assert latest["last_tracking_status"] == "cancelled"
+        assert latest["last_tracking_location"] == "Vellore"
+    
+    def test_older_update_keeps_snapshot(self, client, db, customer_token):
+        """Test a back-dated tracking update does not replace a newer snapshot"""
+        from datetime import datetime, timedelta
+        from uuid import UUID
+        from app.core.unit_of_work import UnitOfWork
+        from app.models.shipment import Shipment
+        from app.models.tracking import TrackingUpdate
+        from app.repositories.tracking_repository import TrackingRepository
+        
+        shipment_id = UUID(self._create(client, customer_token)["id"])
+        with UnitOfWork(db):
+            TrackingRepository(db).create(TrackingUpdate(
+                shipment_id=shipment_id,
+                location="Late Scan",
+                status="at_hub",
+                created_at=datetime.utcnow() - timedelta(days=1)
+            ))
+        
+        shipment = db.get(Shipment, shipment_id)
+        assert shipment.last_tracking_status == "created"
+        assert shipment.last_tracking_location == "Chennai"
+    
+    def test_latest_update_reads_snapshot(self, client, db, count_queries, customer_token):
+        """Test the service's latest update is one snapshot read, not a history query"""
+        from uuid import UUID
+        from app.services.tracking_service import TrackingService
+        
+        shipment_id = UUID(self._create(client, customer_token)["id"])
+        with count_queries() as queries:
+            latest = TrackingService(db).get_latest_update(shipment_id)
+        
+        assert latest.last_tracking_status == "created"
+        assert queries.count == 1
+        assert "tracking_updates" not in queries.statements[0]
+    
+    def test_writes_update_shipment_once(self, client, count_queries, customer_token, agent_token):
+        """Test the snapshot rides on the shipment's own INSERT/UPDATE"""
+        with count_queries() as created:
+            shipment = self._create(client, customer_token)
+        with count_queries() as tracked:
+            client.post(
+                f"/tracking/{shipment['id']}",
+                headers=auth_header(agent_token),
+                json={"location": "Salem Hub", "status": "at_hub"}
+            )
+        
+        def shipment_writes(queries):
+            pattern = re.compile(r"^(INSERT INTO|UPDATE) shipments\b", re.IGNORECASE)
+            return [statement.split()[0].upper() for statement in queries.statements if pattern.match(statement)]
+        
+        assert shipment_writes(created) == ["INSERT"]
+        assert shipment_writes(tracked) == ["UPDATE"]
+    
+    def test_bulk_upload_sets_snapshot(self, client, customer_token, agent_token):
+        """Test bulk-created shipments start with the initial snapshot"""
+        response = client.post(
+            "/shipments/bulk",
+            headers=auth_header(customer_token),
+            json=[{"source_address": "Madurai", "destination_address": "Bangalore"}]
+        )
+        shipment_id = response.json()["results"][0]["id"]
+        
+        latest = self._latest(client, agent_token, [shipment_id]).json()["shipments"][0]
+        assert latest["last_tracking_status"] == "created"
+        assert latest["last_tracking_location"] == "Madurai"
+        assert latest["last_tracking_at"] is not None
+    
+    def test_batch_in_one_query(self, client, count_queries, customer_token, agent_token):
+        """Test the batch returns shipments in request order plus unknown ids, with one query"""
+        from uuid import uuid4
+        
+        ids = [self._create(client, customer_token, source=f"City {i}")["id"] for i in range(5)]
+        unknown = str(uuid4())
+        requested = [ids[3], unknown, ids[0], ids[3], *ids[1:3], ids[4]]
+        
+        with count_queries() as queries:
+            response = self._latest(client, agent_token, requested)
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [item["shipment_id"] for item in data["shipments"]] == [ids[3], ids[0], ids[1], ids[2], ids[4]]
+        assert data["missing"] == [unknown]
+        # current user + the snapshot SELECT
+        assert queries.count == 2
+    
+    def test_batch_limit(self, client, agent_token):
+        """Test more than 1,000 ids (or none) are rejected"""
+        from uuid import uuid4
+        
+        response = self._latest(client, agent_token, [str(uuid4()) for _ in range(1001)])
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        
+        response = self._latest(client, agent_token, [])
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_customer_cannot_batch(self, client, customer_token):
+        """Test the batch endpoint is for agents and admins"""
+        from uuid import uuid4
+        
+        response = self._latest(client, customer_token, [str(uuid4())])
+        assert response.status_code == status.HTTP_403_FORBIDDEN
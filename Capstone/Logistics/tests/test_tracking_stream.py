@@ -0,0 +1,153 @@
+"""
+Live tracking stream tests (broker, SSE, WebSocket)
+"""
+import asyncio
+import json
+import threading
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
+from tests.conftest import auth_header
+
+
+def create_shipment(client, token) -> dict:
+    return client.post(
+        "/shipments",
+        headers=auth_header(token),
+        json={"source_address": "Chennai", "destination_address": "Bangalore"}
+    ).json()
+
+
+def add_update(client, token, shipment_id, location, update_status="in_transit"):
+    return client.post(
+        f"/tracking/{shipment_id}",
+        headers=auth_header(token),
+        json={"location": location, "status": update_status}
+    )
+
+
+class TestTrackingBroker:
+    """Test the in-process broker"""
+    
+    @pytest.mark.asyncio
+    async def test_fan_out_from_other_threads(self):
+        """Test publishes from worker threads reach every subscriber of the channel only"""
+        from app.core.broker import TrackingBroker
+        broker = TrackingBroker()
+        
+        async with broker.subscribe("TRK1") as first, broker.subscribe("TRK1") as second, \
+                broker.subscribe("TRK2") as other:
+            assert broker.subscriber_count("TRK1") == 2
+            thread = threading.Thread(target=broker.publish, args=("TRK1", "update"))
+            thread.start()
+            thread.join()
+            
+            assert await asyncio.wait_for(first.get(), 1) == "update"
+            assert await asyncio.wait_for(second.get(), 1) == "update"
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(other.get(), 0.05)
+        
+        assert broker.subscriber_count() == 0
+        assert not broker.has_subscribers("TRK1")
+    
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_cut_off(self):
+        """Test a subscriber more than max_pending updates behind gets None after its backlog"""
+        from app.core.broker import TrackingBroker
+        broker = TrackingBroker(max_pending=2)
+        
+        async with broker.subscribe("TRK1") as subscription:
+            for index in range(4):
+                broker.publish("TRK1", str(index))
+            await asyncio.sleep(0)
+            
+            assert [await subscription.get() for _ in range(3)] == ["0", "1", None]
+            assert subscription.lagged
+
+
+class TestTrackingStreams:
+    """Test SSE and WebSocket subscriptions"""
+    
+    @pytest.mark.asyncio
+    async def test_sse_streams_new_updates(self, client, customer_token, agent_token):
+        """Test the SSE stream carries updates added after connecting"""
+        # TestClient buffers whole responses, so the endless stream is read
+        # by calling the ASGI app directly
+        from app.main import app
+        shipment = await asyncio.to_thread(create_shipment, client, customer_token)
+        path = f"/tracking/number/{shipment['tracking_number']}/events"
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = asyncio.Event()
+        
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+        
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+            "root_path": "", "query_string": b"", "headers": [(b"host", b"testserver")],
+            "client": ("testclient", 50000), "server": ("testserver", 80)
+        }
+        task = asyncio.create_task(app(scope, receive, messages.put))
+        try:
+            start = await asyncio.wait_for(messages.get(), 5)
+            assert start["status"] == status.HTTP_200_OK
+            assert dict(start["headers"])[b"content-type"].startswith(b"text/event-stream")
+            assert (await asyncio.wait_for(messages.get(), 5))["body"] == b"retry: 3000\n\n"
+            
+            await asyncio.to_thread(add_update, client, agent_token, shipment["id"], "Salem Hub")
+            event = (await asyncio.wait_for(messages.get(), 5))["body"].decode()
+        finally:
+            disconnected.set()
+            await asyncio.wait_for(task, 5)
+        
+        lines = event.split("\n")
+        assert lines[0] == "event: tracking"
+        data = json.loads(lines[1][len("data: "):])
+        assert data["location"] == "Salem Hub"
+        assert data["shipment_id"] == shipment["id"]
+    
+    def test_websocket_streams_status_changes(self, client, customer_token, agent_token):
+        """Test the WebSocket carries status updates, in order"""
+        shipment = create_shipment(client, customer_token)
+        
+        with client.websocket_connect(f"/tracking/number/{shipment['tracking_number']}/ws") as websocket:
+            client.put(
+                f"/shipments/{shipment['id']}/status",
+                headers=auth_header(agent_token),
+                json={"status": "picked_up", "location": "Chennai"}
+            )
+            add_update(client, agent_token, shipment["id"], "Vellore")
+            
+            first = websocket.receive_json()
+            second = websocket.receive_json()
+        
+        assert (first["status"], second["location"]) == ("picked_up", "Vellore")
+    
+    def test_unknown_tracking_number(self, client):
+        """Test both streams reject unknown tracking numbers"""
+        response = client.get("/tracking/number/TRK0000000000/events")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/tracking/number/TRK0000000000/ws"):
+                pass
+        assert exc_info.value.code == 4404
+    
+    def test_disconnect_unsubscribes(self, client, customer_token):
+        """Test closing a WebSocket removes its subscription"""
+        import time
+        from app.core.broker import get_tracking_broker
+        shipment = create_shipment(client, customer_token)
+        broker = get_tracking_broker()
+        
+        with client.websocket_connect(f"/tracking/number/{shipment['tracking_number']}/ws"):
+            assert broker.subscriber_count(shipment["tracking_number"]) == 1
+        
+        for _ in range(50):
+            if not broker.has_subscribers(shipment["tracking_number"]):
+                break
+            time.sleep(0.01)
+        assert broker.subscriber_count(shipment["tracking_number"]) == 0
@@ -0,0 +1,80 @@
+"""
+Tests for custom column types
+"""
+import uuid
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.types import GUID
+
+
+@pytest.fixture(params=[False, True], ids=["char", "binary"])
+def guid_table(request):
+    """A table with GUID columns in one storage mode on in-memory SQLite"""
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table(
+        "items",
+        metadata,
+        Column("pk", Integer, primary_key=True),
+        Column("id", GUID(binary=request.param)),
+        Column("ref", GUID(binary=request.param), nullable=True)
+    )
+    metadata.create_all(engine)
+    yield engine, table
+    engine.dispose()
+
+
+class TestGUID:
+    """Test GUID storage modes"""
+    
+    def test_round_trip(self, guid_table):
+        """Test that UUIDs, strings and NULL round-trip in both modes"""
+        engine, table = guid_table
+        first, second = uuid.uuid4(), uuid.uuid4()
+        with engine.begin() as conn:
+            conn.execute(insert(table), [
+                {"id": first, "ref": None},
+                {"id": str(second), "ref": first}
+            ])
+            rows = conn.execute(select(table.c.id, table.c.ref).order_by(table.c.pk)).all()
+        
+        assert rows == [(first, None), (second, first)]
+        assert all(type(row.id) is uuid.UUID for row in rows)
+        assert rows[0].id.is_safe == uuid.SafeUUID.unknown
+    
+    def test_filter_by_uuid_and_string(self, guid_table):
+        """Test that bound UUID and string values compare equal to stored ones"""
+        engine, table = guid_table
+        value = uuid.uuid4()
+        with engine.begin() as conn:
+            conn.execute(insert(table), [{"id": value}, {"id": uuid.uuid4()}])
+            by_uuid = conn.execute(select(table.c.pk).where(table.c.id == value)).scalars().all()
+            by_str = conn.execute(select(table.c.pk).where(table.c.id == str(value))).scalars().all()
+        assert by_uuid == by_str == [1]
+    
+    def test_binary_storage_is_16_bytes(self):
+        """Test that binary mode stores the raw UUID bytes"""
+        engine = create_engine("sqlite://")
+        metadata = MetaData()
+        table = Table("items", metadata, Column("id", GUID(binary=True)))
+        metadata.create_all(engine)
+        value = uuid.uuid4()
+        with engine.begin() as conn:
+            conn.execute(insert(table), [{"id": value}])
+            raw = conn.exec_driver_sql("SELECT id, typeof(id) FROM items").one()
+        assert raw == (value.bytes, "blob")
+    
+    def test_invalid_value_rejected(self, guid_table):
+        """Test that malformed strings are rejected when bound"""
+        engine, table = guid_table
+        with engine.begin() as conn:
+            with pytest.raises(Exception):
+                conn.execute(insert(table), [{"id": "not-a-uuid"}])
+    
+    def test_dialect_column_types(self):
+        """Test the DDL type per dialect and mode"""
+        assert GUID(binary=False).compile(dialect=sqlite.dialect()) == "CHAR(36)"
+        assert GUID(binary=True).compile(dialect=sqlite.dialect()) == "BINARY(16)"
+        assert GUID(binary=True).compile(dialect=postgresql.dialect()) == "UUID"
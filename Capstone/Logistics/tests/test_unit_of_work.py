@@ -0,0 +1,43 @@
+"""
+Unit of work tests
+"""
+import pytest
+
+from app.core.unit_of_work import UnitOfWork
+from app.models.hub import Hub
+from app.repositories.hub_repository import HubRepository
+from tests.conftest import TestingSessionLocal
+
+
+class TestUnitOfWork:
+    """Test transaction scoping"""
+    
+    def test_commits_on_success(self, db):
+        """Test the outermost scope commits"""
+        with UnitOfWork(db):
+            HubRepository(db).create(Hub(hub_name="Salem Hub", city="Salem"))
+        
+        other = TestingSessionLocal()
+        try:
+            assert HubRepository(other).get_by_name("Salem Hub") is not None
+        finally:
+            other.close()
+    
+    def test_rolls_back_on_error(self, db):
+        """Test an exception discards every write in the scope"""
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(db):
+                HubRepository(db).create(Hub(hub_name="Salem Hub", city="Salem"))
+                raise RuntimeError("boom")
+        
+        assert HubRepository(db).get_by_name("Salem Hub") is None
+    
+    def test_nested_scope_joins_outer(self, db):
+        """Test an inner scope does not commit on its own"""
+        with pytest.raises(RuntimeError):
+            with UnitOfWork(db):
+                with UnitOfWork(db):
+                    HubRepository(db).create(Hub(hub_name="Salem Hub", city="Salem"))
+                raise RuntimeError("boom")
+        
+        assert HubRepository(db).get_by_name("Salem Hub") is None